@@ -0,0 +1,167 @@
+import os
+import importlib.util
+from pathlib import Path
+
+import pandas as pd
+
+FORMATOS = ('csv', 'parquet', 'feather')
+EXTENSIONES = {'csv': '.csv', 'parquet': '.parquet', 'feather': '.feather'}
+COMPRESION = 'zstd'
+
+
+def pyarrow_disponible():
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def formato_efectivo(formato):
+    """parquet/feather necesitan pyarrow; sin él se avisa y se usa CSV"""
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido: {formato} (opciones: {', '.join(FORMATOS)})")
+    if formato != 'csv' and not pyarrow_disponible():
+        print(f"⚠️  {formato} requiere pyarrow (pip install pyarrow): se guarda en CSV")
+        return 'csv'
+    return formato
+
+
+def guardar(df, ruta_base, formato='csv', sep=','):
+    """
+    Escribe df en ruta_base + extensión del formato. Parquet y feather guardan
+    los dtypes (fechas, category, enteros angostos) y van comprimidos.
+    Devuelve la ruta escrita.
+    """
+    formato = formato_efectivo(formato)
+    ruta = str(ruta_base) + EXTENSIONES[formato]
+
+    if formato == 'parquet':
+        df.to_parquet(ruta, index=False, compression=COMPRESION)
+    elif formato == 'feather':
+        # Feather exige un índice por defecto (0..n-1)
+        df.reset_index(drop=True).to_feather(ruta, compression=COMPRESION)
+    else:
+        df.to_csv(ruta, index=False, encoding='utf-8', sep=sep)
+
+    return ruta
+
+
+class EscritorChunks:
+    """
+    Escribe chunk a chunk en CSV o parquet (un row group por chunk). El
+    esquema parquet sale del primer chunk; si uno posterior no encaja (una
+    columna toda vacía al principio y con texto después) se amplía y se
+    reescribe lo ya escrito, row group por row group.
+    """
+
+    def __init__(self, ruta_base, formato='csv', sep=','):
+        self.formato = formato_efectivo(formato)
+        if self.formato == 'feather':
+            # Feather no admite anexar: en streaming se usa parquet
+            print("⚠️  feather no admite escritura por chunks: se guarda en parquet")
+            self.formato = 'parquet'
+        self.ruta = str(ruta_base) + EXTENSIONES[self.formato]
+        self.sep = sep
+        self._escritor = None
+        self._esquema = None
+        self._primero = True
+
+    def escribir(self, chunk):
+        if self.formato == 'csv':
+            chunk.to_csv(self.ruta, mode='w' if self._primero else 'a', header=self._primero,
+                         index=False, encoding='utf-8', sep=self.sep)
+        else:
+            import pyarrow as pa
+
+            # Category se escribe como su valor: cada chunk trae su propio diccionario
+            chunk = chunk.astype({col: chunk[col].cat.categories.dtype
+                                  for col in chunk.select_dtypes(include='category').columns})
+            tabla = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._escritor is None:
+                self._abrir(tabla.schema)
+            elif not tabla.schema.equals(self._esquema):
+                esquema = ampliar_esquema(self._esquema, tabla.schema)
+                if not esquema.equals(self._esquema):
+                    self._reescribir(esquema)
+                tabla = tabla.cast(esquema)
+            self._escritor.write_table(tabla)
+        self._primero = False
+
+    def _abrir(self, esquema):
+        import pyarrow.parquet as pq
+
+        self._esquema = esquema
+        self._escritor = pq.ParquetWriter(self.ruta, esquema, compression=COMPRESION)
+
+    def _reescribir(self, esquema):
+        """Pasa lo ya escrito al esquema ampliado (memoria de un row group)"""
+        import pyarrow.parquet as pq
+
+        self._escritor.close()
+        anterior = self.ruta + '.anterior'
+        os.replace(self.ruta, anterior)
+        self._abrir(esquema)
+        try:
+            archivo = pq.ParquetFile(anterior)
+            for grupo in range(archivo.num_row_groups):
+                self._escritor.write_table(archivo.read_row_group(grupo).cast(esquema))
+        finally:
+            os.remove(anterior)
+
+    def cerrar(self):
+        """Cierra el archivo (idempotente: también se llama si el streaming falla)"""
+        if self._escritor is not None:
+            self._escritor.close()
+            self._escritor = None
+        return self.ruta
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cerrar()
+        return False
+
+
+def ampliar_esquema(actual, nuevo):
+    """
+    Tipo común columna a columna: lo vacío (null) toma el tipo del otro,
+    enteros y decimales quedan en float64 y cualquier otro choque, en texto.
+    Sin metadata de pandas: ya no describiría los tipos reales.
+    """
+    import pyarrow as pa
+
+    campos = []
+    for campo in actual:
+        otro = nuevo.field(campo.name).type
+        tipo = campo.type
+        if tipo.equals(otro) or pa.types.is_null(otro):
+            pass
+        elif pa.types.is_null(tipo):
+            tipo = otro
+        elif ((pa.types.is_integer(tipo) or pa.types.is_floating(tipo)) and
+              (pa.types.is_integer(otro) or pa.types.is_floating(otro))):
+            tipo = pa.float64()
+        else:
+            tipo = pa.string()
+        campos.append(pa.field(campo.name, tipo))
+    return pa.schema(campos)
+
+
+def cargar(ruta, columnas=None, sep=None):
+    """
+    Lee un archivo limpio según su extensión. columnas: proyección; en
+    parquet/feather solo se leen del disco esas columnas.
+    """
+    extension = Path(ruta).suffix.lower()
+    if extension == '.parquet':
+        return pd.read_parquet(ruta, columns=columnas)
+    if extension == '.feather':
+        return pd.read_feather(ruta, columns=columnas)
+    return pd.read_csv(ruta, usecols=columnas, sep=sep, engine='python' if sep is None else 'c')
+
+
+def buscar(ruta_base):
+    """Versión más rápida de leer de un archivo limpio: parquet > feather > csv"""
+    for formato in ('parquet', 'feather', 'csv'):
+        ruta = Path(str(ruta_base) + EXTENSIONES[formato])
+        if ruta.exists():
+            return ruta
+    return None
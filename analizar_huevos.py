@@ -1,16 +1,36 @@
 # analizar_huevos.py
-import pandas as pd
+import os
+
 import matplotlib.pyplot as plt
 
-df = pd.read_csv('LOTE 39 (100)(MOVIMIENTO HUEVO)_LIMPIO.csv', sep=';')
+from almacen_columnar import buscar, cargar
+from consolidador_lotes import consultar
+
+LOTES = [39]
+BASE = 'lotes_consolidados.db'
+
+# Proyección: p.ej. ['FECHA', 'TOTAL'] lee del parquet solo esas columnas
+COLUMNAS = None
+
+if os.path.exists(BASE):
+    # Base consolidada (consolidador_lotes.py): cualquier lote sin releer archivos
+    df = consultar(BASE, lotes=LOTES, columnas=COLUMNAS)
+else:
+    # Prefiere el parquet/feather del limpiador (tipos ya inferidos); si no, el CSV
+    archivo = buscar(f'LOTE {LOTES[0]} (100)(MOVIMIENTO HUEVO)_LIMPIO')
+    if archivo is None:
+        raise SystemExit("❌ No hay archivo limpio: ejecuta primero limpiador_granja.py")
+    df = cargar(archivo, columnas=COLUMNAS, sep=';')
 
 print(df.head())
 print(df.info())
 
 # Si tiene columnas de fechas y totales, graficar
 # (ajusta según tus columnas reales)
-if 'FECHA' in df.columns and 'TOTAL' in df.columns:
-    df.plot(x='FECHA', y='TOTAL', kind='line')
-    plt.title('Producción de Huevos - Lote 39')
-    plt.savefig('produccion_lote39.png')
-    print("📊 Gráfico guardado: produccion_lote39.png")
\ No newline at end of file
+x = 'fecha' if 'fecha' in df.columns else 'FECHA'
+if x in df.columns and 'TOTAL' in df.columns:
+    nombre = '_'.join(str(l) for l in LOTES)
+    df.plot(x=x, y='TOTAL', kind='line')
+    plt.title(f"Producción de Huevos - Lote {', '.join(str(l) for l in LOTES)}")
+    plt.savefig(f'produccion_lote{nombre}.png')
+    print(f"📊 Gráfico guardado: produccion_lote{nombre}.png")
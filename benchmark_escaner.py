@@ -0,0 +1,93 @@
+import os
+import time
+import tempfile
+import contextlib
+from pathlib import Path
+
+from escaner_archivos import escanear
+from motor_movimientos import MotorMovimientos
+
+
+class BenchmarkEscaner:
+    """Cuenta llamadas a stat/lstat: listdir + isfile + exists vs escáner con os.scandir"""
+
+    CATEGORIAS = ['Imagenes', 'Documentos', 'Videos', 'Otros']
+
+    def __init__(self, n_entradas=200_000):
+        self.n_entradas = n_entradas
+        self.llamadas_stat = 0
+
+    def generar_carpeta_prueba(self, carpeta):
+        """N entradas: archivos vacíos y algunas subcarpetas (1 de cada 50)"""
+        for categoria in self.CATEGORIAS:
+            (carpeta / categoria).mkdir()
+        for i in range(self.n_entradas):
+            ruta = carpeta / f"entrada_{i:07d}.pdf"
+            if i % 50 == 0:
+                ruta.mkdir()
+            else:
+                open(ruta, 'w').close()
+
+    @contextlib.contextmanager
+    def contar_stats(self):
+        """Intercepta os.stat y os.lstat (isfile, exists y lexists)"""
+        stat_real, lstat_real = os.stat, os.lstat
+
+        def contar(funcion):
+            def contada(*args, **kwargs):
+                self.llamadas_stat += 1
+                return funcion(*args, **kwargs)
+            return contada
+
+        self.llamadas_stat = 0
+        os.stat, os.lstat = contar(stat_real), contar(lstat_real)
+        try:
+            yield
+        finally:
+            os.stat, os.lstat = stat_real, lstat_real
+
+    def metodo_viejo(self, carpeta):
+        """❌ listdir + isfile (stat) + exists en destino (stat)"""
+        archivos = [f for f in os.listdir(carpeta)
+                    if os.path.isfile(os.path.join(carpeta, f))]
+        for archivo in archivos:
+            os.path.exists(os.path.join(carpeta, 'Documentos', archivo))
+        return len(archivos)
+
+    def metodo_nuevo(self, carpeta):
+        """✅ scandir (tipo de DirEntry) + un lstat por destino al reservar"""
+        motor = MotorMovimientos()
+        procesados = 0
+        for registro in escanear(carpeta):
+            motor.reservar_destino(os.path.join(carpeta, 'Documentos'), registro.nombre, 'bench')
+            procesados += 1
+        return procesados
+
+    def comparar(self):
+        print("\n🔬 ESCÁNER DE DIRECTORIOS: llamadas a stat")
+        print("="*70)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            carpeta = Path(tmp)
+            print(f"Generando {self.n_entradas:,} entradas...")
+            self.generar_carpeta_prueba(carpeta)
+
+            print(f"\n{'Método':28} | {'Archivos':>9} | {'stat()':>9} | {'Tiempo':>8}")
+            print("-"*70)
+
+            for nombre, metodo in [("listdir + isfile + exists", self.metodo_viejo),
+                                   ("scandir (escaner_archivos)", self.metodo_nuevo)]:
+                with self.contar_stats():
+                    inicio = time.perf_counter()
+                    archivos = metodo(str(carpeta))
+                    tiempo = time.perf_counter() - inicio
+                print(f"{nombre:28} | {archivos:>9,} | {self.llamadas_stat:>9,} | {tiempo:>7.2f}s")
+
+        print("\nNota: DirEntry.stat() solo se ejecuta si se pide tamaño o mtime del registro.\n")
+
+
+if __name__ == "__main__":
+    import sys
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    BenchmarkEscaner(n).comparar()
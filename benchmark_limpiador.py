@@ -0,0 +1,108 @@
+import os
+import time
+import tempfile
+import tracemalloc
+import contextlib
+
+import numpy as np
+import pandas as pd
+
+from limpiador_csv import LimpiadorCSV
+
+
+class BenchmarkLimpiador:
+    """Pico de memoria (tracemalloc) de la limpieza: pasos eager vs plan perezoso"""
+
+    def __init__(self, n_filas=5_000_000):
+        self.n_filas = n_filas
+
+    def generar_csv(self, ruta):
+        """CSV sintético con fechas, precios, porcentajes, nulos y duplicados"""
+        rng = np.random.default_rng(42)
+        n = self.n_filas
+        df = pd.DataFrame({
+            'Fecha Venta': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365, n), unit='D'),
+            'Precio ($)': rng.integers(100, 10_000, n) / 100,
+            'Descuento': rng.integers(0, 50, n),
+            'Cantidad': rng.integers(0, 100, n).astype(float),
+            'Cliente': rng.choice(['Norte', 'Sur', 'Este', 'Oeste'], n),
+        })
+        df['Fecha Venta'] = df['Fecha Venta'].dt.strftime('%Y-%m-%d')
+        df['Precio ($)'] = '$' + df['Precio ($)'].astype(str)
+        df['Descuento'] = df['Descuento'].astype(str) + '%'
+        df.loc[::97, 'Cantidad'] = np.nan
+        df.iloc[::50] = df.iloc[1::50].to_numpy()  # ~2% de filas duplicadas
+        df.to_csv(ruta, index=False)
+
+    @staticmethod
+    def limpieza_eager(archivo):
+        """Los pasos como eran antes: copia del original y un frame nuevo por paso"""
+        df = pd.read_csv(archivo, encoding='utf-8')
+        df_original = df.copy()
+        df.columns = [LimpiadorCSV.normalizar_nombre(col) for col in df.columns]
+        df = df.drop_duplicates()
+        df['fecha_venta'] = pd.to_datetime(df['fecha_venta'])
+        df['precio'] = df['precio'].str.replace(r'[$€£,]', '', regex=True).astype(float)
+        df['descuento'] = df['descuento'].str.replace('%', '').astype(float) / 100
+        df = df.dropna()
+        df.select_dtypes(include=[np.number]).describe()
+        for col in df.select_dtypes(include=['object', 'string']).columns:
+            df[col].value_counts().head(5)
+        df.to_csv(os.devnull, index=False)
+        return len(df_original), len(df)
+
+    @staticmethod
+    def limpieza_plan(archivo):
+        """Pipeline actual de LimpiadorCSV"""
+        limpiador = LimpiadorCSV(archivo, usar_cache=False)
+        limpiador.pipeline_completo()
+        return limpiador.reporte['filas_originales'], len(limpiador.df)
+
+    def medir(self, funcion, archivo):
+        """(segundos, pico en MB, resultado) de una corrida"""
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+            resultado = funcion(archivo)
+        tiempo = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return tiempo, pico / 1024 / 1024, resultado
+
+    def comparar(self):
+        print("\n🔬 MEMORIA DE LA LIMPIEZA DE CSV")
+        print("="*70)
+        print(f"Filas: {self.n_filas:,}\n")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            archivo = os.path.join(tmp, "ventas.csv")
+            self.generar_csv(archivo)
+            print(f"CSV sintético: {os.path.getsize(archivo) / 1024 / 1024:.0f} MB\n")
+
+            cwd = os.getcwd()
+            os.chdir(tmp)  # _limpio.csv y _reporte.txt quedan en el temporal
+            try:
+                resultados = [
+                    ("Eager (antes)", *self.medir(self.limpieza_eager, archivo)),
+                    ("Plan perezoso", *self.medir(self.limpieza_plan, archivo)),
+                ]
+            finally:
+                os.chdir(cwd)
+
+        print(f"{'Método':>15} | {'Tiempo':>9} | {'Pico MB':>9} | {'Filas':>21}")
+        print("-"*70)
+        for nombre, tiempo, pico, (originales, finales) in resultados:
+            print(f"{nombre:>15} | {tiempo:>8.2f}s | {pico:>9.0f} | {originales:>10,} → {finales:>8,}")
+
+        ahorro = 1 - resultados[1][2] / resultados[0][2]
+        print(f"\n💡 Pico de memoria {ahorro:.0%} menor con el plan perezoso\n")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark de memoria del limpiador de CSV')
+    parser.add_argument('--filas', type=int, default=5_000_000)
+    args = parser.parse_args()
+
+    BenchmarkLimpiador(args.filas).comparar()
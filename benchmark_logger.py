@@ -0,0 +1,78 @@
+import os
+import time
+import tempfile
+from pathlib import Path
+from datetime import datetime
+
+from logger_organizador import LoggerOrganizador
+
+
+class BenchmarkLogger:
+    """Compara el costo por archivo del log viejo (abrir/escribir/cerrar) vs el logger por lotes"""
+
+    def __init__(self, n_archivos=50_000):
+        self.n_archivos = n_archivos
+
+    def generar_carpeta_prueba(self, carpeta):
+        """Crea N archivos vacíos con extensiones variadas"""
+        extensiones = ['.pdf', '.xlsx', '.jpg', '.mp4', '.zip', '.py', '.txt']
+        for i in range(self.n_archivos):
+            ext = extensiones[i % len(extensiones)]
+            open(os.path.join(carpeta, f"archivo_{i:06d}{ext}"), 'w').close()
+
+    def log_viejo(self, ruta_log, archivos):
+        """❌ Un open/append/close por mensaje (comportamiento original)"""
+        for archivo in archivos:
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            with open(ruta_log, 'a', encoding='utf-8') as f:
+                f.write(f"[{timestamp}] SUCCESS: Movido: {archivo} → Otros/\n")
+
+    def log_nuevo(self, ruta_log, archivos, en_hilo=False):
+        """✅ Un descriptor por ejecución con escritura por lotes"""
+        with LoggerOrganizador(ruta_log, en_hilo=en_hilo) as logger:
+            for archivo in archivos:
+                logger.escribir(f"Movido: {archivo} → Otros/", "SUCCESS")
+
+    def medir(self, funcion, *args, **kwargs):
+        inicio = time.perf_counter()
+        funcion(*args, **kwargs)
+        return time.perf_counter() - inicio
+
+    def comparar(self):
+        """Ejecuta las tres variantes sobre la misma carpeta sintética"""
+        print("\n🔬 BENCHMARK DEL LOGGER DE ORGANIZADORES")
+        print("="*70)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            carpeta = Path(tmp) / "descargas"
+            carpeta.mkdir()
+            print(f"Generando {self.n_archivos:,} archivos sintéticos...")
+            self.generar_carpeta_prueba(carpeta)
+            archivos = os.listdir(carpeta)
+
+            variantes = [
+                ("Viejo (open por mensaje)", self.log_viejo, {}),
+                ("Nuevo (buffer síncrono)", self.log_nuevo, {}),
+                ("Nuevo (hilo en segundo plano)", self.log_nuevo, {'en_hilo': True}),
+            ]
+
+            print(f"\n{'Variante':32} | {'Total':>10} | {'µs/archivo':>11} | {'Mejora':>8}")
+            print("-"*70)
+
+            tiempo_base = None
+            for i, (nombre, funcion, kwargs) in enumerate(variantes):
+                ruta_log = Path(tmp) / f"bench_{i}.log"
+                tiempo = self.medir(funcion, ruta_log, archivos, **kwargs)
+                tiempo_base = tiempo_base or tiempo
+                por_archivo = tiempo / len(archivos) * 1e6
+                mejora = tiempo_base / tiempo if tiempo > 0 else 0
+                print(f"{nombre:32} | {tiempo:>9.3f}s | {por_archivo:>11.2f} | {mejora:>7.1f}x")
+
+        print()
+
+
+if __name__ == "__main__":
+    import sys
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    BenchmarkLogger(n).comparar()
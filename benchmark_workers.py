@@ -0,0 +1,93 @@
+import os
+import time
+import tempfile
+import contextlib
+from pathlib import Path
+
+from organizar_cli import OrganizadorArchivos
+
+
+class BenchmarkWorkers:
+    """Mide el throughput del organizador CLI con 1/2/4/8 hilos de movimiento"""
+
+    def __init__(self, n_archivos=5_000, latencia_ms=0.0):
+        self.n_archivos = n_archivos
+        self.latencia_ms = latencia_ms  # Simula un disco de red/lento por movimiento
+
+    def generar_carpeta_prueba(self, carpeta):
+        extensiones = ['.pdf', '.xlsx', '.jpg', '.mp4', '.zip', '.py', '.txt', '.xyz']
+        for i in range(self.n_archivos):
+            ext = extensiones[i % len(extensiones)]
+            with open(os.path.join(carpeta, f"archivo_{i:06d}{ext}"), 'wb') as f:
+                f.write(b"x" * 1024)
+
+    @contextlib.contextmanager
+    def _disco_lento(self, motor):
+        """Agrega latencia fija a cada movimiento del motor del organizador"""
+        if self.latencia_ms <= 0:
+            yield
+            return
+
+        mover_real = motor.mover
+
+        def mover_con_latencia(origen, destino):
+            time.sleep(self.latencia_ms / 1000)
+            return mover_real(origen, destino)
+
+        motor.mover = mover_con_latencia
+        try:
+            yield
+        finally:
+            motor.mover = mover_real
+
+    def medir(self, workers):
+        """Organiza una carpeta nueva y devuelve (segundos, stats)"""
+        with tempfile.TemporaryDirectory() as tmp:
+            carpeta = Path(tmp) / "descargas"
+            carpeta.mkdir()
+            self.generar_carpeta_prueba(carpeta)
+
+            cwd = os.getcwd()
+            os.chdir(tmp)  # Los logs del benchmark quedan en el temporal
+            try:
+                organizador = OrganizadorArchivos(str(carpeta), workers=workers)
+                with self._disco_lento(organizador.motor), open(os.devnull, 'w') as nulo, \
+                        contextlib.redirect_stdout(nulo):
+                    inicio = time.perf_counter()
+                    organizador.organizar()
+                    tiempo = time.perf_counter() - inicio
+                organizador.logger.cerrar()
+            finally:
+                os.chdir(cwd)
+
+        return tiempo, organizador.stats
+
+    def comparar(self):
+        print("\n🔬 THROUGHPUT DEL MOTOR DE MOVIMIENTOS")
+        print("="*70)
+        print(f"Archivos: {self.n_archivos:,} | Latencia simulada: {self.latencia_ms} ms/movimiento\n")
+        print(f"{'Workers':>8} | {'Tiempo':>9} | {'Archivos/s':>11} | {'Movidos':>8} | {'Mejora':>7}")
+        print("-"*70)
+
+        tiempo_base = None
+        for workers in [1, 2, 4, 8]:
+            tiempo, stats = self.medir(workers)
+            tiempo_base = tiempo_base or tiempo
+            throughput = self.n_archivos / tiempo if tiempo > 0 else 0
+            mejora = tiempo_base / tiempo if tiempo > 0 else 0
+            print(f"{workers:>8} | {tiempo:>8.2f}s | {throughput:>11.0f} | "
+                  f"{stats['archivos_movidos']:>8} | {mejora:>6.1f}x")
+
+        print()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark de movimientos en paralelo')
+    parser.add_argument('--archivos', type=int, default=5_000)
+    parser.add_argument('--latencia-ms', type=float, default=2.0,
+                        help='Latencia simulada por movimiento (0 = disco local real)')
+    args = parser.parse_args()
+
+    BenchmarkWorkers(args.archivos, args.latencia_ms).comparar()
@@ -0,0 +1,142 @@
+import os
+import json
+import time
+import pickle
+import hashlib
+from pathlib import Path
+
+import pandas as pd
+
+from almacen_columnar import pyarrow_disponible
+
+CARPETA_CACHE = '.cache_limpieza'
+MAX_BYTES = 512 * 1024 * 1024
+BLOQUE_HUELLA = 64 * 1024
+VERSION = 1      # Subirla cuando cambie el parseo: invalida todo lo guardado
+
+
+def huella(ruta, opciones):
+    """
+    Clave del archivo sin leerlo entero: tamaño, mtime, hash de tres
+    bloques (inicio, medio y final) y las opciones del limpiador.
+    """
+    estado = os.stat(ruta)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps({'version': VERSION, 'tamano': estado.st_size, 'mtime': estado.st_mtime_ns,
+                         'opciones': opciones}, sort_keys=True).encode())
+
+    with open(ruta, 'rb') as f:
+        h.update(f.read(BLOQUE_HUELLA))
+        if estado.st_size > 3 * BLOQUE_HUELLA:
+            f.seek(estado.st_size // 2)
+            h.update(f.read(BLOQUE_HUELLA))
+            f.seek(-BLOQUE_HUELLA, os.SEEK_END)
+            h.update(f.read(BLOQUE_HUELLA))
+
+    return h.hexdigest()
+
+
+class CacheParseo:
+    """
+    Frames ya parseados y tipados, más lo que se detectó para obtenerlos
+    (codificación, estructura, tipos), en una carpeta local. Cada entrada es
+    <clave>.json + <clave>.parquet (o .pkl si no hay pyarrow o el frame no
+    entra en parquet). Al pasar de max_bytes se borran las menos usadas.
+    """
+
+    def __init__(self, carpeta=CARPETA_CACHE, max_bytes=MAX_BYTES):
+        self.carpeta = Path(carpeta)
+        self.max_bytes = max_bytes
+
+    def _meta(self, clave):
+        return self.carpeta / f"{clave}.json"
+
+    def obtener(self, clave):
+        """(df, meta) o None. Un acierto cuenta como uso reciente para el LRU"""
+        ruta_meta = self._meta(clave)
+        try:
+            meta = json.loads(ruta_meta.read_text(encoding='utf-8'))
+            datos = self.carpeta / meta['datos']
+            if datos.suffix == '.parquet':
+                df = pd.read_parquet(datos)
+            else:
+                with open(datos, 'rb') as f:
+                    df = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Entrada rota (escritura cortada, otra versión de pandas...): se descarta
+            self.borrar(clave)
+            return None
+
+        ahora = time.time()
+        try:
+            for ruta in (ruta_meta, datos):
+                os.utime(ruta, (ahora, ahora))
+        except FileNotFoundError:
+            pass  # Otro proceso la desalojó recién: el df ya está leído, solo no se marca como reciente
+        return df, meta
+
+    def guardar(self, clave, df, meta):
+        self.carpeta.mkdir(parents=True, exist_ok=True)
+        datos = None
+
+        if pyarrow_disponible():
+            datos = self.carpeta / f"{clave}.parquet"
+            try:
+                df.to_parquet(f"{datos}.tmp", compression='zstd')
+            except (ValueError, TypeError):
+                # Columnas object con tipos mezclados: pickle guarda cualquier cosa
+                Path(f"{datos}.tmp").unlink(missing_ok=True)
+                datos = None
+        if datos is None:
+            datos = self.carpeta / f"{clave}.pkl"
+            with open(f"{datos}.tmp", 'wb') as f:
+                pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(f"{datos}.tmp", datos)
+        self._escribir_meta(clave, {**meta, 'datos': datos.name})
+        self.desalojar()
+
+    def actualizar(self, clave, **meta):
+        """Agrega metadatos a una entrada existente (p.ej. tipos inferidos después del parseo)"""
+        try:
+            actual = json.loads(self._meta(clave).read_text(encoding='utf-8'))
+        except (FileNotFoundError, ValueError):
+            return
+        self._escribir_meta(clave, {**actual, **meta})
+
+    def _escribir_meta(self, clave, meta):
+        # El .json se escribe al final y de forma atómica: sin él la entrada no existe
+        temporal = f"{self._meta(clave)}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, default=str)
+        os.replace(temporal, self._meta(clave))
+
+    def borrar(self, clave):
+        for ruta in self.carpeta.glob(f"{clave}.*"):
+            ruta.unlink(missing_ok=True)
+
+    def entradas(self):
+        """[(clave, bytes, último uso)] de todas las entradas"""
+        entradas = []
+        for ruta_meta in self.carpeta.glob('*.json'):
+            clave = ruta_meta.stem
+            try:
+                archivos = list(self.carpeta.glob(f"{clave}.*"))
+                tamano = sum(r.stat().st_size for r in archivos)
+                entradas.append((clave, tamano, ruta_meta.stat().st_mtime))
+            except FileNotFoundError:
+                continue  # Otro proceso la borró mientras se listaba
+        return entradas
+
+    def desalojar(self):
+        """Borra las entradas usadas hace más tiempo hasta quedar bajo max_bytes"""
+        entradas = sorted(self.entradas(), key=lambda e: e[2])
+        total = sum(tamano for _, tamano, _ in entradas)
+
+        for clave, tamano, _ in entradas:
+            if total <= self.max_bytes:
+                break
+            self.borrar(clave)
+            total -= tamano
@@ -0,0 +1,354 @@
+import os
+import re
+import glob
+import sqlite3
+from pathlib import Path
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from almacen_columnar import EXTENSIONES, buscar, cargar
+
+PATRON_LOTE = re.compile(r'LOTE\s*(\d+)', re.IGNORECASE)
+PATRON_FECHA = r'^\s*(\d{1,2})\s*[-/ ]\s*([A-Za-zé]{3,4})'
+
+MESES = {'ene': 1, 'feb': 2, 'mar': 3, 'abr': 4, 'may': 5, 'jun': 6, 'jul': 7,
+         'ago': 8, 'sep': 9, 'set': 9, 'oct': 10, 'nov': 11, 'dic': 12}
+
+# Letra de DIA → días de la semana posibles (lunes = 0); M es martes o miércoles
+DIAS_SEMANA = {'L': {0}, 'M': {1, 2}, 'X': {2}, 'J': {3}, 'V': {4}, 'S': {5}, 'D': {6}}
+
+ANIOS_ATRAS = 30                # Rango donde buscar el año de inicio
+TABLA = 'produccion_lotes'
+TABLA_FUENTES = 'fuentes_lotes'
+
+
+def lote_de_archivo(ruta):
+    """'LOTE 39 (100)(MOVIMIENTO HUEVO)_LIMPIO.parquet' → 39"""
+    encontrado = PATRON_LOTE.search(Path(ruta).name)
+    return int(encontrado.group(1)) if encontrado else None
+
+
+def fuente_de_archivo(ruta):
+    """Identidad del archivo sin formato: 'LOTE 39 (100)(MOVIMIENTO HUEVO)_LIMPIO'"""
+    return Path(ruta).stem
+
+
+def listar_limpios(entrada):
+    """
+    Archivos _LIMPIO de lotes (con 'LOTE NN' en el nombre) de una carpeta o
+    patrón glob. Si un lote está en varios formatos se toma el más rápido de
+    leer (parquet > feather > csv).
+    """
+    if os.path.isdir(entrada):
+        rutas = glob.glob(os.path.join(entrada, '*'))
+    else:
+        rutas = glob.glob(entrada)
+
+    bases = set()
+    for ruta in rutas:
+        ruta = Path(ruta)
+        if (ruta.suffix.lower() in EXTENSIONES.values() and ruta.stem.upper().endswith('_LIMPIO')
+                and lote_de_archivo(ruta) is not None):
+            bases.add(str(ruta.with_suffix('')))
+
+    return sorted(str(buscar(base)) for base in bases)
+
+
+def _fechas(dia, mes, anios):
+    return pd.to_datetime(pd.DataFrame({'year': anios, 'month': mes, 'day': dia}), errors='coerce')
+
+
+def anios_transcurridos(dia, mes, semana):
+    """
+    Años desde el inicio del lote para cada fila. Cada vez que el mes
+    retrocede (dic → ene) es un año más; además, donde hay SEM se compara lo
+    transcurrido en fechas con (SEM - SEM inicial) * 7 días, y si difieren en
+    un año o más (faltan meses enteros en el archivo) se corrige desde ahí.
+    """
+    anios = (mes < mes.shift()).cumsum().to_numpy()
+
+    semana = pd.to_numeric(semana, errors='coerce') if semana is not None else None
+    if semana is None or semana.notna().sum() < 2:
+        return anios
+
+    # Año provisional (bisiesto): solo importan las diferencias
+    fechas = _fechas(dia, mes, 2000 + anios)
+    referencia = semana.first_valid_index()
+    esperado = (semana - semana[referencia]) * 7
+    real = (fechas - fechas[referencia]).dt.days
+    desfase = ((esperado - real) / 365.25).round()
+
+    correccion = desfase.where(semana.notna()).ffill().fillna(0)
+    return anios + correccion.astype(int).to_numpy()
+
+
+def inferir_anio_inicio(dia, mes, anios, dias_semana=None, hoy=None):
+    """
+    Año de la primera fila: el más reciente (sin fechas futuras) cuyo
+    calendario coincide con la columna DIA (L, M, M, J, V, S, D).
+    Sin DIA, el más reciente sin fechas futuras.
+    """
+    hoy = pd.Timestamp(hoy or date.today())
+    mejor, mejor_puntaje = None, -1.0
+
+    for inicio in range(hoy.year, hoy.year - ANIOS_ATRAS, -1):
+        fechas = _fechas(dia, mes, inicio + anios)
+        if fechas.max() > hoy:
+            continue
+        if dias_semana is None:
+            return inicio
+
+        letras = dias_semana.astype(str).str.strip().str.upper().str[:1]
+        validas = letras.isin(list(DIAS_SEMANA)) & fechas.notna()
+        if not validas.any():
+            return inicio
+        coincide = [dia_sem in DIAS_SEMANA[letra]
+                    for letra, dia_sem in zip(letras[validas], fechas[validas].dt.dayofweek)]
+        puntaje = np.mean(coincide)
+        if puntaje > mejor_puntaje:
+            mejor, mejor_puntaje = inicio, puntaje
+
+    return mejor
+
+
+def fechas_lote(df, anio_inicio=None, hoy=None):
+    """
+    FECHA tipo '27-may' → datetime, con el año deducido del lote.
+    Devuelve (serie de fechas, año de inicio usado).
+    """
+    if pd.api.types.is_datetime64_any_dtype(df['FECHA']):
+        fechas = df['FECHA']
+        return fechas, (int(fechas.min().year) if fechas.notna().any() else anio_inicio)
+
+    partes = df['FECHA'].astype(str).str.extract(PATRON_FECHA)
+    dia = pd.to_numeric(partes[0], errors='coerce')
+    mes = partes[1].str.lower().str[:3].map(MESES)
+
+    validas = dia.notna() & mes.notna()
+    fechas = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+    if not validas.any():
+        return fechas, anio_inicio
+
+    dia, mes = dia[validas].astype(int), mes[validas].astype(int)
+    semana = df['SEM'][validas] if 'SEM' in df.columns else None
+    anios = anios_transcurridos(dia, mes, semana)
+
+    if anio_inicio is None:
+        dias_semana = df['DIA'][validas] if 'DIA' in df.columns else None
+        anio_inicio = inferir_anio_inicio(dia, mes, anios, dias_semana, hoy)
+
+    fechas[validas] = _fechas(dia, mes, anio_inicio + anios).to_numpy()
+    return fechas, anio_inicio
+
+
+class ConsolidadorLotes:
+    """
+    Junta los _LIMPIO de cada lote en una sola base SQLite con índice
+    (lote, fecha). Cada archivo (lote, fuente) se reemplaza completo al
+    volver a cargarlo, sin tocar otros archivos del mismo lote, y los que no
+    cambiaron (mismo tamaño y fecha de modificación) no se releen.
+    """
+
+    def __init__(self, ruta_db='lotes_consolidados.db', anio_inicio=None):
+        self.ruta_db = ruta_db
+        self.anio_inicio = anio_inicio
+        self.conexion = sqlite3.connect(ruta_db)
+        self.resultados = []
+        self.crear_tablas()
+
+    def crear_tablas(self):
+        columnas = [fila[1] for fila in self.conexion.execute(f"PRAGMA table_info({TABLA_FUENTES})")]
+        if columnas and 'fuente' not in columnas:
+            # Base anterior, con un archivo por lote: se rehace desde los archivos
+            print("⚠️  Base con el formato anterior (un archivo por lote): se vuelve a cargar todo")
+            self.conexion.execute(f"DROP TABLE {TABLA_FUENTES}")
+            self.conexion.execute(f"DROP TABLE IF EXISTS {TABLA}")
+
+        self.conexion.execute(f'''
+            CREATE TABLE IF NOT EXISTS {TABLA_FUENTES} (
+                lote INTEGER,
+                fuente TEXT,
+                archivo TEXT,
+                tamano INTEGER,
+                modificado REAL,
+                anio_inicio INTEGER,
+                filas INTEGER,
+                PRIMARY KEY (lote, fuente)
+            )
+        ''')
+        self.conexion.commit()
+
+    def columnas_tabla(self):
+        filas = self.conexion.execute(f"PRAGMA table_info({TABLA})").fetchall()
+        return [fila[1] for fila in filas]
+
+    def sin_cambios(self, lote, ruta):
+        fila = self.conexion.execute(
+            f"SELECT tamano, modificado FROM {TABLA_FUENTES} WHERE lote = ? AND fuente = ?",
+            (lote, fuente_de_archivo(ruta))
+        ).fetchone()
+        estado = os.stat(ruta)
+        return fila is not None and fila[0] == estado.st_size and fila[1] == estado.st_mtime
+
+    def anio_guardado(self, lote, fuente):
+        """Año de inicio ya deducido para el lote (de este archivo si lo hay)"""
+        fila = self.conexion.execute(
+            f"SELECT anio_inicio FROM {TABLA_FUENTES} WHERE lote = ? AND anio_inicio IS NOT NULL "
+            f"ORDER BY fuente = ? DESC LIMIT 1", (lote, fuente)
+        ).fetchone()
+        return fila[0] if fila else None
+
+    def preparar(self, ruta, lote):
+        """DataFrame listo para la tabla: lote, fecha ISO y el resto de columnas"""
+        df = cargar(ruta, sep=';')
+        if 'FECHA' not in df.columns:
+            raise ValueError("no tiene columna FECHA")
+
+        # El año deducido en una carga anterior se reusa: no depende del día en que se recarga
+        fuente = fuente_de_archivo(ruta)
+        anio_inicio = self.anio_inicio or self.anio_guardado(lote, fuente)
+        fechas, anio_inicio = fechas_lote(df, anio_inicio)
+        sin_fecha = int(fechas.isna().sum())
+
+        # SQLite no distingue mayúsculas: FECHA se reemplaza por la fecha completa
+        df = df[fechas.notna()].drop(columns=[c for c in df.columns
+                                              if c.lower() in ('lote', 'fecha', 'fuente')])
+        df.insert(0, 'lote', lote)
+        df.insert(1, 'fecha', fechas[fechas.notna()].dt.strftime('%Y-%m-%d'))
+        df.insert(2, 'fuente', fuente)
+        df = df.sort_values('fecha', kind='stable')
+
+        # SQLite no conoce category ni los enteros con nulos de pandas
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype(object)
+        return df, anio_inicio, sin_fecha
+
+    def agregar_columnas(self, df):
+        """Lotes con columnas nuevas: ALTER TABLE en vez de rehacer la tabla"""
+        existentes = self.columnas_tabla()
+        if not existentes:
+            return
+        for col in df.columns:
+            if col not in existentes:
+                self.conexion.execute(f'ALTER TABLE {TABLA} ADD COLUMN "{col}"')
+
+    def consolidar_archivo(self, ruta, forzar=False):
+        resumen = {'archivo': ruta, 'lote': lote_de_archivo(ruta), 'estado': '', 'filas': 0,
+                   'sin_fecha': 0, 'anio_inicio': None}
+
+        if not forzar and self.sin_cambios(resumen['lote'], ruta):
+            resumen['estado'] = "sin cambios"
+            return resumen
+
+        df, resumen['anio_inicio'], resumen['sin_fecha'] = self.preparar(ruta, resumen['lote'])
+        estado = os.stat(ruta)
+
+        with self.conexion:
+            if self.columnas_tabla():
+                self.conexion.execute(f"DELETE FROM {TABLA} WHERE lote = ? AND fuente = ?",
+                                      (resumen['lote'], fuente_de_archivo(ruta)))
+            self.agregar_columnas(df)
+            df.to_sql(TABLA, self.conexion, if_exists='append', index=False)
+            self.conexion.execute(
+                f"INSERT OR REPLACE INTO {TABLA_FUENTES} VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (resumen['lote'], fuente_de_archivo(ruta), os.path.abspath(ruta), estado.st_size,
+                 estado.st_mtime, resumen['anio_inicio'], len(df))
+            )
+
+        resumen['filas'] = len(df)
+        resumen['estado'] = "cargado"
+        return resumen
+
+    def consolidar(self, entrada, forzar=False):
+        archivos = listar_limpios(entrada)
+        if not archivos:
+            print(f"❌ No hay archivos _LIMPIO en {entrada}")
+            return False
+
+        print(f"\n🗄️  CONSOLIDANDO {len(archivos)} lotes en {self.ruta_db}\n")
+        for ruta in archivos:
+            try:
+                resumen = self.consolidar_archivo(ruta, forzar)
+            except Exception as e:
+                resumen = {'archivo': ruta, 'lote': lote_de_archivo(ruta), 'filas': 0,
+                           'sin_fecha': 0, 'anio_inicio': None,
+                           'estado': f"error: {type(e).__name__}: {str(e)}"}
+            self.resultados.append(resumen)
+
+            icono = {'cargado': "✅", 'sin cambios': "⏭️ "}.get(resumen['estado'], "❌")
+            detalle = f"{resumen['filas']} filas desde {resumen['anio_inicio']}" \
+                if resumen['estado'] == 'cargado' else resumen['estado']
+            print(f"  {icono} Lote {resumen['lote']}: {detalle}")
+            if resumen['sin_fecha']:
+                print(f"     ⚠️  {resumen['sin_fecha']} filas sin FECHA reconocible (descartadas)")
+
+        if self.columnas_tabla():
+            self.crear_indice()
+            total, lotes = self.conexion.execute(
+                f"SELECT COUNT(*), COUNT(DISTINCT lote) FROM {TABLA}").fetchone()
+            print(f"\n📊 Base: {total:,} filas de {lotes} lotes\n")
+        return all(r['estado'] in ('cargado', 'sin cambios') for r in self.resultados)
+
+    def crear_indice(self):
+        self.conexion.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{TABLA}_lote_fecha ON {TABLA} (lote, fecha)")
+        self.conexion.commit()
+
+    def cerrar(self):
+        self.conexion.close()
+
+
+def consultar(ruta_db='lotes_consolidados.db', lotes=None, desde=None, hasta=None, columnas=None):
+    """
+    Lee de la base consolidada sin tocar los archivos de cada lote. Los
+    filtros por lote y rango de fechas usan el índice (lote, fecha).
+    """
+    # SQLite no distingue mayúsculas: 'FECHA' es la misma columna que fecha
+    seleccion = ', '.join(['lote', 'fecha'] + [f'"{c}"' for c in columnas or []
+                                               if c.lower() not in ('lote', 'fecha')]) \
+        if columnas else '*'
+    condiciones, parametros = [], []
+    if lotes:
+        condiciones.append(f"lote IN ({', '.join('?' * len(lotes))})")
+        parametros.extend(lotes)
+    if desde:
+        condiciones.append("fecha >= ?")
+        parametros.append(str(desde))
+    if hasta:
+        condiciones.append("fecha <= ?")
+        parametros.append(str(hasta))
+
+    consulta = f"SELECT {seleccion} FROM {TABLA}"
+    if condiciones:
+        consulta += " WHERE " + " AND ".join(condiciones)
+    consulta += " ORDER BY lote, fecha"
+
+    with sqlite3.connect(ruta_db) as conexion:
+        df = pd.read_sql_query(consulta, conexion, params=parametros)
+    df['fecha'] = pd.to_datetime(df['fecha'])
+    return df
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='🗄️ Consolidar los _LIMPIO de cada lote en una base SQLite')
+    parser.add_argument('entrada', nargs='?', default='.',
+                        help='Carpeta o patrón de los archivos limpios, p.ej. "limpios/LOTE *_LIMPIO.*"')
+    parser.add_argument('--db', default='lotes_consolidados.db', help='Base SQLite de destino')
+    parser.add_argument('--anio-inicio', type=int, default=None,
+                        help='Año de la primera fecha (por defecto se deduce de DIA y SEM '
+                             'la primera vez y se reusa al recargar)')
+    parser.add_argument('--forzar', action='store_true', help='Recargar también los lotes sin cambios')
+    args = parser.parse_args()
+
+    consolidador = ConsolidadorLotes(args.db, args.anio_inicio)
+    consolidador.consolidar(args.entrada, args.forzar)
+    consolidador.cerrar()
+
+
+if __name__ == "__main__":
+    main()
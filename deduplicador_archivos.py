@@ -0,0 +1,186 @@
+import os
+import hashlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from escaner_archivos import recorrer
+
+BLOQUE_PARCIAL = 64 * 1024      # Primer y último bloque para el hash rápido
+BLOQUE_LECTURA = 1024 * 1024    # Lectura en streaming para el hash completo
+
+
+def hash_parcial(ruta, bloque=BLOQUE_PARCIAL):
+    """Hash del primer y último bloque (None si no se pudo leer)"""
+    try:
+        h = hashlib.blake2b(digest_size=16)
+        with open(ruta, 'rb') as f:
+            h.update(f.read(bloque))
+            tamano = os.fstat(f.fileno()).st_size
+            if tamano > bloque:
+                f.seek(max(bloque, tamano - bloque))
+                h.update(f.read(bloque))
+        return h.hexdigest()
+    except OSError:
+        return None
+
+
+def hash_completo(ruta, bloque=BLOQUE_LECTURA):
+    """Hash de todo el contenido, leído por bloques (memoria constante)"""
+    try:
+        h = hashlib.blake2b(digest_size=32)
+        with open(ruta, 'rb') as f:
+            while True:
+                datos = f.read(bloque)
+                if not datos:
+                    break
+                h.update(datos)
+        return h.hexdigest()
+    except OSError:
+        return None
+
+
+def candidatos_de(registros, prioridad):
+    """(ruta, tamaño, prioridad) de cada registro; prioridad 0 = se conserva primero"""
+    for registro in registros:
+        try:
+            yield registro.ruta, registro.tamano, prioridad
+        except OSError:
+            continue
+
+
+class DeduplicadorArchivos:
+    """
+    Encuentra archivos idénticos por etapas: agrupa por tamaño, luego hash
+    parcial (primer + último bloque) y solo después hash completo. Los hashes
+    se calculan en un pool de procesos para usar todos los núcleos.
+    """
+
+    ACCIONES = ('reportar', 'enlazar', 'eliminar')
+
+    def __init__(self, accion='reportar', procesos=None):
+        if accion not in self.ACCIONES:
+            raise ValueError(f"Acción de deduplicación inválida: {accion}")
+        self.accion = accion
+        self.procesos = procesos
+
+    def buscar(self, candidatos):
+        """
+        candidatos: iterable de (ruta, tamaño, prioridad).
+        Devuelve grupos de rutas idénticas; la primera de cada grupo es la que
+        se conserva (menor prioridad y, a igualdad, la ruta más corta).
+        """
+        por_tamano = defaultdict(list)
+        for ruta, tamano, prioridad in candidatos:
+            if tamano > 0:
+                por_tamano[tamano].append((prioridad, ruta))
+
+        # Etapa 1: solo tamaños repetidos pasan a hashear
+        grupos = [(tamano, g) for tamano, g in por_tamano.items() if len(g) > 1]
+        if not grupos:
+            return []
+
+        with ProcessPoolExecutor(max_workers=self.procesos) as pool:
+            # Etapa 2: hash parcial
+            grupos = self._reagrupar(pool, grupos, hash_parcial)
+
+            # Etapa 3: hash completo, solo si el parcial no cubrió el archivo entero
+            cubiertos = [(t, g) for t, g in grupos if t <= 2 * BLOQUE_PARCIAL]
+            largos = [(t, g) for t, g in grupos if t > 2 * BLOQUE_PARCIAL]
+            grupos = cubiertos + self._reagrupar(pool, largos, hash_completo)
+
+        return [[ruta for _, ruta in sorted(g, key=lambda x: (x[0], len(x[1]), x[1]))]
+                for _, g in grupos]
+
+    def _reagrupar(self, pool, grupos, funcion_hash):
+        """Divide cada grupo según el hash de sus archivos; descarta los que quedan solos"""
+        rutas = [ruta for _, g in grupos for _, ruta in g]
+        hashes = pool.map(funcion_hash, rutas, chunksize=32)
+
+        subgrupos = defaultdict(list)
+        for n_grupo, (tamano, grupo) in enumerate(grupos):
+            for item in grupo:
+                digest = next(hashes)
+                if digest is not None:
+                    subgrupos[(n_grupo, tamano, digest)].append(item)
+
+        return [(tamano, g) for (_, tamano, _), g in subgrupos.items() if len(g) > 1]
+
+    def aplicar(self, grupos, dry_run=False, log=None, protegidos=(), diario=None):
+        """
+        Reporta, enlaza (hard link) o elimina los duplicados. Devuelve un
+        resumen. protegidos: rutas que solo pueden ser originales (nunca se
+        tocan). diario: DiarioMovimientos donde se anotan enlaces y borrados
+        antes de hacerlos, para que --undo pueda recrear las copias.
+        """
+        resumen = {'grupos': len(grupos), 'duplicados': 0, 'bytes_duplicados': 0, 'errores': 0,
+                   'enlazados': []}
+        protegidos = set(protegidos)
+
+        acciones = []
+        for grupo in grupos:
+            original, duplicados = grupo[0], grupo[1:]
+            for duplicado in duplicados:
+                if duplicado in protegidos:
+                    continue
+                try:
+                    if os.path.samefile(original, duplicado):
+                        continue  # Ya es un hard link: no ocupa espacio extra
+                    acciones.append((original, duplicado, os.path.getsize(duplicado)))
+                except OSError as e:
+                    resumen['errores'] += 1
+                    if log:
+                        log(f"Error deduplicando {duplicado}: {str(e)}", "ERROR")
+
+        modifica = not dry_run and self.accion in ('enlazar', 'eliminar')
+        if modifica and diario and acciones:
+            # origen = la copia que desaparece, destino = el original que la puede recrear
+            tipo = 'enlazado' if self.accion == 'enlazar' else 'eliminado'
+            diario.anticipar(((duplicado, original) for original, duplicado, _ in acciones), tipo=tipo)
+
+        for original, duplicado, tamano in acciones:
+            try:
+                if modifica and self.accion == 'enlazar':
+                    self._enlazar(original, duplicado)
+                    resumen['enlazados'].append(duplicado)
+                elif modifica:
+                    os.remove(duplicado)
+
+                resumen['duplicados'] += 1
+                resumen['bytes_duplicados'] += tamano
+                if log:
+                    log(f"Duplicado ({self.accion}): {duplicado} = {original}")
+            except OSError as e:
+                if modifica and diario:
+                    diario.cancelar(duplicado, original)
+                resumen['errores'] += 1
+                if log:
+                    log(f"Error deduplicando {duplicado}: {str(e)}", "ERROR")
+
+        return resumen
+
+    @staticmethod
+    def _enlazar(original, duplicado):
+        """Reemplaza el duplicado por un hard link al original de forma atómica"""
+        temporal = f"{duplicado}.dedup_tmp"
+        os.link(original, temporal)
+        os.replace(temporal, duplicado)
+
+
+def deduplicar_entrantes(deduplicador, entrantes, carpetas_organizadas, dry_run=False, log=None,
+                         diario=None):
+    """
+    Etapa de deduplicación de los organizadores. Lo que llega se compara
+    consigo mismo y con lo ya organizado, pero solo se tocan archivos
+    entrantes: lo organizado tiene prioridad 0 y únicamente sirve de
+    original. Devuelve el resumen de aplicar().
+    """
+    candidatos = list(candidatos_de(entrantes, prioridad=1))
+    organizados = []
+    for carpeta in carpetas_organizadas:
+        if os.path.isdir(carpeta):
+            organizados.extend(candidatos_de(recorrer(carpeta), prioridad=0))
+    candidatos.extend(organizados)
+
+    grupos = deduplicador.buscar(candidatos)
+    return deduplicador.aplicar(grupos, dry_run=dry_run, log=log, diario=diario,
+                                protegidos=(ruta for ruta, _, _ in organizados))
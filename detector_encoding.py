@@ -0,0 +1,86 @@
+import codecs
+import time
+
+MUESTRA_BYTES = 1024 * 1024   # Máximo que se lee para decidir
+BLOQUE = 64 * 1024
+
+# El orden importa: el BOM de UTF-32 LE empieza igual que el de UTF-16 LE
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Bytes 0x80-0x9F que cp1252 no define (en latin-1 son controles C1)
+NO_DEFINIDOS_CP1252 = {0x81, 0x8D, 0x8F, 0x90, 0x9D}
+FUERA_DE_C1 = bytes(b for b in range(256) if not 0x80 <= b <= 0x9F)
+
+
+def detectar_encoding(ruta, muestra=MUESTRA_BYTES):
+    """
+    Decide la codificación con una sola lectura acotada del archivo:
+    BOM → UTF-8 validado por bloques → cp1252 / latin-1.
+    Devuelve {'encoding', 'bom', 'bytes_leidos', 'motivo', 'segundos'}.
+    """
+    inicio = time.perf_counter()
+    resultado = {'encoding': 'utf-8', 'bom': False, 'bytes_leidos': 0, 'motivo': 'ASCII'}
+
+    decodificador = codecs.getincrementaldecoder('utf-8')()
+    rango_c1 = set()
+    no_ascii = False
+    utf8_valido = True
+
+    with open(ruta, 'rb') as f:
+        primero = f.read(min(BLOQUE, muestra))
+        bloque = primero
+
+        for bom, encoding in BOMS:
+            if primero.startswith(bom):
+                resultado.update(encoding=encoding, bom=True, bytes_leidos=len(primero),
+                                 motivo=f"BOM {encoding}")
+                resultado['segundos'] = time.perf_counter() - inicio
+                return resultado
+
+        while bloque:
+            resultado['bytes_leidos'] += len(bloque)
+            if not no_ascii and not bloque.isascii():
+                no_ascii = True
+
+            if no_ascii:
+                rango_c1.update(bloque.translate(None, FUERA_DE_C1))
+                if utf8_valido:
+                    try:
+                        decodificador.decode(bloque)
+                    except UnicodeDecodeError:
+                        utf8_valido = False
+
+            if resultado['bytes_leidos'] >= muestra:
+                break
+            bloque = f.read(min(BLOQUE, muestra - resultado['bytes_leidos']))
+
+        fin_de_archivo = not bloque or not f.read(1)
+
+    if utf8_valido and fin_de_archivo:
+        # Un carácter cortado al final del archivo sí es un error
+        try:
+            decodificador.decode(b'', final=True)
+        except UnicodeDecodeError:
+            utf8_valido = False
+
+    if no_ascii and utf8_valido:
+        resultado['motivo'] = 'UTF-8 válido en la muestra'
+    elif no_ascii and rango_c1 & NO_DEFINIDOS_CP1252:
+        resultado.update(encoding='latin-1', motivo='bytes no definidos en cp1252')
+    elif no_ascii:
+        resultado.update(encoding='cp1252', motivo='UTF-8 inválido')
+
+    resultado['segundos'] = time.perf_counter() - inicio
+    return resultado
+
+
+def describir(deteccion):
+    """Línea legible para consola y reportes"""
+    return (f"{deteccion['encoding']} ({deteccion['motivo']}; "
+            f"{deteccion['bytes_leidos']:,} bytes en {deteccion['segundos'] * 1000:.1f} ms)")
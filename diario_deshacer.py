@@ -0,0 +1,234 @@
+import os
+import json
+import shutil
+import threading
+from pathlib import Path
+
+from logger_organizador import LoggerOrganizador
+from motor_movimientos import MotorMovimientos
+from indice_estado import IndiceEstado
+
+
+LOTE_DIARIO = 500
+TIPOS_DEDUP = ('eliminado', 'enlazado')   # Entradas de la deduplicación, no movimientos
+
+
+def en_lotes(iterable, tamano=LOTE_DIARIO):
+    """Agrupa un iterable (p.ej. el escaneo perezoso) en listas de hasta `tamano`"""
+    lote = []
+    for item in iterable:
+        lote.append(item)
+        if len(lote) >= tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+class DiarioMovimientos:
+    """
+    Diario JSONL de escritura anticipada: los (origen, destino) de un lote
+    se escriben y sincronizan ANTES de mover sus archivos, así que tras un
+    corte el diario cubre todo lo que pudo haberse movido. Un movimiento que
+    falló se anota como cancelado para que --undo no toque ese destino.
+    """
+
+    def __init__(self, timestamp, carpeta="logs", lote=LOTE_DIARIO):
+        self.ruta = os.path.join(carpeta, f"diario_{timestamp}.jsonl")
+        self.lote = lote
+        Path(carpeta).mkdir(parents=True, exist_ok=True)
+        self._archivo = open(self.ruta, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._cancelados = []
+
+    @staticmethod
+    def _linea(origen, destino, **extra):
+        entrada = {'origen': os.path.abspath(origen), 'destino': os.path.abspath(destino), **extra}
+        return json.dumps(entrada, ensure_ascii=False) + '\n'
+
+    def anticipar(self, pares, tipo=None):
+        """
+        Anota un lote de (origen, destino) antes de moverlo; vuelve cuando ya
+        está en disco. tipo 'eliminado'/'enlazado' (deduplicación): origen es
+        la copia borrada o enlazada y destino el original que la puede recrear.
+        """
+        extra = {'tipo': tipo} if tipo else {}
+        self._escribir([self._linea(origen, destino, **extra) for origen, destino in pares])
+
+    def cancelar(self, origen, destino):
+        """El movimiento anticipado no ocurrió (se escribe con el próximo lote o en flush)"""
+        with self._lock:
+            self._cancelados.append(self._linea(origen, destino, cancelado=True))
+
+    def flush(self):
+        self._escribir([])
+
+    def _escribir(self, lineas):
+        with self._lock:
+            lineas = self._cancelados + lineas
+            self._cancelados = []
+            if not lineas or self._archivo.closed:
+                return
+            self._archivo.write(''.join(lineas))
+            self._archivo.flush()
+            os.fsync(self._archivo.fileno())
+
+    def cerrar(self):
+        self.flush()
+        with self._lock:
+            self._archivo.close()
+
+
+def clave_entrada(entrada):
+    """Identidad de una entrada del diario (también para el progreso del deshacer)"""
+    return entrada['origen'], entrada['destino'], entrada.get('tipo')
+
+
+def leer_diario(ruta):
+    """Entradas del diario en orden; ignora una última línea cortada por un corte de luz"""
+    entradas = []
+    with open(ruta, 'r', encoding='utf-8') as f:
+        for linea in f:
+            try:
+                entradas.append(json.loads(linea))
+            except json.JSONDecodeError:
+                continue
+    return entradas
+
+
+def diarios_disponibles(carpeta="logs"):
+    return sorted(p.stem.replace('diario_', '') for p in Path(carpeta).glob("diario_*.jsonl")
+                  if not p.stem.endswith('.deshecho'))
+
+
+class Deshacedor:
+    """
+    Revierte una corrida leyendo su diario al revés. Lo ya revertido se anota
+    en diario_<ts>.deshecho.jsonl, así que si se interrumpe basta con volver
+    a ejecutar --undo y continúa donde quedó.
+    """
+
+    def __init__(self, timestamp, carpeta="logs", workers=1):
+        self.timestamp = timestamp
+        self.ruta_diario = os.path.join(carpeta, f"diario_{timestamp}.jsonl")
+        self.ruta_progreso = os.path.join(carpeta, f"diario_{timestamp}.deshecho.jsonl")
+        self.ruta_indice = os.path.join(carpeta, "indice_estado.db")
+        self.motor = MotorMovimientos(workers)
+        self.stats = {
+            'timestamp': timestamp,
+            'entradas': 0,
+            'revertidos': 0,
+            'ya_revertidos': 0,
+            'conflictos': 0,
+            'errores': 0
+        }
+        self._progreso = None
+        self._devueltos = []  # Orígenes efectivamente restaurados en esta corrida
+
+    def deshacer(self):
+        if not os.path.exists(self.ruta_diario):
+            print(f"❌ No existe el diario {self.ruta_diario}")
+            disponibles = diarios_disponibles(os.path.dirname(self.ruta_diario))
+            if disponibles:
+                print(f"   Disponibles: {', '.join(disponibles)}")
+            return False
+
+        entradas = leer_diario(self.ruta_diario)
+        # Movimientos anticipados que fallaron: ese destino no es nuestro
+        cancelados = {(e['origen'], e['destino']) for e in entradas if e.get('cancelado')}
+        entradas = [e for e in entradas
+                    if not e.get('cancelado') and (e['origen'], e['destino']) not in cancelados]
+        self.stats['entradas'] = len(entradas)
+
+        # Las copias de un mismo grupo de duplicados comparten destino (el original):
+        # el progreso se identifica por la entrada completa
+        hechos = set()
+        if os.path.exists(self.ruta_progreso):
+            hechos = {clave_entrada(e) for e in leer_diario(self.ruta_progreso)}
+
+        pendientes = [e for e in reversed(entradas) if clave_entrada(e) not in hechos]
+        self.stats['ya_revertidos'] = len(entradas) - len(pendientes)
+        # Las copias se recrean desde el original: recién cuando todos los movimientos volvieron
+        movimientos = [e for e in pendientes if e.get('tipo') not in TIPOS_DEDUP]
+        copias = [e for e in pendientes if e.get('tipo') in TIPOS_DEDUP]
+
+        print(f"\n↩️  DESHACIENDO CORRIDA {self.timestamp}")
+        print(f"   Entradas: {len(entradas)} | Pendientes: {len(pendientes)}\n")
+
+        self._progreso = LoggerOrganizador(self.ruta_progreso, max_buffer=500)
+        try:
+            self.motor.ejecutar(movimientos, self.revertir)
+            self.motor.ejecutar(copias, self.recrear_copia)
+        finally:
+            self._progreso.cerrar()
+
+        # Los archivos devueltos no deben quedar "sin cambios" para --incremental
+        if os.path.exists(self.ruta_indice) and self._devueltos:
+            indice = IndiceEstado(self.ruta_indice)
+            indice.olvidar(self._devueltos)
+            indice.cerrar()
+
+        self.mostrar_reporte()
+        return True
+
+    def revertir(self, entrada):
+        """Devuelve un archivo a su ruta original (sin pisar nada que haya aparecido allí)"""
+        origen, destino = entrada['origen'], entrada['destino']
+        try:
+            if not os.path.lexists(destino):
+                # Ya revertido antes, o anticipado en el diario y nunca movido (corte a mitad de lote)
+                self._anotar(entrada)
+                self.motor.sumar(self.stats, 'ya_revertidos')
+                return
+
+            if os.path.exists(origen):
+                print(f"  ⚠️  Conflicto, ya existe: {origen}")
+                self.motor.sumar(self.stats, 'conflictos')
+                return
+
+            os.makedirs(os.path.dirname(origen), exist_ok=True)
+            self.motor.mover(destino, origen)
+            self._anotar(entrada)
+            self._devueltos.append(origen)
+            self.motor.sumar(self.stats, 'revertidos')
+
+        except Exception as e:
+            print(f"  ❌ Error revirtiendo {destino}: {str(e)}")
+            self.motor.sumar(self.stats, 'errores')
+
+    def recrear_copia(self, entrada):
+        """Duplicado borrado o convertido en hard link: vuelve a ser una copia independiente"""
+        copia, original = entrada['origen'], entrada['destino']
+        try:
+            if entrada['tipo'] == 'eliminado' and os.path.lexists(copia):
+                self._anotar(entrada)
+                self.motor.sumar(self.stats, 'ya_revertidos')
+                return
+            if entrada['tipo'] == 'enlazado' and not (os.path.exists(copia) and
+                                                      os.path.samefile(copia, original)):
+                self._anotar(entrada)
+                self.motor.sumar(self.stats, 'ya_revertidos')
+                return
+            
+            os.makedirs(os.path.dirname(copia), exist_ok=True)
+            temporal = f"{copia}.undo_tmp"
+            shutil.copy2(original, temporal)
+            os.replace(temporal, copia)
+            self._anotar(entrada)
+            self.motor.sumar(self.stats, 'revertidos')
+        
+        except Exception as e:
+            print(f"  ❌ Error recreando {copia}: {str(e)}")
+            self.motor.sumar(self.stats, 'errores')
+    
+    def _anotar(self, entrada):
+        self._progreso.agregar(json.dumps(entrada, ensure_ascii=False) + '\n')
+
+    def mostrar_reporte(self):
+        print("="*50)
+        print("📊 REPORTE DE DESHACER")
+        print("="*50)
+        print(f"Revertidos: {self.stats['revertidos']}")
+        print(f"Ya revertidos antes: {self.stats['ya_revertidos']}")
+        print(f"Conflictos (origen ocupado): {self.stats['conflictos']}")
+        print(f"Errores: {self.stats['errores']}\n")
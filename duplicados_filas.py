@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+
+def hashes_filas(df, claves=None):
+    """
+    Un hash de 64 bits por fila (uint64), calculado una sola vez. claves:
+    columnas que definen el duplicado, p.ej. ['LOTE', 'FECHA']; None = toda
+    la fila. Dos filas distintas con el mismo hash son posibles pero con
+    probabilidad despreciable (~n² / 2⁶⁵).
+    """
+    if claves:
+        faltantes = [c for c in claves if c not in df.columns]
+        if faltantes:
+            raise KeyError(f"Columnas clave inexistentes: {', '.join(faltantes)}")
+        df = df[list(claves)]
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+class DuplicadosFilas:
+    """
+    Duplicados de un DataFrame a partir de un único hash por fila: el mismo
+    arreglo sirve para contar, mostrar un ejemplo y descartar, sin volver a
+    recorrer las filas como hacen duplicated()/drop_duplicates() cada vez.
+    """
+
+    def __init__(self, df, claves=None, hashes=None):
+        self.claves = list(claves) if claves else None
+        self.hashes = hashes if hashes is not None else hashes_filas(df, self.claves)
+        self._repetidas = None
+
+    def repetidas(self, vivas=None):
+        """Filas que repiten una anterior (se conserva la primera). vivas: máscara de filas a considerar"""
+        if vivas is None:
+            if self._repetidas is None:
+                self._repetidas = pd.Series(self.hashes).duplicated().to_numpy()
+            return self._repetidas
+
+        posiciones = np.flatnonzero(vivas)
+        repetidas = np.zeros(len(self.hashes), dtype=bool)
+        repetidas[posiciones] = pd.Series(self.hashes[posiciones]).duplicated().to_numpy()
+        return repetidas
+
+    def contar(self):
+        return int(self.repetidas().sum())
+
+    def ejemplo(self, df, n=2):
+        """Las primeras n filas de un grupo duplicado (el del primer duplicado encontrado)"""
+        repetidas = np.flatnonzero(self.repetidas())
+        if not len(repetidas):
+            return df.iloc[:0]
+        grupo = np.flatnonzero(self.hashes == self.hashes[repetidas[0]])
+        return df.iloc[grupo[:n]]
+
+    def sin_duplicados(self, df):
+        return df[~self.repetidas()]
+
+
+class HashesVistos:
+    """
+    Hashes ya vistos en streaming, guardados como tramos ordenados de uint64
+    (8 bytes por fila, contra ~70 de un set de ints de Python). Los tramos
+    se fusionan como en un LSM: cada uno al menos el doble del siguiente, así
+    que hay O(log n) tramos y cada hash se recopia O(log n) veces.
+    """
+
+    def __init__(self):
+        self.tramos = []
+
+    def __len__(self):
+        return sum(len(tramo) for tramo in self.tramos)
+
+    def contiene(self, hashes):
+        vistos = np.zeros(len(hashes), dtype=bool)
+        for tramo in self.tramos:
+            posiciones = np.searchsorted(tramo, hashes)
+            posiciones[posiciones == len(tramo)] = 0
+            vistos |= tramo[posiciones] == hashes
+        return vistos
+
+    def nuevas(self, hashes):
+        """
+        Máscara de filas del chunk que no se vieron antes (ni en este chunk
+        ni en los anteriores); sus hashes quedan registrados.
+        """
+        nuevas = ~pd.Series(hashes).duplicated().to_numpy()
+        if self.tramos:
+            nuevas &= ~self.contiene(hashes)
+        self.agregar(hashes[nuevas])
+        return nuevas
+
+    def agregar(self, hashes):
+        if not len(hashes):
+            return
+        self.tramos.append(np.sort(hashes))
+        while len(self.tramos) > 1 and len(self.tramos[-1]) * 2 > len(self.tramos[-2]):
+            ultimo = self.tramos.pop()
+            self.tramos[-1] = np.sort(np.concatenate([self.tramos[-1], ultimo]), kind='stable')
+
+    def memoria_mb(self):
+        return sum(tramo.nbytes for tramo in self.tramos) / 1024 / 1024
@@ -0,0 +1,125 @@
+import os
+from fnmatch import fnmatch
+
+
+class RegistroArchivo:
+    """Registro liviano de un archivo encontrado por el escáner"""
+
+    __slots__ = ('nombre', 'sufijo', 'ruta', '_entrada')
+
+    def __init__(self, entrada):
+        self.nombre = entrada.name
+        self.sufijo = os.path.splitext(entrada.name)[1].lower()
+        self.ruta = entrada.path
+        self._entrada = entrada
+
+    @property
+    def tamano(self):
+        """Bytes del archivo (el stat se hace solo si se pide, y DirEntry lo cachea)"""
+        return self._entrada.stat().st_size
+
+    @property
+    def mtime(self):
+        return self._entrada.stat().st_mtime
+
+    @classmethod
+    def desde_ruta(cls, ruta):
+        """Registro para una ruta suelta (p.ej. un evento de inotify), sin DirEntry"""
+        return cls(_EntradaRuta(ruta))
+
+    def __repr__(self):
+        return f"RegistroArchivo({self.ruta!r})"
+
+
+class _EntradaRuta:
+    """Imita lo que RegistroArchivo usa de os.DirEntry, con el stat cacheado"""
+
+    __slots__ = ('name', 'path', '_stat')
+
+    def __init__(self, ruta):
+        self.path = ruta
+        self.name = os.path.basename(ruta)
+        self._stat = None
+
+    def stat(self):
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+
+def escanear(carpeta):
+    """
+    Genera los archivos de primer nivel de una carpeta en una sola pasada.
+    Usa el tipo que ya trae os.scandir (sin stat por entrada en Linux/Windows)
+    y entrega cada registro apenas se lee, sin esperar al listado completo.
+    """
+    with os.scandir(carpeta) as entradas:
+        for entrada in entradas:
+            try:
+                if entrada.is_file():
+                    yield RegistroArchivo(entrada)
+            except OSError:
+                # Enlace roto o entrada que desapareció durante el escaneo
+                continue
+
+
+def _coincide(nombre, relativa, patrones):
+    return any(fnmatch(nombre, p) or fnmatch(relativa, p) for p in patrones)
+
+
+def admitido(nombre, relativa, incluir=None, excluir=None):
+    """Filtro de archivos de recorrer(): pasa --incluir (si hay) y no cae en --excluir"""
+    if incluir and not _coincide(nombre, relativa, incluir):
+        return False
+    return not (excluir and _coincide(nombre, relativa, excluir))
+
+
+def recorrer(carpeta, max_profundidad=None, incluir=None, excluir=None, omitir=()):
+    """
+    Recorre un árbol de carpetas sin recursión, con una pila explícita de
+    iteradores os.scandir: la memoria crece con la profundidad, no con la
+    cantidad de archivos, y cada archivo se entrega en cuanto se lee.
+
+    max_profundidad: 0 = solo el primer nivel, None = sin límite
+    incluir / excluir: patrones glob sobre el nombre o la ruta relativa ('sub/*.pdf')
+    omitir: carpetas del primer nivel que no se visitan (las categorías ya creadas)
+    """
+    incluir = incluir or []
+    excluir = excluir or []
+    omitir = set(omitir)
+
+    pila = [(os.scandir(carpeta), 0, '')]
+    try:
+        while pila:
+            entradas, profundidad, prefijo = pila[-1]
+            entrada = next(entradas, None)
+
+            if entrada is None:
+                entradas.close()
+                pila.pop()
+                continue
+
+            relativa = prefijo + entrada.name
+
+            try:
+                if entrada.is_dir(follow_symlinks=False):
+                    if profundidad == 0 and entrada.name in omitir:
+                        continue
+                    if max_profundidad is not None and profundidad >= max_profundidad:
+                        continue
+                    if _coincide(entrada.name, relativa, excluir):
+                        continue
+                    pila.append((os.scandir(entrada.path), profundidad + 1, relativa + '/'))
+
+                elif entrada.is_file():
+                    if not admitido(entrada.name, relativa, incluir, excluir):
+                        continue
+                    yield RegistroArchivo(entrada)
+
+            except OSError:
+                # Sin permisos o entrada que desapareció: se salta, como el explorador
+                continue
+    finally:
+        for entradas, _, _ in pila:
+            entradas.close()
+
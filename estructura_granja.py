@@ -0,0 +1,115 @@
+import re
+
+LINEAS_MUESTRA = 40
+FILAS_DATOS_MUESTRA = 5   # Filas tras el candidato que deben parecer datos
+
+NUMERO = re.compile(r'^-?\d+(?:[.,]\d+)?$')
+
+
+def _es_numero(celda):
+    return bool(NUMERO.match(celda))
+
+
+def _etiqueta_grupo(texto):
+    """'SALIDAS SALIDAS A PLANTA' → 'SALIDAS', 'MODULO 1' → 'MODULO1'"""
+    palabras = re.findall(r'[A-Za-zÁÉÍÓÚÑáéíóúñ]+|\d+', texto.upper())
+    if not palabras:
+        return ''
+    numero = next((p for p in palabras[1:] if p.isdigit()), '')
+    return palabras[0] + numero
+
+
+def _nombre_columna(texto):
+    return re.sub(r'\s+', '_', texto.strip().upper())
+
+
+def detectar_encabezado(lineas, sep):
+    """
+    Analiza las primeras líneas crudas (una sola lectura) y devuelve la
+    estructura: fila del encabezado, nombres aplanados con los niveles de
+    grupo de arriba (ENTRADAS → MODULO 1 → ROTO = ENTRADAS_MODULO1_ROTO) y
+    cuántas columnas tienen datos (descarta las ;;;; vacías del final).
+    """
+    filas = [[celda.strip() for celda in linea.rstrip('\r\n').split(sep)] for linea in lineas]
+    no_vacias = [[i for i, celda in enumerate(fila) if celda] for fila in filas]
+
+    mejor, mejor_puntaje = None, 0.0
+    for i, fila in enumerate(filas):
+        if len(no_vacias[i]) < 2:
+            continue
+
+        ancho = no_vacias[i][-1] + 1
+        celdas = [fila[j] for j in no_vacias[i]]
+        densidad = len(celdas) / ancho
+        texto = sum(not _es_numero(c) for c in celdas) / len(celdas)
+
+        # Las filas siguientes deben ser datos: mayoría numérica en ese ancho
+        siguientes = [filas[k][:ancho] for k in range(i + 1, len(filas)) if no_vacias[k]]
+        siguientes = siguientes[:FILAS_DATOS_MUESTRA]
+        if not siguientes:
+            continue
+        numericas = sum(
+            sum(_es_numero(c) for c in fila_datos if c) / max(sum(1 for c in fila_datos if c), 1)
+            for fila_datos in siguientes
+        ) / len(siguientes)
+
+        puntaje = densidad * texto * numericas
+        if puntaje > mejor_puntaje:
+            mejor, mejor_puntaje = i, puntaje
+
+    if mejor is None:
+        return None
+
+    # Ancho útil: última columna con algo en el encabezado o en las filas de datos
+    ancho = max(
+        [no_vacias[mejor][-1]] +
+        [no_vacias[k][-1] for k in range(mejor + 1, len(filas)) if no_vacias[k]]
+    ) + 1
+
+    # Niveles de grupo: filas no vacías pegadas encima del encabezado
+    niveles = []
+    k = mejor - 1
+    while k >= 0 and no_vacias[k] and len(no_vacias[k]) < len(no_vacias[mejor]):
+        niveles.insert(0, filas[k])
+        k -= 1
+
+    prefijos = [[] for _ in range(ancho)]
+    for nivel in niveles:
+        actual = ''
+        for j in range(ancho):
+            celda = nivel[j] if j < len(nivel) else ''
+            if celda:
+                actual = _etiqueta_grupo(celda)
+            if actual:
+                prefijos[j].append(actual)
+
+    nombres = []
+    vistos = {}
+    for j in range(ancho):
+        base = _nombre_columna(filas[mejor][j]) if j < len(filas[mejor]) else ''
+        nombre = '_'.join(prefijos[j] + [base or f"COLUMNA_{j + 1}"])
+        if nombre in vistos:
+            vistos[nombre] += 1
+            nombre = f"{nombre}_{vistos[nombre]}"
+        else:
+            vistos[nombre] = 1
+        nombres.append(nombre)
+
+    return {
+        'fila_encabezado': mejor,
+        'niveles': len(niveles),
+        'nombres': nombres,
+        'ancho': ancho,
+        'puntaje': mejor_puntaje,
+    }
+
+
+def leer_lineas(ruta, encoding, n=LINEAS_MUESTRA):
+    """Primeras n líneas crudas del archivo, sin parsear"""
+    lineas = []
+    with open(ruta, 'r', encoding=encoding, errors='replace') as f:
+        for linea in f:
+            lineas.append(linea)
+            if len(lineas) >= n:
+                break
+    return lineas
@@ -0,0 +1,114 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from datetime import datetime
+
+# Decisiones que dejan el archivo en su lugar y se repetirían igual: solo esas se saltan.
+# 'movido' queda como historial: lo que aparezca después en esa ruta es otro archivo.
+SIN_PERMISO = 'sin_permiso'
+SALTABLES = (SIN_PERMISO,)
+
+
+class IndiceEstado:
+    """
+    Índice persistente (SQLite en logs/) de las entradas ya decididas.
+    Guarda ruta, tamaño, mtime y la decisión tomada para que las corridas
+    nocturnas salten en O(1) lo que no cambió.
+    """
+
+    def __init__(self, ruta_db="logs/indice_estado.db", lote=1000):
+        self.ruta_db = ruta_db
+        self.lote = lote
+        Path(ruta_db).parent.mkdir(parents=True, exist_ok=True)
+
+        # Los workers registran desde otros hilos; la escritura va bajo lock
+        self._conn = sqlite3.connect(ruta_db, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entradas (
+                ruta TEXT PRIMARY KEY,
+                tamano INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                decision TEXT NOT NULL,
+                destino TEXT,
+                actualizado TEXT NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+        self._lock = threading.Lock()
+        self._pendientes = []
+        self._conocidos = {}
+
+    def cargar(self, carpeta):
+        """Trae a memoria las entradas saltables bajo una carpeta: ruta → (tamaño, mtime)"""
+        prefijo = os.path.join(self._clave(carpeta), '')
+        marcas = ', '.join('?' * len(SALTABLES))
+        filas = self._conn.execute(
+            f"SELECT ruta, tamano, mtime FROM entradas WHERE ruta >= ? AND ruta < ? "
+            f"AND decision IN ({marcas})",
+            (prefijo, prefijo + "\uffff", *SALTABLES)
+        )
+        self._conocidos = {ruta: (tamano, mtime) for ruta, tamano, mtime in filas}
+        return len(self._conocidos)
+
+    def sin_cambios(self, registro):
+        """True si la entrada quedó en su lugar por una decisión saltable y no cambió"""
+        # El stat se hace siempre aquí: queda cacheado para registrar() tras mover
+        actual = (registro.tamano, registro.mtime)
+        return self._conocidos.get(self._clave(registro.ruta)) == actual
+
+    def registrar(self, registro, decision, destino=None):
+        """
+        Anota la decisión (se escribe por lotes). Llamar después de mover:
+        si la corrida se corta, lo no guardado simplemente se vuelve a evaluar.
+        El tamaño y mtime salen del stat cacheado por sin_cambios().
+        """
+        fila = (
+            self._clave(registro.ruta),
+            registro.tamano,
+            registro.mtime,
+            decision,
+            destino,
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        )
+        with self._lock:
+            self._pendientes.append(fila)
+            if len(self._pendientes) >= self.lote:
+                self._guardar()
+
+    def olvidar(self, rutas):
+        """Borra entradas (p.ej. archivos devueltos a su lugar por un deshacer)"""
+        with self._lock:
+            self._guardar()
+            self._conn.executemany(
+                "DELETE FROM entradas WHERE ruta = ?",
+                [(self._clave(ruta),) for ruta in rutas]
+            )
+            self._conn.commit()
+
+    def guardar(self):
+        with self._lock:
+            self._guardar()
+
+    def cerrar(self):
+        self.guardar()
+        self._conn.close()
+
+    def _guardar(self):
+        """Una transacción por lote (llamar con el lock tomado)"""
+        if not self._pendientes:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entradas "
+                "(ruta, tamano, mtime, decision, destino, actualizado) VALUES (?, ?, ?, ?, ?, ?)",
+                self._pendientes
+            )
+        self._pendientes.clear()
+
+    @staticmethod
+    def _clave(ruta):
+        # abspath no toca el disco (resolve() haría un lstat por componente)
+        return os.path.abspath(ruta)
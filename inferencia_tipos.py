@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+TAMANO_MUESTRA = 2000
+ESTRATOS = 20
+UMBRAL_CONFIANZA = 0.9        # Fracción de la muestra que debe encajar
+MAX_CARDINALIDAD = 0.05       # Únicos / muestra para considerar categórica
+
+# (formato de strptime, patrón completo que lo reconoce)
+FORMATOS_FECHA = [
+    ('%Y-%m-%d', r'\d{4}-\d{2}-\d{2}'),
+    ('%Y-%m-%d %H:%M:%S', r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}'),
+    ('%d/%m/%Y', r'\d{2}/\d{2}/\d{4}'),
+    ('%d-%m-%Y', r'\d{2}-\d{2}-\d{4}'),
+    ('%Y/%m/%d', r'\d{4}/\d{2}/\d{2}'),
+]
+
+PATRONES = {
+    'precio': r'\s*-?[$€£]\s*-?[\d,]+(?:\.\d+)?\s*|\s*-?[\d,]+(?:\.\d+)?\s*[$€£]\s*',
+    'porcentaje': r'\s*-?\d+(?:[.,]\d+)?\s*%\s*',
+    'entero': r'\s*-?\d+\s*',
+    'decimal': r'\s*-?\d*\.\d+\s*',
+}
+
+
+def muestra_estratificada(serie, tamano=TAMANO_MUESTRA, estratos=ESTRATOS):
+    """
+    Filas repartidas en `estratos` tramos de toda la columna (no solo las
+    primeras), sin nulos. No recorre la columna completa.
+    """
+    n = len(serie)
+    if n <= tamano:
+        return serie.dropna()
+
+    por_estrato = max(tamano // estratos, 1)
+    inicios = np.linspace(0, n - por_estrato, estratos).astype(int)
+    posiciones = (inicios[:, None] + np.arange(por_estrato)).ravel()
+    return serie.iloc[posiciones].dropna()
+
+
+def puntuar(muestra):
+    """
+    Confianza (0-1) de cada candidato sobre la muestra de una columna de texto.
+    Devuelve {candidato: (confianza, formato)}.
+    """
+    texto = muestra.astype(str)
+    n = len(texto)
+    if n == 0:
+        return {}
+
+    puntajes = {}
+    for formato, patron in FORMATOS_FECHA:
+        confianza = texto.str.fullmatch(patron).mean()
+        if confianza > puntajes.get('fecha', (0, None))[0]:
+            puntajes['fecha'] = (confianza, formato)
+
+    for candidato, patron in PATRONES.items():
+        puntajes[candidato] = (texto.str.fullmatch(patron).mean(), None)
+
+    unicos = texto.nunique()
+    puntajes['categoria'] = (1 - unicos / n if unicos / n <= MAX_CARDINALIDAD else 0.0, None)
+    return puntajes
+
+
+def inferir_columna(serie):
+    """(tipo, formato, confianza) de una columna; tipo None si no hay nada que convertir"""
+    if not (pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie)):
+        return None, None, 1.0
+
+    puntajes = puntuar(muestra_estratificada(serie))
+    # Prioridad ante empates: lo más específico primero
+    for tipo in ('fecha', 'precio', 'porcentaje', 'entero', 'decimal', 'categoria'):
+        confianza, formato = puntajes.get(tipo, (0, None))
+        if confianza >= UMBRAL_CONFIANZA:
+            return tipo, formato, float(confianza)
+
+    return None, None, 0.0
+
+
+def inferir_tipos(df):
+    """{col: (tipo, formato, confianza)} solo de las columnas a convertir"""
+    plan = {}
+    for col in df.columns:
+        tipo, formato, confianza = inferir_columna(df[col])
+        if tipo:
+            plan[col] = (tipo, formato, confianza)
+    return plan
+
+
+def a_entero(numeros):
+    """Int64 con nulos; un valor con decimales (1.5) no es entero y queda nulo"""
+    if pd.api.types.is_float_dtype(numeros):
+        numeros = numeros.where(numeros % 1 == 0)
+    return numeros.astype('Int64')
+
+
+def convertir_columna(serie, tipo, formato=None):
+    """
+    Conversión vectorizada con formato explícito (nunca el fallback de dateutil).
+    Lo que no encaja queda como nulo en vez de abortar la columna.
+    """
+    if tipo in ('precio', 'porcentaje', 'entero', 'decimal') and pd.api.types.is_numeric_dtype(serie):
+        # En streaming un chunk sin valores raros llega ya numérico desde read_csv
+        if tipo == 'entero':
+            return a_entero(serie)
+        return serie / 100 if tipo == 'porcentaje' else serie.astype(float)
+
+    if tipo == 'fecha':
+        return pd.to_datetime(serie, format=formato, errors='coerce')
+    if tipo == 'precio':
+        return pd.to_numeric(serie.str.replace(r'[$€£,\s]', '', regex=True), errors='coerce').astype(float)
+    if tipo == 'porcentaje':
+        limpio = serie.str.replace(r'[%\s]', '', regex=True).str.replace(',', '.', regex=False)
+        return pd.to_numeric(limpio, errors='coerce') / 100
+    if tipo == 'entero':
+        # Entero con nulos (Int64): mismo dtype en todos los chunks, tengan nulos o no
+        return a_entero(pd.to_numeric(serie.str.strip(), errors='coerce'))
+    if tipo == 'decimal':
+        return pd.to_numeric(serie.str.strip(), errors='coerce')
+    if tipo == 'categoria':
+        return serie.astype('category')
+    raise ValueError(f"Tipo desconocido: {tipo}")
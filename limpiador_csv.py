@@ -1,16 +1,49 @@
 import pandas as pd
-import numpy as np
 from pathlib import Path
 from datetime import datetime
 import re
+import time
+
+from almacen_columnar import FORMATOS, EscritorChunks, guardar
+from cache_parseo import CacheParseo, huella
+from detector_encoding import detectar_encoding, describir
+from duplicados_filas import HashesVistos, hashes_filas
+from inferencia_tipos import inferir_tipos, convertir_columna
+from optimizador_memoria import leer_optimizado, optimizar_dtypes
+from perfil_columnas import PerfilDatos
+from plan_limpieza import PlanLimpieza
+from reglas_limpieza import ReglasLimpieza
+from relleno_nulos import admitir_relleno, valores_relleno
+
+MENSAJES_TIPOS = {
+    'fecha': ("📅", "convertido a fecha"),
+    'precio': ("💰", "limpiado como precio"),
+    'porcentaje': ("📊", "convertido a decimal"),
+    'entero': ("🔢", "convertido a entero"),
+    'decimal': ("🔢", "convertido a decimal"),
+    'categoria': ("🏷️ ", "convertido a categoría"),
+}
 
 class LimpiadorCSV:
     """Limpia y analiza cualquier CSV automáticamente"""
     
-    def __init__(self, archivo_csv):
+    def __init__(self, archivo_csv, optimizar_memoria=False, formato='csv', claves_duplicados=None,
+                 usar_cache=True, reglas=None, grupo_nulos='lote', orden_nulos=None):
         self.archivo = archivo_csv
+        # ReglasLimpieza: reemplaza los pasos fijos (nombres, duplicados, tipos, nulos)
+        self.reglas = reglas
+        self.cache = CacheParseo() if usar_cache else None
+        self.clave_cache = None
+        self.tipos_cache = None
+        # Columnas que definen un duplicado (None = fila completa), ya normalizadas
+        self.claves_duplicados = [self.normalizar_nombre(c) for c in claves_duplicados or []] or None
+        # Relleno por grupo (mediana de cada lote) y orden del ffill (None = primera columna fecha)
+        self.grupo_nulos = self.normalizar_nombre(grupo_nulos) if grupo_nulos else None
+        self.orden_nulos = self.normalizar_nombre(orden_nulos) if orden_nulos else None
+        self.optimizar_memoria = optimizar_memoria
+        self.formato = formato
         self.df = None
-        self.df_original = None
+        self.plan = None
         self.reporte = {
             'archivo': archivo_csv,
             'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -24,21 +57,16 @@ class LimpiadorCSV:
         print(f"\n📂 Cargando: {self.archivo}\n")
         
         try:
-            # Intentar diferentes encodings
-            encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-            
-            for encoding in encodings:
+            if not self.cargar_de_cache():
+                encoding = self.detectar_encoding()
                 try:
-                    self.df = pd.read_csv(self.archivo, encoding=encoding)
-                    print(f"✅ Codificación detectada: {encoding}")
-                    break
-                except:
-                    continue
-            
-            if self.df is None:
-                raise Exception("No se pudo leer el archivo con ninguna codificación")
+                    self.df = self.leer(encoding)
+                except UnicodeDecodeError as e:
+                    self.df = self.leer(self.recodificar(e))
+                self.guardar_en_cache()
             
-            self.df_original = self.df.copy()
+            # Los pasos de limpieza solo anotan cambios; el original no se duplica
+            self.plan = PlanLimpieza(self.df)
             self.reporte['filas_originales'] = len(self.df)
             self.reporte['columnas_originales'] = len(self.df.columns)
             
@@ -49,6 +77,65 @@ class LimpiadorCSV:
             print(f"❌ Error al cargar: {str(e)}")
             return False
     
+    def cargar_de_cache(self):
+        """Mismo archivo y opciones que una corrida anterior: sin detección, parseo ni inferencia"""
+        if self.cache is None:
+            return False
+        
+        self.clave_cache = huella(self.archivo, {'limpiador': 'csv', 'optimizar_memoria': self.optimizar_memoria})
+        encontrado = self.cache.obtener(self.clave_cache)
+        if encontrado is None:
+            return False
+        
+        self.df, meta = encontrado
+        self.reporte['encoding'] = meta['encoding']
+        if 'memoria_carga' in meta:
+            self.reporte['memoria_carga'] = meta['memoria_carga']
+        if 'tipos' in meta:
+            self.tipos_cache = {col: tuple(valor) for col, valor in meta['tipos'].items()}
+        print(f"⚡ Parseo reutilizado de la caché ({describir(meta['encoding'])})")
+        return True
+    
+    def guardar_en_cache(self):
+        if self.clave_cache is None:
+            return
+        meta = {'archivo': str(self.archivo), 'encoding': self.reporte['encoding']}
+        if 'memoria_carga' in self.reporte:
+            meta['memoria_carga'] = self.reporte['memoria_carga']
+        self.cache.guardar(self.clave_cache, self.df, meta)
+    
+    def leer(self, encoding):
+        """read_csv completo; con optimizar_memoria el texto repetido entra como category"""
+        if not self.optimizar_memoria:
+            return pd.read_csv(self.archivo, encoding=encoding)
+        
+        # Las columnas que la inferencia va a convertir (fechas, precios...) siguen como texto
+        def a_convertir(muestra):
+            return [col for col, (tipo, _, _) in inferir_tipos(muestra).items() if tipo != 'categoria']
+        
+        df, resumen = leer_optimizado(self.archivo, excluir=a_convertir, encoding=encoding)
+        self.reporte['memoria_carga'] = resumen
+        print(f"🧠 Cargado con dtype=: {resumen['cargado_mb']:.1f} MB "
+              f"(≈{resumen['estimado_sin_mapa_mb']:.1f} MB sin optimizar, "
+              f"{len(resumen['mapa'])} columnas como category)")
+        return df
+    
+    def optimizar_dtypes(self):
+        """Angosta numéricos y pasa texto repetitivo a category en el frame final"""
+        resumen = optimizar_dtypes(self.df)
+        self.reporte['memoria'] = resumen
+        
+        print(f"🧠 Memoria: {resumen['antes_mb']:.1f} MB → {resumen['despues_mb']:.1f} MB")
+        for col, (antes, despues) in resumen['cambios'].items():
+            print(f"   {col:25} {antes:>10} → {despues}")
+        print()
+        
+        if resumen['cambios']:
+            self.reporte['cambios'].append(
+                f"Tipos angostados en {len(resumen['cambios'])} columnas "
+                f"({resumen['antes_mb']:.1f} → {resumen['despues_mb']:.1f} MB)"
+            )
+    
     def analizar_inicial(self):
         """Análisis rápido de calidad de datos"""
         print("="*70)
@@ -67,130 +154,204 @@ class LimpiadorCSV:
         
         print()
     
+    @staticmethod
+    def normalizar_nombre(col):
+        """Minúsculas, sin espacios ni caracteres especiales"""
+        nuevo = str(col).lower().strip()
+        nuevo = re.sub(r'[^a-z0-9]+', '_', nuevo)
+        return nuevo.strip('_')
+    
     def limpiar_nombres_columnas(self):
         """Normaliza nombres de columnas"""
         print("🧹 Limpiando nombres de columnas...")
         
-        columnas_nuevas = []
-        for col in self.df.columns:
-            # Convertir a minúsculas, reemplazar espacios y caracteres especiales
-            nuevo = col.lower().strip()
-            nuevo = re.sub(r'[^a-z0-9]+', '_', nuevo)
-            nuevo = nuevo.strip('_')
-            columnas_nuevas.append(nuevo)
-        
-        self.df.columns = columnas_nuevas
+        self.df.columns = [self.normalizar_nombre(col) for col in self.df.columns]
         self.reporte['cambios'].append("Nombres de columnas normalizados")
         print("✅ Columnas renombradas\n")
     
     def eliminar_duplicados(self):
-        """Elimina filas duplicadas"""
-        duplicados = self.df.duplicated().sum()
+        """Elimina filas duplicadas (toda la fila o solo las columnas clave)"""
+        duplicados = self.plan.descartar(self.plan.duplicadas(self.claves_duplicados))
         
         if duplicados > 0:
-            print(f"🗑️  Eliminando {duplicados} filas duplicadas...")
-            self.df = self.df.drop_duplicates()
-            self.reporte['cambios'].append(f"Eliminadas {duplicados} filas duplicadas")
+            print(f"🗑️  Eliminando {duplicados} filas duplicadas{self.texto_claves()}...")
+            self.reporte['cambios'].append(f"Eliminadas {duplicados} filas duplicadas{self.texto_claves()}")
             print("✅ Duplicados eliminados\n")
         else:
             print("✅ No hay duplicados\n")
     
+    def texto_claves(self):
+        return f" por ({', '.join(self.claves_duplicados)})" if self.claves_duplicados else ""
+    
     def manejar_nulos(self, estrategia='eliminar'):
         """Maneja valores nulos"""
-        nulos_totales = self.df.isna().sum().sum()
+        nulos_totales = self.plan.nulos()
         
         if nulos_totales > 0:
             print(f"🔧 Manejando {nulos_totales} valores nulos...")
             
             if estrategia == 'eliminar':
-                antes = len(self.df)
-                self.df = self.df.dropna()
-                eliminadas = antes - len(self.df)
+                eliminadas = self.plan.descartar(self.plan.con_nulos())
                 print(f"✅ Eliminadas {eliminadas} filas con nulos\n")
                 self.reporte['cambios'].append(f"Eliminadas {eliminadas} filas con nulos")
             
             elif estrategia == 'rellenar':
                 # Rellenar numéricos con mediana, texto con "Desconocido"
-                for col in self.df.columns:
-                    if self.df[col].dtype in ['int64', 'float64']:
-                        self.df[col].fillna(self.df[col].median(), inplace=True)
-                    else:
-                        self.df[col].fillna("Desconocido", inplace=True)
+                self.plan.rellenar('mediana')
                 print("✅ Nulos rellenados\n")
                 self.reporte['cambios'].append("Nulos rellenados con valores por defecto")
+            
+            elif estrategia in ('rellenar_grupo', 'ffill'):
+                self.rellenar_por_grupo(estrategia)
         else:
             print("✅ No hay valores nulos\n")
     
+    def rellenar_por_grupo(self, estrategia):
+        """Mediana de cada grupo o último valor conocido por fecha; lo que queda, con la mediana global"""
+        columnas = self.plan.df.columns
+        grupo = self.grupo_nulos if self.grupo_nulos in columnas else None
+        orden = self.orden_nulos or next(
+            (col for col, (tipo, _) in self.plan.conversiones.items() if tipo == 'fecha'), None)
+        if orden is not None and orden not in columnas:
+            print(f"⚠️  No existe la columna de orden '{orden}', se usa el orden del archivo")
+            orden = None
+        
+        if estrategia == 'rellenar_grupo' and grupo is None:
+            print(f"⚠️  No existe la columna de grupo '{self.grupo_nulos}', se usa la mediana global")
+            self.plan.rellenar('mediana')
+            self.reporte['cambios'].append("Nulos rellenados con valores por defecto")
+            return
+        
+        if estrategia == 'rellenar_grupo':
+            self.plan.rellenar('mediana_grupo', grupo=grupo)
+            texto = f"Nulos rellenados con la mediana de cada '{grupo}'"
+        else:
+            self.plan.rellenar('ffill', grupo=grupo, orden=orden)
+            texto = (f"Nulos rellenados con el último valor conocido"
+                     f"{f' por {orden}' if orden else ''}{f' dentro de cada {grupo}' if grupo else ''}")
+        print(f"✅ {texto}\n")
+        self.reporte['cambios'].append(texto)
+    
     def detectar_y_limpiar_tipos(self):
         """Detecta y limpia tipos de datos comunes"""
         print("🔧 Detectando tipos de datos...\n")
         
-        for col in self.df.columns:
-            muestra = self.df[col].dropna().astype(str).head(10)
-            
-            # Detectar fechas
-            if any(re.match(r'\d{4}-\d{2}-\d{2}', str(val)) for val in muestra):
-                try:
-                    self.df[col] = pd.to_datetime(self.df[col])
-                    print(f"  📅 {col} → Convertido a fecha")
-                    self.reporte['cambios'].append(f"{col} convertido a fecha")
-                except:
-                    pass
-            
-            # Detectar precios/monedas
-            elif any(re.search(r'[$€£]', str(val)) for val in muestra):
-                try:
-                    self.df[col] = self.df[col].str.replace(r'[$€£,]', '', regex=True).astype(float)
-                    print(f"  💰 {col} → Limpiado como precio")
-                    self.reporte['cambios'].append(f"{col} limpiado como precio")
-                except:
-                    pass
-            
-            # Detectar porcentajes
-            elif any('%' in str(val) for val in muestra):
-                try:
-                    self.df[col] = self.df[col].str.replace('%', '').astype(float) / 100
-                    print(f"  📊 {col} → Convertido a decimal")
-                    self.reporte['cambios'].append(f"{col} convertido a decimal")
-                except:
-                    pass
+        # Se convierte antes de manejar nulos: lo que no encaja ya cuenta como nulo
+        for col, (tipo, formato, confianza) in self.detectar_tipos(self.df).items():
+            coercionados = self.plan.convertir(col, tipo, formato)
+            emoji, texto = MENSAJES_TIPOS[tipo]
+            print(f"  {emoji} {col} → {texto.capitalize()} (confianza {confianza:.0%})")
+            if coercionados:
+                print(f"     ⚠️  {coercionados} valores no convertibles quedan nulos")
         
         print()
     
+    def aplicar_reglas(self):
+        """Limpieza declarativa: una pasada por columna y un solo filtrado de filas"""
+        print(f"📜 Aplicando reglas de {self.reglas.origen}...")
+        self.df = self.reglas.aplicar(self.df)
+        self.plan = PlanLimpieza(self.df)
+        self.informar_reglas()
+    
+    def informar_reglas(self):
+        for linea in self.reglas.resumen():
+            print(f"   • {linea}")
+        print()
+        self.reporte['cambios'].extend(self.reglas.resumen())
+    
+    def detectar_tipos(self, df):
+        """Infiere el tipo de cada columna con una muestra estratificada: {col: (tipo, formato, confianza)}"""
+        inicio = time.perf_counter()
+        if self.tipos_cache is not None:
+            plan = self.tipos_cache
+        else:
+            plan = inferir_tipos(df)
+            if self.clave_cache is not None:
+                self.cache.actualizar(self.clave_cache, tipos=plan)
+        
+        self.reporte['tipos'] = {
+            col: {'tipo': tipo, 'formato': formato, 'confianza': round(confianza, 3)}
+            for col, (tipo, formato, confianza) in plan.items()
+        }
+        self.reporte['segundos_inferencia'] = time.perf_counter() - inicio
+        return plan
+    
+    def aplicar_tipos(self, df, plan, informar=False):
+        """Convierte las columnas según el plan (sirve para el DataFrame completo o un chunk)"""
+        for col, (tipo, formato, confianza) in plan.items():
+            df[col] = convertir_columna(df[col], tipo, formato)
+            
+            if informar:
+                emoji, texto = MENSAJES_TIPOS[tipo]
+                print(f"  {emoji} {col} → {texto.capitalize()} (confianza {confianza:.0%})")
+                self.reporte['cambios'].append(f"{col} {texto}")
+        
+        return df
+    
     def generar_estadisticas(self):
-        """Genera estadísticas descriptivas"""
+        """Genera estadísticas descriptivas (una pasada por columna)"""
+        # Sobre el frame ya materializado: conversiones y relleno no se repiten por columna
+        perfil = PerfilDatos()
+        perfil.agregar(self.df)
+        self.mostrar_estadisticas(perfil)
+    
+    def mostrar_estadisticas(self, perfil):
+        """Imprime un PerfilDatos: describe() de las numéricas y top 5 de las categóricas"""
         print("="*70)
         print("📊 ESTADÍSTICAS DESCRIPTIVAS")
         print("="*70)
         print()
         
         # Columnas numéricas
-        numericas = self.df.select_dtypes(include=[np.number]).columns
-        if len(numericas) > 0:
+        numericas = perfil.numericas()
+        if not numericas.empty:
             print("Columnas numéricas:")
-            print(self.df[numericas].describe().round(2))
+            print(numericas.round(2))
             print()
         
         # Columnas categóricas (mostrar top 5 valores)
-        categoricas = self.df.select_dtypes(include=['object']).columns
-        if len(categoricas) > 0:
+        categoricas = perfil.categoricas()
+        if categoricas:
             print("\nColumnas categóricas (Top 5 valores):")
-            for col in categoricas:
+            for col, top5 in categoricas.items():
                 print(f"\n  {col}:")
-                top5 = self.df[col].value_counts().head(5)
-                for valor, cantidad in top5.items():
+                for valor, cantidad in top5:
                     print(f"    - {valor}: {cantidad}")
         
         print()
     
+    def materializar(self):
+        """Único punto donde se construye el frame final a partir del plan"""
+        conversiones = dict(self.plan.conversiones)
+        self.df = None
+        self.df = self.plan.materializar()
+        
+        for col, (tipo, _) in conversiones.items():
+            if col in self.plan.fallidas:
+                print(f"⚠️  {col}: la conversión falló, se conserva como texto")
+                continue
+            self.reporte['cambios'].append(f"{col} {MENSAJES_TIPOS[tipo][1]}")
+            if self.plan.coercionados.get(col):
+                self.reporte['cambios'].append(
+                    f"{col}: {self.plan.coercionados[col]} valores no convertibles quedaron nulos"
+                )
+    
     def guardar_limpio(self, sufijo='_limpio'):
-        """Guarda el CSV limpio"""
-        archivo_salida = Path(self.archivo).stem + sufijo + '.csv'
-        self.df.to_csv(archivo_salida, index=False, encoding='utf-8')
+        """Guarda el archivo limpio (CSV, parquet o feather según self.formato)"""
+        if self.optimizar_memoria:
+            self.optimizar_dtypes()
+        
+        archivo_salida = guardar(self.df, Path(self.archivo).stem + sufijo, self.formato)
         
         print(f"💾 Archivo limpio guardado: {archivo_salida}")
         
-        # Guardar reporte
+        self.escribir_reporte(len(self.df), len(self.df.columns))
+        
+        return archivo_salida
+    
+    def escribir_reporte(self, filas_finales, columnas_finales):
+        """Guarda el reporte de cambios junto al CSV limpio"""
+        self.reporte['filas_finales'] = filas_finales
         reporte_file = Path(self.archivo).stem + '_reporte.txt'
         with open(reporte_file, 'w', encoding='utf-8') as f:
             f.write(f"REPORTE DE LIMPIEZA - {self.reporte['timestamp']}\n")
@@ -198,15 +359,28 @@ class LimpiadorCSV:
             f.write(f"Archivo original: {self.reporte['archivo']}\n")
             f.write(f"Filas originales: {self.reporte['filas_originales']}\n")
             f.write(f"Columnas originales: {self.reporte['columnas_originales']}\n")
-            f.write(f"Filas finales: {len(self.df)}\n")
-            f.write(f"Columnas finales: {len(self.df.columns)}\n\n")
+            if 'encoding' in self.reporte:
+                f.write(f"Codificación: {describir(self.reporte['encoding'])}\n")
+            f.write(f"Filas finales: {filas_finales}\n")
+            f.write(f"Columnas finales: {columnas_finales}\n\n")
             f.write("CAMBIOS REALIZADOS:\n")
             for cambio in self.reporte['cambios']:
                 f.write(f"  • {cambio}\n")
+            
+            if 'memoria' in self.reporte:
+                memoria = self.reporte['memoria']
+                f.write(f"\nMEMORIA (memory_usage deep): {memoria['antes_mb']:.1f} MB → "
+                        f"{memoria['despues_mb']:.1f} MB\n")
+                for col, (antes, despues) in memoria['cambios'].items():
+                    f.write(f"  • {col}: {antes} → {despues}\n")
+            
+            if self.reporte.get('tipos'):
+                f.write("\nTIPOS INFERIDOS:\n")
+                for col, info in self.reporte['tipos'].items():
+                    formato = f" [{info['formato']}]" if info['formato'] else ""
+                    f.write(f"  • {col}: {info['tipo']}{formato} (confianza {info['confianza']:.0%})\n")
         
         print(f"📄 Reporte guardado: {reporte_file}\n")
-        
-        return archivo_salida
     
     def pipeline_completo(self, manejar_nulos='eliminar'):
         """Ejecuta todo el proceso de limpieza"""
@@ -214,10 +388,14 @@ class LimpiadorCSV:
             return False
         
         self.analizar_inicial()
-        self.limpiar_nombres_columnas()
-        self.eliminar_duplicados()
-        self.detectar_y_limpiar_tipos()
-        self.manejar_nulos(estrategia=manejar_nulos)
+        if self.reglas is not None:
+            self.aplicar_reglas()
+        else:
+            self.limpiar_nombres_columnas()
+            self.eliminar_duplicados()
+            self.detectar_y_limpiar_tipos()
+            self.manejar_nulos(estrategia=manejar_nulos)
+        self.materializar()
         self.generar_estadisticas()
         
         archivo_limpio = self.guardar_limpio()
@@ -229,6 +407,119 @@ class LimpiadorCSV:
         print(f"Archivo limpio: {archivo_limpio}\n")
         
         return True
+    
+    def detectar_encoding(self):
+        """Elige la codificación con una muestra acotada, antes de parsear nada"""
+        deteccion = detectar_encoding(self.archivo)
+        self.reporte['encoding'] = deteccion
+        print(f"✅ Codificación detectada: {describir(deteccion)}")
+        return deteccion['encoding']
+    
+    def recodificar(self, error):
+        """La muestra parecía UTF-8 pero el resto no: única re-lectura posible, en cp1252"""
+        print(f"⚠️  UTF-8 inválido fuera de la muestra ({error.reason}), se usa cp1252")
+        self.reporte['encoding'].update(encoding='cp1252', motivo='UTF-8 inválido fuera de la muestra')
+        return 'cp1252'
+    
+    def pipeline_streaming(self, chunksize, manejar_nulos='eliminar'):
+        """
+        Limpia el CSV por chunks con memoria constante: nombres, tipos (detectados
+        en el primer chunk), nulos y duplicados entre chunks se resuelven chunk a
+        chunk y cada uno se escribe directo al _limpio.csv.
+        """
+        print(f"\n📂 Procesando en streaming: {self.archivo} (chunks de {chunksize:,} filas)\n")
+        
+        encoding = self.detectar_encoding()
+        try:
+            return self._procesar_streaming(encoding, chunksize, manejar_nulos)
+        except UnicodeDecodeError as e:
+            # Se reescribe la salida desde cero con la codificación corregida
+            self.reporte.update(filas_originales=0, cambios=[])
+            if self.reglas is not None:
+                self.reglas.reiniciar()
+            return self._procesar_streaming(self.recodificar(e), chunksize, manejar_nulos)
+    
+    def _procesar_streaming(self, encoding, chunksize, manejar_nulos):
+        if manejar_nulos not in ('eliminar', 'rellenar'):
+            # Mediana por grupo y ffill necesitan ver el archivo completo
+            print(f"❌ --nulos {manejar_nulos} no está disponible en streaming (usar eliminar o rellenar)\n")
+            return False
+        escritor = EscritorChunks(Path(self.archivo).stem + '_limpio', self.formato)
+        perfil = PerfilDatos()
+        vistos = self.reglas.vistos if self.reglas is not None else HashesVistos()
+        plan_tipos = None
+        rellenos = None
+        duplicados = nulos = filas_finales = columnas_finales = 0
+        
+        # El archivo se cierra también si un chunk falla (p.ej. UnicodeDecodeError y reintento)
+        with escritor:
+            lector = pd.read_csv(self.archivo, encoding=encoding, chunksize=chunksize)
+            for n_chunk, chunk in enumerate(lector):
+                self.reporte['filas_originales'] += len(chunk)
+                if n_chunk == 0:
+                    self.reporte['columnas_originales'] = len(chunk.columns)
+            
+                if self.reglas is not None:
+                    # Las reglas guardan rellenos y duplicados vistos de un chunk al siguiente
+                    chunk = self.reglas.aplicar(chunk)
+                else:
+                    if plan_tipos is None:
+                        nombres = [self.normalizar_nombre(col) for col in chunk.columns]
+                        self.reporte['cambios'].append("Nombres de columnas normalizados")
+                    chunk.columns = nombres
+                
+                    # Duplicados: dentro del chunk y contra los hashes de chunks anteriores
+                    nuevos = vistos.nuevas(hashes_filas(chunk, self.claves_duplicados))
+                    duplicados += int((~nuevos).sum())
+                    chunk = chunk[nuevos]
+                
+                    if plan_tipos is None:
+                        plan_tipos = self.detectar_tipos(chunk)
+                    chunk = self.aplicar_tipos(chunk, plan_tipos, informar=n_chunk == 0)
+                
+                    nulos += int(chunk.isna().sum().sum())
+                    if manejar_nulos == 'eliminar':
+                        chunk = chunk.dropna()
+                    elif manejar_nulos == 'rellenar':
+                        if rellenos is None:
+                            # Las medianas salen del primer chunk: no hay segunda pasada
+                            rellenos = valores_relleno(chunk)
+                        for col in chunk.select_dtypes(include='category').columns:
+                            chunk[col] = admitir_relleno(chunk[col])
+                        chunk = chunk.fillna(rellenos)
+            
+                escritor.escribir(chunk)
+                perfil.agregar(chunk)
+                filas_finales += len(chunk)
+                columnas_finales = len(chunk.columns)
+            
+                print(f"  📦 Chunk {n_chunk + 1}: {self.reporte['filas_originales']:,} filas leídas", end='\r')
+        
+            archivo_salida = escritor.cerrar()
+        print("\n")
+        if self.reglas is not None:
+            self.informar_reglas()
+        if duplicados:
+            self.reporte['cambios'].append(f"Eliminadas {duplicados} filas duplicadas{self.texto_claves()}")
+        print(f"🔑 Hashes de duplicados en memoria: {len(vistos):,} ({vistos.memoria_mb():.1f} MB)\n")
+        if nulos:
+            if manejar_nulos == 'eliminar':
+                self.reporte['cambios'].append(f"Eliminadas filas con nulos ({nulos} valores nulos)")
+            else:
+                self.reporte['cambios'].append("Nulos rellenados con valores por defecto")
+        
+        self.mostrar_estadisticas(perfil)
+        
+        print(f"💾 Archivo limpio guardado: {archivo_salida}")
+        self.escribir_reporte(filas_finales, columnas_finales)
+        
+        print("="*70)
+        print("✅ PROCESO COMPLETADO")
+        print("="*70)
+        print(f"\nReducción de datos: {self.reporte['filas_originales']} → {filas_finales} filas")
+        print(f"Archivo limpio: {archivo_salida}\n")
+        
+        return True
 
 
 def main():
@@ -247,19 +538,82 @@ def main():
     
     parser.add_argument(
         '--nulos',
-        choices=['eliminar', 'rellenar'],
-        default='eliminar',
-        help='Estrategia para valores nulos'
+        choices=['eliminar', 'rellenar', 'rellenar_grupo', 'ffill'],
+        default=None,
+        help='Estrategia para valores nulos (por defecto, eliminar; rellenar_grupo: mediana por '
+             '--grupo; ffill: último valor conocido por --orden dentro de cada --grupo)'
+    )
+    
+    parser.add_argument(
+        '--grupo',
+        default='lote',
+        help='Columna de grupo para rellenar_grupo y ffill (por defecto, lote)'
+    )
+    
+    parser.add_argument(
+        '--orden',
+        default=None,
+        help='Columna que ordena el ffill (por defecto, la primera columna de fechas)'
+    )
+    
+    parser.add_argument(
+        '--chunksize',
+        type=int,
+        default=None,
+        help='Procesa el archivo en streaming, N filas por chunk (memoria constante)'
+    )
+    
+    parser.add_argument(
+        '--optimizar-memoria',
+        action='store_true',
+        help='Carga el texto repetitivo como category y angosta los numéricos'
+    )
+    
+    parser.add_argument(
+        '--formato',
+        choices=FORMATOS,
+        default='csv',
+        help='Formato del archivo limpio (parquet/feather conservan tipos y requieren pyarrow)'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='No usar ni guardar la caché de parseo (.cache_limpieza)'
+    )
+    
+    parser.add_argument(
+        '--reglas',
+        default=None,
+        help='Especificación JSON de limpieza (renombres, tipos, rangos, nulos, duplicados); '
+             'reemplaza a --nulos y --claves, que se definen dentro del JSON'
+    )
+    
+    parser.add_argument(
+        '--claves',
+        default=None,
+        help='Columnas que definen un duplicado, separadas por comas (por defecto, la fila completa)'
     )
     
     args = parser.parse_args()
+    if args.reglas and (args.nulos or args.claves):
+        parser.error('--reglas no se combina con --nulos ni --claves: usar "nulos" y "duplicados" en el JSON')
+    nulos = args.nulos or 'eliminar'
     
     if not Path(args.archivo).exists():
         print(f"\n❌ Error: El archivo '{args.archivo}' no existe\n")
         return
     
-    limpiador = LimpiadorCSV(args.archivo)
-    limpiador.pipeline_completo(manejar_nulos=args.nulos)
+    claves = args.claves.split(',') if args.claves else None
+    reglas = ReglasLimpieza.cargar(args.reglas) if args.reglas else None
+    limpiador = LimpiadorCSV(args.archivo, optimizar_memoria=args.optimizar_memoria,
+                             formato=args.formato, claves_duplicados=claves,
+                             usar_cache=not args.no_cache, reglas=reglas,
+                             grupo_nulos=args.grupo, orden_nulos=args.orden)
+    if args.chunksize:
+        limpiador.pipeline_streaming(args.chunksize, manejar_nulos=nulos)
+    else:
+        limpiador.pipeline_completo(manejar_nulos=nulos)
 
 
 if __name__ == "__main__":
@@ -2,14 +2,40 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime
+import io
 import re
 
+from almacen_columnar import FORMATOS, guardar
+from cache_parseo import CacheParseo, huella
+from detector_encoding import detectar_encoding, describir
+from duplicados_filas import DuplicadosFilas
+from estructura_granja import detectar_encabezado, leer_lineas
+from optimizador_memoria import leer_optimizado, optimizar_dtypes
+from perfil_columnas import PerfilDatos
+from reglas_limpieza import ReglasLimpieza
+from validador_granja import ValidadorGranja
+
 class LimpiadorGranja:
     """Limpiador especializado para CSVs de granja avícola"""
     
-    def __init__(self, archivo_csv):
+    def __init__(self, archivo_csv, optimizar_memoria=False, formato='csv', interactivo=False,
+                 claves_duplicados=None, usar_cache=True, reglas=None):
         self.archivo = archivo_csv
+        # ReglasLimpieza del formato de lote: reemplaza duplicados y columnas inútiles
+        self.reglas = reglas
+        self.cache = CacheParseo() if usar_cache else None
+        self.clave_cache = None
+        self.interactivo = interactivo
+        # p.ej. ['FECHA']: un día repetido es duplicado aunque cambien los conteos
+        self.claves_duplicados = [c.strip().upper() for c in claves_duplicados or []] or None
+        self.estructura = None
+        self.lineas = []        # Primeras líneas crudas (detectar_estructura)
+        self.perfil = None
+        self.validador = None
+        self.optimizar_memoria = optimizar_memoria
+        self.formato = formato
         self.df = None
+        self.encoding = 'utf-8'
         self.reporte = {
             'archivo': archivo_csv,
             'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -18,12 +44,18 @@ class LimpiadorGranja:
         }
     
     def detectar_estructura(self):
-        """Analiza la estructura del CSV antes de procesarlo"""
+        """Analiza la estructura del CSV antes de procesarlo (una sola lectura de las primeras líneas)"""
         print(f"\n🔍 ANALIZANDO ESTRUCTURA: {Path(self.archivo).name}\n")
         
+        # Codificación decidida con una muestra acotada, antes de cualquier parseo
+        deteccion = detectar_encoding(self.archivo)
+        self.encoding = deteccion['encoding']
+        self.reporte['encoding'] = deteccion
+        print(f"✅ Codificación detectada: {describir(deteccion)}")
+        
         # Leer primeras líneas raw
-        with open(self.archivo, 'r', encoding='utf-8') as f:
-            primeras_lineas = [f.readline() for _ in range(10)]
+        lineas = leer_lineas(self.archivo, self.encoding)
+        primeras_lineas = lineas[:10]
         
         # Detectar delimitador
         delimitadores = [';', ',', '\t', '|']
@@ -40,50 +72,128 @@ class LimpiadorGranja:
             print(f"   {i}. {preview.strip()}")
         
         print()
+        
+        # Encabezado: fila más densa y textual seguida de filas numéricas
+        self.estructura = detectar_encabezado(lineas, delimitador_real)
+        self.lineas = lineas
         return delimitador_real
     
     def cargar_inteligente(self):
-        """Carga el CSV detectando automáticamente la estructura"""
+        """Carga el CSV detectando automáticamente la estructura (un solo parseo, sin preguntas)"""
+        if self.cargar_de_cache():
+            return True
+        correcciones_previas = len(self.reporte['correcciones_aplicadas'])
+        
         delimitador = self.detectar_estructura()
         
-        # Intentar diferentes configuraciones
-        configs = [
-            {'sep': delimitador, 'skiprows': 0},
-            {'sep': delimitador, 'skiprows': 1},
-            {'sep': delimitador, 'skiprows': 2},
-            {'sep': delimitador, 'skiprows': 3},
-            {'sep': delimitador, 'skiprows': 4},
-        ]
-        
-        print("🔧 Probando diferentes configuraciones de carga...\n")
-        
-        for i, config in enumerate(configs, 1):
-            try:
-                df_test = pd.read_csv(self.archivo, **config, encoding='utf-8')
-                
-                # Verificar si tiene sentido
-                if len(df_test.columns) > 1 and len(df_test) > 0:
-                    print(f"✅ Configuración {i} FUNCIONA:")
-                    print(f"   - Columnas: {len(df_test.columns)}")
-                    print(f"   - Filas: {len(df_test)}")
-                    print(f"   - Skiprows: {config['skiprows']}")
-                    print(f"   - Columnas: {list(df_test.columns[:5])}")
-                    
-                    respuesta = input("\n¿Usar esta configuración? (s/n): ").lower()
-                    if respuesta == 's':
-                        self.df = df_test
-                        self.reporte['correcciones_aplicadas'].append(
-                            f"Cargado con sep='{delimitador}', skiprows={config['skiprows']}"
-                        )
-                        return True
-                    print()
+        if self.estructura is None:
+            print("⚠️  No se reconoció un encabezado: se usa la primera fila\n")
+            opciones = {'sep': delimitador, 'encoding': self.encoding}
+        else:
+            e = self.estructura
+            print(f"✅ Encabezado en la línea {e['fila_encabezado'] + 1} "
+                  f"({e['niveles']} niveles de grupo arriba)")
+            print(f"   - Columnas con datos: {e['ancho']}")
+            print(f"   - Columnas: {e['nombres'][:5]}\n")
+            opciones = {
+                'sep': delimitador,
+                'encoding': self.encoding,
+                'header': None,
+                'skiprows': e['fila_encabezado'] + 1,
+                'names': e['nombres'],
+                'usecols': range(e['ancho']),
+            }
+        
+        try:
+            if self.optimizar_memoria:
+                # El texto repetido (DIA...) entra directo como category. El mapa sale
+                # de las líneas que ya leyó detectar_estructura: el archivo se parsea una vez
+                en_memoria = {k: v for k, v in opciones.items() if k != 'encoding'}
+                muestra = pd.read_csv(io.StringIO(''.join(self.lineas)), **en_memoria)
+                self.df, resumen = leer_optimizado(self.archivo, muestra=muestra, **opciones)
+                print(f"🧠 Cargado con dtype=: {resumen['cargado_mb']:.2f} MB "
+                      f"({len(resumen['mapa'])} columnas como category)\n")
+            else:
+                self.df = pd.read_csv(self.archivo, **opciones)
+        except (ValueError, pd.errors.ParserError) as e:
+            print(f"❌ No se pudo cargar: {str(e)}")
+            print("📝 Recomendación: Revisar el archivo manualmente\n")
+            return False
+        
+        # Filas ;;;; vacías (al final de la planilla)
+        vacias = self.df.isna().all(axis=1)
+        if vacias.any():
+            self.df = self.df[~vacias]
             
-            except Exception as e:
-                print(f"❌ Configuración {i} falló: {str(e)[:50]}...")
+            # Esas filas habían convertido los conteos a float: vuelven a ser enteros
+            flotantes = self.df.select_dtypes(include='float').columns
+            enteras = [col for col in flotantes if (self.df[col].dropna() % 1 == 0).all()]
+            self.df = self.df.astype({col: 'Int64' for col in enteras})
+        
+        print(f"📏 Cargado: {len(self.df)} filas × {len(self.df.columns)} columnas\n")
+        
+        if self.estructura is not None:
+            self.reporte['correcciones_aplicadas'].append(
+                f"Cargado con sep='{delimitador}', encabezado en línea {self.estructura['fila_encabezado'] + 1}, "
+                f"{self.estructura['niveles']} niveles aplanados, {self.estructura['ancho']} columnas útiles"
+            )
+        if vacias.any():
+            self.reporte['correcciones_aplicadas'].append(f"Eliminadas {int(vacias.sum())} filas vacías")
+        
+        self.guardar_en_cache(self.reporte['correcciones_aplicadas'][correcciones_previas:])
+        return True
+    
+    def cargar_de_cache(self):
+        """Mismo archivo y opciones que una corrida anterior: sin detectar estructura ni parsear"""
+        if self.cache is None:
+            return False
+        
+        self.clave_cache = huella(self.archivo, {'limpiador': 'granja', 'optimizar_memoria': self.optimizar_memoria})
+        encontrado = self.cache.obtener(self.clave_cache)
+        if encontrado is None:
+            return False
+        
+        self.df, meta = encontrado
+        self.encoding = meta['encoding']['encoding']
+        self.reporte['encoding'] = meta['encoding']
+        self.estructura = meta['estructura']
+        self.reporte['correcciones_aplicadas'].extend(meta['correcciones'])
         
-        print("\n⚠️  No se encontró configuración automática óptima")
-        print("📝 Recomendación: Revisar el archivo manualmente\n")
-        return False
+        print(f"\n⚡ {Path(self.archivo).name}: estructura y parseo reutilizados de la caché")
+        print(f"📏 Cargado: {len(self.df)} filas × {len(self.df.columns)} columnas\n")
+        return True
+    
+    def guardar_en_cache(self, correcciones):
+        if self.clave_cache is None:
+            return
+        self.cache.guardar(self.clave_cache, self.df, {
+            'archivo': str(self.archivo),
+            'encoding': self.reporte['encoding'],
+            'estructura': self.estructura,
+            'correcciones': correcciones,
+        })
+    
+    def aplicar_reglas(self):
+        """Reglas declarativas: una pasada por columna y un solo filtrado de filas"""
+        print(f"📜 Aplicando reglas de {self.reglas.origen}...")
+        self.df = self.reglas.aplicar(self.df)
+        resumen = self.reglas.resumen()
+        for linea in resumen:
+            print(f"   • {linea}")
+        print()
+        self.reporte['correcciones_aplicadas'].extend(resumen)
+    
+    def optimizar_dtypes(self):
+        """Conteos a enteros angostos y códigos repetidos (DIA, SEM...) a category"""
+        resumen = optimizar_dtypes(self.df)
+        self.reporte['memoria'] = resumen
+        
+        print(f"🧠 Memoria: {resumen['antes_mb']:.2f} MB → {resumen['despues_mb']:.2f} MB "
+              f"({len(resumen['cambios'])} columnas angostadas)\n")
+        if resumen['cambios']:
+            self.reporte['correcciones_aplicadas'].append(
+                f"Tipos angostados: {resumen['antes_mb']:.2f} → {resumen['despues_mb']:.2f} MB"
+            )
     
     def limpiar_columnas(self):
         """Limpia y normaliza nombres de columnas"""
@@ -96,8 +206,8 @@ class LimpiadorGranja:
             # Convertir a string y limpiar
             col_str = str(col).strip().upper()
             
-            # Remover caracteres especiales excepto espacios
-            col_limpio = re.sub(r'[^A-Z0-9\s]', '', col_str)
+            # Remover caracteres especiales excepto espacios y '_' (niveles aplanados)
+            col_limpio = re.sub(r'[^A-Z0-9_\s]', '', col_str)
             
             # Reemplazar espacios múltiples
             col_limpio = re.sub(r'\s+', '_', col_limpio)
@@ -132,13 +242,14 @@ class LimpiadorGranja:
         # Información general
         print(f"📏 Dimensiones: {len(self.df)} filas × {len(self.df.columns)} columnas\n")
         
-        # Análisis por columna
+        # Análisis por columna: un solo recorrido que también usa detectar_columnas_inutiles
         problemas = []
+        self.perfil = PerfilDatos().agregar(self.df)
         
         for col in self.df.columns:
-            nulos = self.df[col].isna().sum()
+            nulos = self.perfil.columnas[col].nulos
             nulos_pct = (nulos / len(self.df)) * 100
-            unicos = self.df[col].nunique()
+            unicos = self.perfil.columnas[col].distintos()
             
             print(f"  {col[:30]:30} | Nulos: {nulos:4} ({nulos_pct:5.1f}%) | Únicos: {unicos:4}")
             
@@ -159,23 +270,25 @@ class LimpiadorGranja:
             self.reporte['problemas_encontrados'].extend(problemas)
     
     def limpiar_duplicados_inteligente(self):
-        """Elimina duplicados considerando toda la fila"""
+        """Elimina duplicados por fila completa (o por las columnas clave) con un solo hash por fila"""
         print("🗑️  Buscando filas duplicadas...\n")
         
-        duplicados = self.df.duplicated().sum()
+        duplicadas = DuplicadosFilas(self.df, self.claves_duplicados)
+        duplicados = duplicadas.contar()
+        criterio = f"por ({', '.join(self.claves_duplicados)})" if self.claves_duplicados \
+            else "completamente"
         
         if duplicados > 0:
-            print(f"⚠️  Encontradas {duplicados} filas completamente duplicadas")
+            print(f"⚠️  Encontradas {duplicados} filas {criterio} duplicadas")
             print(f"   Porcentaje: {(duplicados/len(self.df)*100):.1f}%\n")
             
             # Mostrar ejemplo
-            if duplicados > 0:
-                ejemplo = self.df[self.df.duplicated(keep=False)].head(2)
-                print("   Ejemplo de duplicado:")
-                print(ejemplo.to_string(index=False)[:200])
-                print()
+            ejemplo = duplicadas.ejemplo(self.df)
+            print("   Ejemplo de duplicado:")
+            print(ejemplo.to_string(index=False)[:200])
+            print()
             
-            self.df = self.df.drop_duplicates()
+            self.df = duplicadas.sin_duplicados(self.df)
             print(f"✅ Eliminados {duplicados} duplicados\n")
             self.reporte['correcciones_aplicadas'].append(f"Eliminados {duplicados} duplicados")
         else:
@@ -187,29 +300,41 @@ class LimpiadorGranja:
         
         columnas_eliminar = []
         
+        # El perfil de analizar_calidad sirve si los duplicados no cambiaron las filas
+        if self.perfil is None or self.perfil.filas != len(self.df):
+            self.perfil = PerfilDatos().agregar(self.df)
+        
         for col in self.df.columns:
+            perfil = self.perfil.columnas[col]
+            
             # Columna vacía o casi vacía
-            nulos_pct = (self.df[col].isna().sum() / len(self.df)) * 100
+            nulos_pct = (perfil.nulos / len(self.df)) * 100
             if nulos_pct > 95:
                 columnas_eliminar.append((col, f"95%+ nulos"))
                 continue
             
             # Columna con un solo valor
-            if self.df[col].nunique() == 1:
+            if perfil.distintos() == 1:
                 columnas_eliminar.append((col, "1 valor único"))
                 continue
             
             # Columna de solo espacios/vacíos
-            if self.df[col].dtype == 'object':
-                no_vacios = self.df[col].dropna().str.strip()
-                if len(no_vacios) == 0 or (no_vacios == '').all():
-                    columnas_eliminar.append((col, "solo espacios"))
+            if perfil.no_nulos and perfil.vacios == perfil.no_nulos:
+                columnas_eliminar.append((col, "solo espacios"))
         
         if columnas_eliminar:
             print(f"⚠️  Encontradas {len(columnas_eliminar)} columnas inútiles:")
             for col, razon in columnas_eliminar:
                 print(f"   • {col[:40]:40} → {razon}")
             
+            if not self.interactivo:
+                # En lote nadie responde: se conservan y quedan anotadas en el reporte
+                print("\n⏭️  Columnas conservadas (modo no interactivo)\n")
+                self.reporte['problemas_encontrados'].append(
+                    f"Columnas sin información (conservadas): {', '.join(col for col, _ in columnas_eliminar)}"
+                )
+                return
+            
             respuesta = input("\n¿Eliminar estas columnas? (s/n): ").lower()
             if respuesta == 's':
                 cols_a_eliminar = [col for col, _ in columnas_eliminar]
@@ -223,12 +348,29 @@ class LimpiadorGranja:
         else:
             print("✅ Todas las columnas tienen datos útiles\n")
     
+    def validar_movimientos(self):
+        """TOTAL = suma de componentes y SALDO = ENTRADAS − SALIDAS, con aritmética de columnas"""
+        print("🔎 Validando totales y saldos...\n")
+        
+        self.validador = ValidadorGranja(self.df.columns)
+        if not self.validador.reglas():
+            print("⏭️  Sin bloques ENTRADAS/SALIDAS/SALDO reconocibles\n")
+            return
+        
+        self.validador.validar(self.df)
+        for linea in self.validador.resumen():
+            print(f"   • {linea}")
+        print()
+        
+        if self.validador.total_violaciones():
+            self.reporte['problemas_encontrados'].append(
+                f"{self.validador.filas_con_error} filas con totales o saldos que no cuadran"
+            )
+    
     def guardar_limpio(self):
         """Guarda el archivo limpio"""
         nombre_base = Path(self.archivo).stem
-        archivo_salida = f"{nombre_base}_LIMPIO.csv"
-        
-        self.df.to_csv(archivo_salida, index=False, encoding='utf-8', sep=';')
+        archivo_salida = guardar(self.df, f"{nombre_base}_LIMPIO", self.formato, sep=';')
         
         print(f"💾 Archivo limpio guardado: {archivo_salida}")
         print(f"   Reducción: {self.reporte.get('filas_originales', 0)} → {len(self.df)} filas")
@@ -239,7 +381,10 @@ class LimpiadorGranja:
         with open(reporte_file, 'w', encoding='utf-8') as f:
             f.write(f"REPORTE DE LIMPIEZA - {self.reporte['timestamp']}\n")
             f.write("="*70 + "\n\n")
-            f.write(f"Archivo: {self.archivo}\n\n")
+            f.write(f"Archivo: {self.archivo}\n")
+            if 'encoding' in self.reporte:
+                f.write(f"Codificación: {describir(self.reporte['encoding'])}\n")
+            f.write("\n")
             
             if self.reporte['problemas_encontrados']:
                 f.write("PROBLEMAS ENCONTRADOS:\n")
@@ -250,6 +395,22 @@ class LimpiadorGranja:
             f.write("CORRECCIONES APLICADAS:\n")
             for c in self.reporte['correcciones_aplicadas']:
                 f.write(f"  • {c}\n")
+            
+            if 'memoria' in self.reporte:
+                memoria = self.reporte['memoria']
+                f.write(f"\nMEMORIA (memory_usage deep): {memoria['antes_mb']:.2f} MB → "
+                        f"{memoria['despues_mb']:.2f} MB\n")
+                for col, (antes, despues) in memoria['cambios'].items():
+                    f.write(f"  • {col}: {antes} → {despues}\n")
+            
+            if self.validador is not None and self.validador.reglas():
+                # Las filas que no cuadran van aparte: el reporte solo lleva los conteos
+                violaciones = self.validador.guardar(f"{nombre_base}_VIOLACIONES.csv")
+                f.write("\nVALIDACIÓN:\n")
+                for linea in self.validador.resumen():
+                    f.write(f"  • {linea}\n")
+                if violaciones:
+                    f.write(f"  • Detalle: {violaciones}\n")
         
         print(f"📄 Reporte guardado: {reporte_file}\n")
         
@@ -268,9 +429,16 @@ class LimpiadorGranja:
         self.reporte['columnas_originales'] = len(self.df.columns)
         
         self.limpiar_columnas()
+        # Antes de que reglas o --interactivo quiten columnas (SALDO_* constantes, *_DEF...)
+        self.validar_movimientos()
+        if self.reglas is not None:
+            self.aplicar_reglas()
+        if self.optimizar_memoria:
+            self.optimizar_dtypes()
         self.analizar_calidad()
-        self.limpiar_duplicados_inteligente()
-        self.detectar_columnas_inutiles()
+        if self.reglas is None:
+            self.limpiar_duplicados_inteligente()
+            self.detectar_columnas_inutiles()
         
         archivo_limpio = self.guardar_limpio()
         
@@ -283,19 +451,35 @@ class LimpiadorGranja:
 
 
 def main():
-    import sys
+    import argparse
     
-    if len(sys.argv) < 2:
-        print("\nUso: python limpiador_granja.py <archivo.csv>\n")
-        return
+    parser = argparse.ArgumentParser(description='🐔 Limpiador de CSVs de granja avícola')
+    parser.add_argument('archivo', help='Archivo CSV a limpiar')
+    parser.add_argument('--optimizar-memoria', action='store_true',
+                        help='Angosta conteos numéricos y pasa códigos repetidos a category')
+    parser.add_argument('--formato', choices=FORMATOS, default='csv',
+                        help='Formato del archivo limpio (parquet/feather requieren pyarrow)')
+    parser.add_argument('--interactivo', action='store_true',
+                        help='Pregunta antes de eliminar columnas sin información')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='No usar ni guardar la caché de parseo (.cache_limpieza)')
+    parser.add_argument('--reglas', default=None,
+                        help='Especificación JSON de limpieza, p.ej. reglas_granja.json')
+    parser.add_argument('--claves', default=None,
+                        help='Columnas que definen un duplicado, separadas por comas (p.ej. FECHA)')
+    args = parser.parse_args()
     
-    archivo = sys.argv[1]
+    archivo = args.archivo
     
     if not Path(archivo).exists():
         print(f"\n❌ Error: '{archivo}' no existe\n")
         return
     
-    limpiador = LimpiadorGranja(archivo)
+    limpiador = LimpiadorGranja(archivo, optimizar_memoria=args.optimizar_memoria,
+                                formato=args.formato, interactivo=args.interactivo,
+                                claves_duplicados=args.claves.split(',') if args.claves else None,
+                                usar_cache=not args.no_cache,
+                                reglas=ReglasLimpieza.cargar(args.reglas) if args.reglas else None)
     limpiador.pipeline_granja()
 
 
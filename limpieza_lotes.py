@@ -0,0 +1,194 @@
+import os
+import re
+import glob
+import time
+import contextlib
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from almacen_columnar import FORMATOS
+from reglas_limpieza import ReglasLimpieza
+from limpiador_csv import LimpiadorCSV
+from limpiador_granja import LimpiadorGranja
+
+PATRON_GRANJA = re.compile(r'LOTE\s*\d+|MOVIMIENTO\s+HUEVO', re.IGNORECASE)
+# Archivos que escribe la propia limpieza (el limpio y el reporte del validador)
+SUFIJOS_SALIDA = ('_limpio', '_violaciones')
+
+
+def listar_archivos(entrada):
+    """Carpeta (todos sus .csv) o patrón glob; ignora las salidas de limpiezas anteriores"""
+    if os.path.isdir(entrada):
+        rutas = glob.glob(os.path.join(entrada, '*.csv'))
+    else:
+        rutas = glob.glob(entrada)
+
+    return [os.path.abspath(r) for r in rutas
+            if os.path.isfile(r) and not Path(r).stem.lower().endswith(SUFIJOS_SALIDA)]
+
+
+def elegir_limpiador(ruta, limpiador):
+    if limpiador != 'auto':
+        return limpiador
+    return 'granja' if PATRON_GRANJA.search(Path(ruta).name) else 'csv'
+
+
+def limpiar_archivo(ruta, limpiador, opciones):
+    """Limpia un archivo en un proceso del pool; devuelve un resumen (nunca lanza)"""
+    resumen = {'archivo': ruta, 'limpiador': limpiador, 'ok': False, 'error': '',
+               'filas_originales': 0, 'filas_finales': 0, 'segundos': 0.0}
+    inicio = time.perf_counter()
+
+    try:
+        # Cada archivo con sus propias reglas: rellenos y duplicados no se mezclan entre lotes
+        reglas = ReglasLimpieza.cargar(opciones['reglas']) if opciones['reglas'] else None
+        
+        # La salida de consola de cada limpieza queda en su propio reporte
+        with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+            if limpiador == 'granja':
+                l = LimpiadorGranja(ruta, optimizar_memoria=opciones['optimizar_memoria'],
+                                    formato=opciones['formato'], claves_duplicados=opciones['claves'],
+                                    usar_cache=opciones['usar_cache'], reglas=reglas)
+                resumen['ok'] = l.pipeline_granja()
+                if resumen['ok']:
+                    resumen['filas_finales'] = len(l.df)
+                    resumen['problemas'] = len(l.reporte['problemas_encontrados'])
+            else:
+                l = LimpiadorCSV(ruta, optimizar_memoria=opciones['optimizar_memoria'],
+                                 formato=opciones['formato'], claves_duplicados=opciones['claves'],
+                                 usar_cache=opciones['usar_cache'], reglas=reglas,
+                                 grupo_nulos=opciones['grupo'])
+                if opciones['chunksize']:
+                    resumen['ok'] = l.pipeline_streaming(opciones['chunksize'], opciones['nulos'])
+                else:
+                    resumen['ok'] = l.pipeline_completo(opciones['nulos'])
+                resumen['filas_finales'] = l.reporte.get('filas_finales', 0)
+
+        resumen['filas_originales'] = l.reporte.get('filas_originales', 0)
+        if not resumen['ok']:
+            resumen['error'] = "No se pudo cargar"
+    except Exception as e:
+        resumen['error'] = f"{type(e).__name__}: {str(e)}"
+
+    resumen['segundos'] = time.perf_counter() - inicio
+    return resumen
+
+
+class LimpiezaLotes:
+    """
+    Limpia muchos CSV en paralelo con un pool de procesos, sin preguntas.
+    Los archivos se encolan del más grande al más chico para que los largos
+    no queden solos al final con el resto del pool ocioso.
+    """
+
+    def __init__(self, entrada, carpeta_salida='.', procesos=None, limpiador='auto',
+                 nulos='eliminar', chunksize=None, formato='csv', optimizar_memoria=False,
+                 claves_duplicados=None, usar_cache=True, reglas=None, grupo_nulos='lote'):
+        self.entrada = entrada
+        self.carpeta_salida = os.path.abspath(carpeta_salida)
+        self.procesos = procesos or os.cpu_count()
+        self.limpiador = limpiador
+        self.opciones = {'nulos': nulos, 'grupo': grupo_nulos, 'chunksize': chunksize, 'formato': formato,
+                         'optimizar_memoria': optimizar_memoria, 'claves': claves_duplicados,
+                         'usar_cache': usar_cache, 'reglas': reglas and os.path.abspath(reglas)}
+        self.resultados = []
+        if reglas:
+            ReglasLimpieza.cargar(reglas)   # Un error en la especificación se ve una vez, no por archivo
+
+    def ejecutar(self):
+        archivos = listar_archivos(self.entrada)
+        if not archivos:
+            print(f"❌ No hay CSV en {self.entrada}")
+            return False
+
+        archivos.sort(key=os.path.getsize, reverse=True)
+        os.makedirs(self.carpeta_salida, exist_ok=True)
+
+        print(f"\n🧹 LIMPIEZA EN LOTE: {len(archivos)} archivos con {self.procesos} procesos")
+        print(f"   Salida: {self.carpeta_salida}\n")
+
+        inicio = time.perf_counter()
+        # Cada proceso trabaja dentro de la carpeta de salida (los limpiadores escriben en el cwd)
+        with ProcessPoolExecutor(max_workers=self.procesos, initializer=os.chdir,
+                                 initargs=(self.carpeta_salida,)) as pool:
+            futuros = [pool.submit(limpiar_archivo, ruta, elegir_limpiador(ruta, self.limpiador),
+                                   self.opciones)
+                       for ruta in archivos]
+
+            for n, futuro in enumerate(as_completed(futuros), 1):
+                resumen = futuro.result()
+                self.resultados.append(resumen)
+                estado = "✅" if resumen['ok'] else "❌"
+                print(f"  {estado} [{n}/{len(archivos)}] {Path(resumen['archivo']).name} "
+                      f"({resumen['limpiador']}, {resumen['segundos']:.1f}s) {resumen['error']}")
+
+        self.segundos = time.perf_counter() - inicio
+        self.guardar_resumen()
+        return all(r['ok'] for r in self.resultados)
+
+    def guardar_resumen(self):
+        """Un solo resumen combinado; el detalle está en cada _reporte/_REPORTE.txt"""
+        ok = [r for r in self.resultados if r['ok']]
+        fallidos = [r for r in self.resultados if not r['ok']]
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        ruta = os.path.join(self.carpeta_salida, f"resumen_lotes_{timestamp}.txt")
+
+        with open(ruta, 'w', encoding='utf-8') as f:
+            f.write(f"RESUMEN DE LIMPIEZA EN LOTE - {timestamp}\n")
+            f.write("="*70 + "\n\n")
+            f.write(f"Entrada: {self.entrada}\n")
+            f.write(f"Archivos: {len(self.resultados)} | Correctos: {len(ok)} | Fallidos: {len(fallidos)}\n")
+            f.write(f"Filas: {sum(r['filas_originales'] for r in ok):,} → "
+                    f"{sum(r['filas_finales'] for r in ok):,}\n")
+            f.write(f"Tiempo total: {self.segundos:.1f}s con {self.procesos} procesos\n\n")
+
+            f.write("ARCHIVOS:\n")
+            for r in sorted(self.resultados, key=lambda r: r['archivo']):
+                estado = "OK " if r['ok'] else "ERR"
+                f.write(f"  {estado} {Path(r['archivo']).name} | {r['limpiador']} | "
+                        f"{r['filas_originales']} → {r['filas_finales']} filas | {r['segundos']:.1f}s"
+                        f"{' | ' + r['error'] if r['error'] else ''}\n")
+
+        print(f"\n📄 Resumen combinado: {ruta}")
+        print(f"   Correctos: {len(ok)} | Fallidos: {len(fallidos)} | Tiempo: {self.segundos:.1f}s\n")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='🧹 Limpieza en lote de CSVs (carpeta o glob)')
+    parser.add_argument('entrada', help='Carpeta o patrón, p.ej. "datos/LOTE *.csv"')
+    parser.add_argument('--salida', default='.', help='Carpeta para los archivos limpios y reportes')
+    parser.add_argument('--procesos', '-p', type=int, default=None,
+                        help='Procesos en paralelo (por defecto, todos los núcleos)')
+    parser.add_argument('--limpiador', choices=['auto', 'granja', 'csv'], default='auto',
+                        help='auto: granja para "LOTE NN"/"MOVIMIENTO HUEVO", csv para el resto')
+    parser.add_argument('--nulos', choices=['eliminar', 'rellenar', 'rellenar_grupo', 'ffill'],
+                        default=None, help='Estrategia para valores nulos (por defecto, eliminar)')
+    parser.add_argument('--grupo', default='lote',
+                        help='Columna de grupo para --nulos rellenar_grupo/ffill')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='Limpiador csv en streaming, N filas por chunk')
+    parser.add_argument('--formato', choices=FORMATOS, default='csv')
+    parser.add_argument('--optimizar-memoria', action='store_true')
+    parser.add_argument('--claves', default=None,
+                        help='Columnas que definen un duplicado, separadas por comas')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='No usar la caché de parseo (queda en la carpeta de salida)')
+    parser.add_argument('--reglas', default=None,
+                        help='Especificación JSON de limpieza aplicada a todos los archivos '
+                             '(reemplaza a --nulos y --claves)')
+    args = parser.parse_args()
+    if args.reglas and (args.nulos or args.claves):
+        parser.error('--reglas no se combina con --nulos ni --claves: usar "nulos" y "duplicados" en el JSON')
+
+    lotes = LimpiezaLotes(args.entrada, args.salida, args.procesos, args.limpiador,
+                          args.nulos or 'eliminar', args.chunksize, args.formato, args.optimizar_memoria,
+                          args.claves.split(',') if args.claves else None, not args.no_cache,
+                          args.reglas, args.grupo)
+    lotes.ejecutar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import atexit
+import queue
+import threading
+import time
+from pathlib import Path
+from datetime import datetime
+
+
+class LoggerOrganizador:
+    """Logger compartido por los organizadores: un descriptor por ejecución y escritura por lotes"""
+
+    _FIN = object()  # Marca de cierre para el hilo de escritura
+
+    def __init__(self, ruta, max_buffer=500, intervalo_flush=2.0, en_hilo=False):
+        """
+        ruta: archivo .log de la ejecución
+        max_buffer: líneas acumuladas antes de escribir a disco
+        intervalo_flush: segundos máximos que una línea espera en memoria
+        en_hilo: escribe desde un hilo en segundo plano (no bloquea al organizador)
+        """
+        self.ruta = ruta
+        self.max_buffer = max_buffer
+        self.intervalo_flush = intervalo_flush
+        self.en_hilo = en_hilo
+
+        Path(ruta).parent.mkdir(parents=True, exist_ok=True)
+        self._archivo = open(ruta, 'a', encoding='utf-8')
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._ultimo_flush = time.monotonic()
+        self._cerrado = False
+
+        self._cola = None
+        self._hilo = None
+        if en_hilo:
+            self._cola = queue.Queue()
+            self._hilo = threading.Thread(target=self._escritor, daemon=True)
+            self._hilo.start()
+
+        # Garantiza el volcado final aunque el proceso termine por una excepción
+        atexit.register(self.cerrar)
+
+    def escribir(self, mensaje, nivel="INFO"):
+        """Agrega una línea al buffer (no toca el disco salvo que toque vaciar)"""
+        if self._cerrado:
+            return
+
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.agregar(f"[{timestamp}] {nivel}: {mensaje}\n")
+
+    def agregar(self, linea):
+        """Agrega una línea ya formateada (con su salto de línea), p.ej. JSONL"""
+        if self._cerrado:
+            return
+
+        if self._cola is not None:
+            self._cola.put(linea)
+            return
+
+        with self._lock:
+            self._buffer.append(linea)
+            if (len(self._buffer) >= self.max_buffer or
+                    time.monotonic() - self._ultimo_flush >= self.intervalo_flush):
+                self._volcar()
+
+    def flush(self):
+        """Fuerza la escritura de todo lo pendiente"""
+        if self._cerrado:
+            return
+
+        if self._cola is not None:
+            # El hilo vacía su lote cuando recibe un evento de sincronización
+            listo = threading.Event()
+            self._cola.put(listo)
+            while not listo.wait(timeout=0.5):
+                if not self._hilo.is_alive():
+                    # El hilo murió (p.ej. disco lleno): lo que quedó en la cola se escribe aquí
+                    self._drenar()
+                    return
+            return
+
+        with self._lock:
+            self._volcar()
+
+    def cerrar(self):
+        """Vacía el buffer y libera el archivo (idempotente)"""
+        if self._cerrado:
+            return
+
+        if self._cola is not None:
+            self._cola.put(self._FIN)
+            self._hilo.join()
+            self._drenar()
+        else:
+            with self._lock:
+                self._volcar()
+
+        self._cerrado = True
+        self._archivo.close()
+        atexit.unregister(self.cerrar)
+
+    def _volcar(self):
+        """Escribe el buffer en una sola llamada (llamar con el lock tomado)"""
+        if self._buffer:
+            self._archivo.write(''.join(self._buffer))
+            self._archivo.flush()
+            self._buffer.clear()
+        self._ultimo_flush = time.monotonic()
+
+    def _drenar(self):
+        """Escribe lo que siga en la cola sin pasar por el hilo (ya terminado)"""
+        lineas = []
+        while True:
+            try:
+                item = self._cola.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, str):
+                lineas.append(item)
+            elif isinstance(item, threading.Event):
+                item.set()
+        if lineas:
+            with self._lock:
+                self._archivo.write(''.join(lineas))
+                self._archivo.flush()
+
+    def _escritor(self):
+        """Bucle del hilo en segundo plano"""
+        lote = []
+        inicio_lote = 0.0
+        while True:
+            # Sin nada pendiente se espera sin límite; con líneas, hasta que venza la más vieja
+            espera = None
+            if lote:
+                espera = max(0.0, self.intervalo_flush - (time.monotonic() - inicio_lote))
+            try:
+                item = self._cola.get(timeout=espera)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, str):
+                if not lote:
+                    inicio_lote = time.monotonic()
+                lote.append(item)
+                # Un goteo constante nunca deja la cola vacía: el plazo se mide aparte
+                if (len(lote) < self.max_buffer and
+                        time.monotonic() - inicio_lote < self.intervalo_flush):
+                    continue
+
+            if lote:
+                self._archivo.write(''.join(lote))
+                self._archivo.flush()
+                lote.clear()
+
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is self._FIN:
+                return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cerrar()
+        return False
@@ -0,0 +1,190 @@
+import os
+import errno
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+BUFFER_COPIA = 8 * 1024 * 1024  # Copia entre dispositivos sin sendfile
+# Sistemas de archivos sin enlaces duros (FAT, algunos montajes de red)
+SIN_ENLACES = {errno.EPERM, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EMLINK}
+
+
+class MotorMovimientos:
+    """Reparte los movimientos de archivos en un pool de hilos acotado"""
+
+    POLITICAS_FSYNC = ('nunca', 'archivo', 'final')
+
+    def __init__(self, workers=1, fsync='nunca'):
+        if fsync not in self.POLITICAS_FSYNC:
+            raise ValueError(f"Política de fsync inválida: {fsync}")
+        self.workers = max(1, int(workers))
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._reservados = {}  # carpeta destino → nombres reservados y todavía sin mover
+        self._dispositivos = {}  # carpeta → st_dev (un stat por carpeta, no por archivo)
+        self.estadisticas = {'renombrados': 0, 'copiados': 0, 'bytes_copiados': 0}
+
+    def reservar_destino(self, carpeta_destino, archivo, sufijo):
+        """
+        Devuelve (destino, nuevo_nombre) libre de colisiones.
+        nuevo_nombre es None si no hubo que renombrar. La reserva es atómica:
+        dos hilos con el mismo nombre nunca reciben la misma ruta. Lo que ya
+        existe se mira en el disco en el momento (otro proceso o una persona
+        pudo crear el archivo después); en memoria solo quedan las reservas
+        en vuelo, que mover() libera.
+        """
+        with self._lock:
+            reservados = self._reservados.setdefault(carpeta_destino, set())
+
+            def ocupado(nombre):
+                return nombre in reservados or os.path.lexists(os.path.join(carpeta_destino, nombre))
+
+            final = archivo
+            nuevo_nombre = None
+
+            if ocupado(final):
+                nombre, extension = os.path.splitext(archivo)
+                nuevo_nombre = final = f"{nombre}_{sufijo}{extension}"
+
+                contador = 1
+                while ocupado(final):
+                    nuevo_nombre = final = f"{nombre}_{sufijo}_{contador}{extension}"
+                    contador += 1
+
+            reservados.add(final)
+            return os.path.join(carpeta_destino, final), nuevo_nombre
+
+    def liberar(self, destino):
+        """Suelta la reserva de un destino (ya movido o abandonado)"""
+        carpeta, nombre = os.path.split(destino)
+        with self._lock:
+            reservados = self._reservados.get(carpeta)
+            if reservados is not None:
+                reservados.discard(nombre)
+                if not reservados:
+                    del self._reservados[carpeta]
+
+    def mover(self, origen, destino):
+        """
+        Mueve un archivo sin pisar nunca el destino: enlace duro + borrado si
+        origen y destino están en el mismo dispositivo (barato y falla con
+        EEXIST si alguien creó el archivo entretanto), copia exclusiva +
+        borrado si no. Devuelve 'renombrado' o 'copiado'; FileExistsError si
+        el destino apareció después de reservarlo.
+        """
+        try:
+            if self._dispositivo(os.path.dirname(origen)) == self._dispositivo(os.path.dirname(destino)):
+                try:
+                    self._renombrar_exclusivo(origen, destino)
+                    self.sumar(self.estadisticas, 'renombrados')
+                    return 'renombrado'
+                except OSError as e:
+                    # Bind mounts y similares comparten st_dev pero no permiten rename
+                    if e.errno != errno.EXDEV:
+                        raise
+
+            try:
+                bytes_copiados = self._copiar(origen, destino)
+            except FileExistsError:
+                raise  # Es de otro: no se borra
+            except BaseException:
+                # Nunca dejar una copia a medias: el original sigue intacto
+                if os.path.lexists(destino):
+                    os.unlink(destino)
+                raise
+            os.unlink(origen)
+            self.sumar(self.estadisticas, 'copiados')
+            self.sumar(self.estadisticas, 'bytes_copiados', bytes_copiados)
+            return 'copiado'
+        finally:
+            self.liberar(destino)
+
+    def _renombrar_exclusivo(self, origen, destino):
+        try:
+            os.link(origen, destino, follow_symlinks=False)
+        except OSError as e:
+            if e.errno not in SIN_ENLACES:
+                raise
+            # Sin enlaces duros: comprobar justo antes del rename (ventana mínima)
+            if os.path.lexists(destino):
+                raise FileExistsError(errno.EEXIST, "El destino ya existe", destino)
+            os.rename(origen, destino)
+            return
+        os.unlink(origen)
+
+    def finalizar(self):
+        """Con fsync='final' se sincroniza el disco una sola vez al terminar la corrida"""
+        if self.fsync == 'final' and self.estadisticas['copiados'] and hasattr(os, 'sync'):
+            os.sync()
+
+    def _dispositivo(self, carpeta):
+        dispositivo = self._dispositivos.get(carpeta)
+        if dispositivo is None:
+            dispositivo = os.stat(carpeta).st_dev
+            with self._lock:
+                self._dispositivos[carpeta] = dispositivo
+        return dispositivo
+
+    def _copiar(self, origen, destino):
+        """Copia entre dispositivos con sendfile (kernel) o buffer grande; devuelve los bytes"""
+        if os.path.islink(origen):
+            if os.path.lexists(destino):
+                raise FileExistsError(errno.EEXIST, "El destino ya existe", destino)
+            shutil.copy2(origen, destino, follow_symlinks=False)
+            return 0
+
+        copiados = 0
+        # 'xb' (O_EXCL): si el destino apareció después de reservarlo, falla en vez de pisarlo
+        with open(origen, 'rb') as fuente, open(destino, 'xb') as salida:
+            tamano = os.fstat(fuente.fileno()).st_size
+            try:
+                while copiados < tamano:
+                    enviados = os.sendfile(salida.fileno(), fuente.fileno(), copiados,
+                                           min(tamano - copiados, 1 << 30))
+                    if enviados == 0:
+                        break
+                    copiados += enviados
+            except (AttributeError, OSError):
+                # Sin sendfile (Windows/macOS con archivos) → copia con buffer grande
+                fuente.seek(copiados)
+                salida.seek(copiados)
+                while True:
+                    datos = fuente.read(BUFFER_COPIA)
+                    if not datos:
+                        break
+                    salida.write(datos)
+                    copiados += len(datos)
+
+            if self.fsync == 'archivo':
+                salida.flush()
+                os.fsync(salida.fileno())
+
+        shutil.copystat(origen, destino)
+        return copiados
+
+    def sumar(self, contadores, clave, cantidad=1):
+        """Incrementa un contador compartido sin perder actualizaciones entre hilos"""
+        with self._lock:
+            contadores[clave] = contadores.get(clave, 0) + cantidad
+
+    def ejecutar(self, tareas, funcion):
+        """Aplica funcion a cada tarea; en serie si workers == 1"""
+        if self.workers == 1:
+            for tarea in tareas:
+                funcion(tarea)
+            return
+
+        # Ventana acotada de tareas en vuelo: no se encola la carpeta entera
+        limite = self.workers * 4
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pendientes = set()
+            for tarea in tareas:
+                pendientes.add(pool.submit(funcion, tarea))
+                if len(pendientes) >= limite:
+                    hechos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                    for futuro in hechos:
+                        futuro.result()
+
+            for futuro in pendientes:
+                futuro.result()
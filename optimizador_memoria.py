@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+FILAS_MUESTRA = 10_000
+MAX_CARDINALIDAD = 0.5   # Únicos / filas por debajo de esto → category
+
+
+def memoria_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 / 1024
+
+
+def es_texto(serie):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return False
+    return pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie)
+
+
+def mapa_dtypes(muestra, excluir=()):
+    """
+    dtype= para read_csv a partir de una muestra: el texto repetitivo entra
+    directo como category. Los enteros NO se angostan aquí: read_csv con
+    Int8 da la vuelta en silencio a un 300 (→ 44) de filas que la muestra
+    no vio; se angostan después, ya con el rango real.
+    """
+    mapa = {}
+    for col in muestra.columns:
+        if col in excluir or not es_texto(muestra[col]):
+            continue
+        valores = muestra[col].dropna()
+        if len(valores) and valores.nunique() / len(valores) <= MAX_CARDINALIDAD:
+            mapa[col] = 'category'
+    return mapa
+
+
+def dtype_minimo(serie):
+    """dtype más angosto que conserva exactamente los valores (None si no hay mejora)"""
+    if pd.api.types.is_bool_dtype(serie):
+        return None
+
+    if pd.api.types.is_integer_dtype(serie):
+        valores = serie.dropna()
+        if valores.empty:
+            return None
+        minimo, maximo = int(valores.min()), int(valores.max())
+        nullable = serie.hasnans or pd.api.types.is_extension_array_dtype(serie)
+        candidatos = ['uint8', 'uint16', 'uint32'] if minimo >= 0 else ['int8', 'int16', 'int32']
+        for candidato in candidatos:
+            info = np.iinfo(candidato)
+            if info.min <= minimo and maximo <= info.max:
+                dtype = candidato.capitalize().replace('Uint', 'UInt') if nullable else candidato
+                return dtype if np.dtype(candidato).itemsize < serie.dtype.itemsize else None
+        return None
+
+    if pd.api.types.is_float_dtype(serie) and serie.dtype.itemsize > 4:
+        valores = serie.to_numpy(dtype='float64', na_value=np.nan)
+        reducidos = valores.astype('float32')
+        # Solo si float32 representa exactamente cada valor
+        if np.array_equal(reducidos.astype('float64'), valores, equal_nan=True):
+            return 'float32'
+        return None
+
+    if es_texto(serie):
+        valores = serie.dropna()
+        if len(valores) and valores.nunique() / len(valores) <= MAX_CARDINALIDAD:
+            return 'category'
+
+    return None
+
+
+def optimizar_dtypes(df):
+    """
+    Angosta columna a columna, en el lugar (cada columna vieja se libera al
+    reemplazarla). Devuelve {'antes_mb', 'despues_mb', 'cambios': {col: (de, a)}}.
+    """
+    antes = memoria_mb(df)
+    cambios = {}
+
+    for col in df.columns:
+        dtype = dtype_minimo(df[col])
+        if dtype is None:
+            continue
+        original = str(df[col].dtype)
+        df[col] = df[col].astype(dtype)
+        cambios[col] = (original, dtype)
+
+    return {'antes_mb': antes, 'despues_mb': memoria_mb(df), 'cambios': cambios}
+
+
+def leer_optimizado(ruta, excluir=(), filas_muestra=FILAS_MUESTRA, muestra=None, **opciones):
+    """
+    read_csv con dtype= calculado sobre una muestra, así el texto repetido
+    nunca se materializa como object. muestra: DataFrame ya armado con las
+    primeras filas (si no se pasa, se leen filas_muestra filas aparte).
+    excluir: columnas (o función de la muestra que las devuelve) que deben
+    seguir como texto. Devuelve (df, resumen).
+    """
+    if muestra is None:
+        muestra = pd.read_csv(ruta, nrows=filas_muestra, **opciones)
+    if callable(excluir):
+        excluir = excluir(muestra)
+    mapa = mapa_dtypes(muestra, excluir)
+
+    df = pd.read_csv(ruta, dtype=mapa or None, **opciones)
+
+    # Lo que pesaría sin el mapa, extrapolado desde la muestra
+    estimado = memoria_mb(muestra) * len(df) / len(muestra) if len(muestra) else 0
+    return df, {'mapa': mapa, 'estimado_sin_mapa_mb': estimado, 'cargado_mb': memoria_mb(df)}
@@ -1,6 +1,7 @@
 import os
 import shutil
 from pathlib import Path
+from taxonomia import Taxonomia
 
 # Script que organiza archivos por extensión
 def organizar_descargas(carpeta):
@@ -16,6 +17,9 @@ def organizar_descargas(carpeta):
         'programas': ['.exe', '.example','pptx', 'htm', 'webp']
     }
     
+    # Compilar una sola vez (avisa de extensiones repetidas entre categorías)
+    taxonomia = Taxonomia(tipos)
+    
     # Crear carpetas si no existen
     for categoria in tipos.keys():
         Path(f"{carpeta}/{categoria}").mkdir(exist_ok=True)
@@ -25,15 +29,15 @@ def organizar_descargas(carpeta):
     for archivo in os.listdir(carpeta):
         if os.path.isfile(f"{carpeta}/{archivo}"):
             ext = Path(archivo).suffix.lower()
+            destino_tax = taxonomia.destinos.get(ext)
             
-            for categoria, extensiones in tipos.items():
-                if ext in extensiones:
-                    origen = f"{carpeta}/{archivo}"
-                    destino = f"{carpeta}/{categoria}/{archivo}"
-                    shutil.move(origen, destino)
-                    archivos_movidos += 1
-                    print(f"✓ Movido: {archivo} → {categoria}/")
-                    break
+            if destino_tax:
+                categoria = destino_tax[0]
+                origen = f"{carpeta}/{archivo}"
+                destino = f"{carpeta}/{categoria}/{archivo}"
+                shutil.move(origen, destino)
+                archivos_movidos += 1
+                print(f"✓ Movido: {archivo} → {categoria}/")
     
     print(f"\n🎯 Total organizado: {archivos_movidos} archivos")
 
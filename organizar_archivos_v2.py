@@ -1,11 +1,16 @@
 import os
-import shutil
 from pathlib import Path
 from datetime import datetime
 import json
+from escaner_archivos import escanear
+from indice_estado import SIN_PERMISO, IndiceEstado
+from logger_organizador import LoggerOrganizador
+from motor_movimientos import MotorMovimientos
+from taxonomia import Taxonomia
 
 class OrganizadorArchivos:
-    def __init__(self, carpeta_origen):
+    def __init__(self, carpeta_origen, log_en_hilo=False, workers=1, taxonomia=None,
+                 incremental=False):
         self.carpeta_origen = carpeta_origen
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.log_file = f"logs/organizacion_{self.timestamp}.log"
@@ -13,6 +18,15 @@ class OrganizadorArchivos:
         # Crear carpeta de logs si no existe
         Path("logs").mkdir(exist_ok=True)
         
+        # Un solo archivo abierto por ejecución, escrito por lotes
+        self.logger = LoggerOrganizador(self.log_file, en_hilo=log_en_hilo)
+        
+        # Movimientos en paralelo (workers=1 → serie)
+        self.motor = MotorMovimientos(workers)
+        
+        # Corridas nocturnas: saltar lo que ya se decidió y no cambió
+        self.indice = IndiceEstado() if incremental else None
+        
         # Configuración de tipos (ahora fácil de modificar)
         self.tipos = {
             'Imagenes': ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp'],
@@ -24,22 +38,23 @@ class OrganizadorArchivos:
             'Otros': []  # Por defecto
         }
         
+        # Compilada una sola vez: extensión → categoría en O(1)
+        self.taxonomia = taxonomia or Taxonomia(self.tipos)
+        self.tipos = self.taxonomia.tipos
+        
         # Estadísticas
         self.stats = {
             'archivos_procesados': 0,
             'archivos_movidos': 0,
             'errores': 0,
+            'omitidos_indice': 0,
             'por_categoria': {}
         }
     
     def log(self, mensaje, nivel="INFO"):
         """Registra eventos en archivo y consola"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_mensaje = f"[{timestamp}] {nivel}: {mensaje}"
-        
-        # Escribir en archivo
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(log_mensaje + '\n')
+        # Escribir en archivo (buffer del logger compartido)
+        self.logger.escribir(mensaje, nivel)
         
         # Mostrar en consola con colores
         if nivel == "ERROR":
@@ -64,60 +79,67 @@ class OrganizadorArchivos:
         self.crear_carpetas()
         
         try:
-            archivos = [f for f in os.listdir(self.carpeta_origen) 
-                       if os.path.isfile(os.path.join(self.carpeta_origen, f))]
+            if self.indice:
+                conocidos = self.indice.cargar(self.carpeta_origen)
+                self.log(f"Índice incremental: {conocidos} entradas conocidas")
             
-            self.log(f"Archivos encontrados: {len(archivos)}")
+            # Escaneo perezoso: se procesa mientras se lee la carpeta
+            archivos = escanear(self.carpeta_origen)
+            self.motor.ejecutar(archivos, self.procesar_archivo)
             
-            for archivo in archivos:
-                self.stats['archivos_procesados'] += 1
-                self.procesar_archivo(archivo)
+            self.log(f"Archivos encontrados: {self.stats['archivos_procesados']}")
             
             # Reporte final
             self.generar_reporte()
             
         except Exception as e:
             self.log(f"Error crítico en organización: {str(e)}", "ERROR")
+        finally:
+            if self.indice:
+                self.indice.guardar()
+            self.logger.flush()
     
-    def procesar_archivo(self, archivo):
-        """Procesa un archivo individual"""
+    def procesar_archivo(self, registro):
+        """Procesa un archivo individual (RegistroArchivo del escáner)"""
+        archivo = registro.nombre
         try:
-            ext = Path(archivo).suffix.lower()
-            categoria_destino = 'Otros'
+            if self.indice and self.indice.sin_cambios(registro):
+                self.motor.sumar(self.stats, 'omitidos_indice')
+                return
             
-            # Buscar categoría correspondiente
-            for categoria, extensiones in self.tipos.items():
-                if ext in extensiones:
-                    categoria_destino = categoria
-                    break
+            self.motor.sumar(self.stats, 'archivos_procesados')
+            ext = registro.sufijo
+            categoria_destino, _ = self.taxonomia.clasificar(ext)
             
             # Construir rutas
-            origen = os.path.join(self.carpeta_origen, archivo)
-            destino = os.path.join(self.carpeta_origen, categoria_destino, archivo)
+            origen = registro.ruta
             
-            # Verificar si ya existe
-            if os.path.exists(destino):
-                # Agregar timestamp al nombre para evitar sobrescribir
-                nombre, extension = os.path.splitext(archivo)
-                nuevo_nombre = f"{nombre}_{self.timestamp}{extension}"
-                destino = os.path.join(self.carpeta_origen, categoria_destino, nuevo_nombre)
+            # Reservar destino (agrega timestamp si ya existe, sin carreras entre hilos)
+            destino, nuevo_nombre = self.motor.reservar_destino(
+                os.path.join(self.carpeta_origen, categoria_destino), archivo, self.timestamp
+            )
+            if nuevo_nombre:
                 self.log(f"Archivo duplicado renombrado: {archivo} → {nuevo_nombre}")
             
             # Mover archivo
-            shutil.move(origen, destino)
+            self.motor.mover(origen, destino)
             
             # Actualizar estadísticas
-            self.stats['archivos_movidos'] += 1
-            self.stats['por_categoria'][categoria_destino] += 1
+            self.motor.sumar(self.stats, 'archivos_movidos')
+            self.motor.sumar(self.stats['por_categoria'], categoria_destino)
             
             self.log(f"Movido: {archivo} → {categoria_destino}/", "SUCCESS")
+            if self.indice:
+                self.indice.registrar(registro, 'movido', destino)
             
         except PermissionError:
             self.log(f"Permiso denegado para mover: {archivo}", "ERROR")
-            self.stats['errores'] += 1
+            self.motor.sumar(self.stats, 'errores')
+            if self.indice:
+                self.indice.registrar(registro, SIN_PERMISO)
         except Exception as e:
             self.log(f"Error al procesar {archivo}: {str(e)}", "ERROR")
-            self.stats['errores'] += 1
+            self.motor.sumar(self.stats, 'errores')
     
     def generar_reporte(self):
         """Genera reporte final en JSON y texto"""
@@ -127,6 +149,8 @@ class OrganizadorArchivos:
         self.log(f"Archivos procesados: {self.stats['archivos_procesados']}")
         self.log(f"Archivos movidos: {self.stats['archivos_movidos']}")
         self.log(f"Errores: {self.stats['errores']}")
+        if self.indice:
+            self.log(f"Omitidos (sin cambios según índice): {self.stats['omitidos_indice']}")
         self.log("\nPor categoría:")
         
         for categoria, cantidad in self.stats['por_categoria'].items():
@@ -147,6 +171,7 @@ class OrganizadorArchivos:
 if __name__ == "__main__":
     # Configuración
     CARPETA_A_ORGANIZAR =  r"C:\Users\Usuario\Downloads"
+    WORKERS = 1  # >1 para mover en paralelo (discos de red / lentos)
     
     print("\n🚀 ORGANIZADOR DE ARCHIVOS v2.0")
     print("="*50)
@@ -155,6 +180,6 @@ if __name__ == "__main__":
     if not os.path.exists(CARPETA_A_ORGANIZAR):
         print(f"❌ Error: La carpeta {CARPETA_A_ORGANIZAR} no existe")
     else:
-        organizador = OrganizadorArchivos(CARPETA_A_ORGANIZAR)
+        organizador = OrganizadorArchivos(CARPETA_A_ORGANIZAR, workers=WORKERS)
         organizador.organizar()
         print("\n✅ Proceso completado. Revisa la carpeta 'logs/' para detalles")
\ No newline at end of file
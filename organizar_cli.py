@@ -1,20 +1,48 @@
 import os
-import shutil
 import json
 import argparse
 from pathlib import Path
 from datetime import datetime
+from deduplicador_archivos import DeduplicadorArchivos, deduplicar_entrantes
+from diario_deshacer import DiarioMovimientos, Deshacedor, en_lotes
+from escaner_archivos import recorrer
+from indice_estado import SIN_PERMISO, IndiceEstado
+from logger_organizador import LoggerOrganizador
+from motor_movimientos import MotorMovimientos
+from taxonomia import Taxonomia
+from vigilante import Vigilante
 
 class OrganizadorArchivos:
     """Versión CLI del organizador"""
     
-    def __init__(self, carpeta_origen, dry_run=False, verbose=False):
+    def __init__(self, carpeta_origen, dry_run=False, verbose=False, log_en_hilo=False,
+                 workers=1, taxonomia=None, recursivo=False, max_profundidad=None,
+                 incluir=None, excluir=None, incremental=False, dedup=None,
+                 fsync='nunca'):
         self.carpeta_origen = carpeta_origen
         self.dry_run = dry_run
         self.verbose = verbose
+        self.recursivo = recursivo
+        self.max_profundidad = max_profundidad
+        self.incluir = incluir or []
+        self.excluir = excluir or []
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         Path("logs").mkdir(exist_ok=True)
+        self.logger = LoggerOrganizador(
+            f"logs/organizacion_{self.timestamp}.log", en_hilo=log_en_hilo
+        )
+        self.motor = MotorMovimientos(workers, fsync=fsync)
+        
+        # Diario (origen, destino) para poder deshacer la corrida
+        self.diario = None if dry_run else DiarioMovimientos(self.timestamp)
+        
+        # Índice de corridas anteriores (solo se consulta/actualiza con --incremental)
+        self.indice = IndiceEstado() if incremental else None
+        
+        # Deduplicación por contenido: reportar / enlazar / eliminar
+        self.deduplicador = DeduplicadorArchivos(dedup) if dedup else None
+        self.enlazados = set()
         
         self.tipos = {
             'Imagenes': ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp'],
@@ -25,6 +53,8 @@ class OrganizadorArchivos:
             'Codigo': ['.py', '.js', '.html', '.css', '.java', '.cpp'],
             'Otros': []
         }
+        self.taxonomia = taxonomia or Taxonomia(self.tipos)
+        self.tipos = self.taxonomia.tipos
         
         self.stats = {
             'carpeta': carpeta_origen,
@@ -33,6 +63,8 @@ class OrganizadorArchivos:
             'archivos_procesados': 0,
             'archivos_movidos': 0,
             'errores': 0,
+            'omitidos_indice': 0,
+            'movimientos': self.motor.estadisticas,
             'por_categoria': {cat: 0 for cat in self.tipos.keys()}
         }
     
@@ -50,13 +82,22 @@ class OrganizadorArchivos:
         
         # Procesar archivos
         try:
-            archivos = [f for f in os.listdir(self.carpeta_origen) 
-                       if os.path.isfile(os.path.join(self.carpeta_origen, f))]
+            # Escaneo perezoso: se procesa mientras se lee la carpeta
+            modo = " (recursivo)" if self.recursivo else ""
+            print(f"📂 Escaneando{modo}: {self.carpeta_origen}\n")
+            self.logger.escribir(f"Iniciando organización de: {self.carpeta_origen}")
             
-            print(f"📂 Archivos encontrados: {len(archivos)}\n")
+            if self.deduplicador:
+                self.deduplicar()
             
-            for archivo in archivos:
-                self.procesar_archivo(archivo)
+            if self.indice:
+                conocidos = self.indice.cargar(self.carpeta_origen)
+                print(f"🗂️  Índice incremental: {conocidos} entradas conocidas\n")
+            
+            # Por lotes: cada uno queda en el diario antes de moverse
+            for lote in en_lotes(self.listar_archivos()):
+                self.organizar_lote(lote)
+            self.motor.finalizar()
             
             self.mostrar_reporte()
             
@@ -65,33 +106,116 @@ class OrganizadorArchivos:
             
         except Exception as e:
             print(f"❌ Error: {str(e)}")
+            self.logger.escribir(f"Error crítico en organización: {str(e)}", "ERROR")
+        finally:
+            if self.diario:
+                self.diario.flush()
+            if self.indice:
+                self.indice.guardar()
+            self.logger.flush()
+    
+    def deduplicar(self):
+        """Etapa opcional antes de mover: busca archivos idénticos (también contra lo ya organizado)"""
+        print(f"🔎 Buscando duplicados por contenido ({self.deduplicador.accion})...")
+        
+        carpetas = [os.path.join(self.carpeta_origen, c) for c in self.taxonomia.categorias()]
+        resumen = deduplicar_entrantes(
+            self.deduplicador, self.listar_archivos(), carpetas,
+            dry_run=self.dry_run, log=self.logger.escribir, diario=self.diario
+        )
+        # Un enlace ya comparte el contenido del original: se queda donde está
+        self.enlazados = set(resumen.pop('enlazados'))
+        self.stats['duplicados'] = resumen
+        
+        mb = resumen['bytes_duplicados'] / (1024 * 1024)
+        print(f"   {resumen['duplicados']} duplicados en {resumen['grupos']} grupos ({mb:.1f} MB)\n")
+    
+    def listar_archivos(self):
+        """Genera los archivos a organizar (primer nivel o árbol completo con --recursive)"""
+        return recorrer(
+            self.carpeta_origen,
+            max_profundidad=self.max_profundidad if self.recursivo else 0,
+            incluir=self.incluir,
+            excluir=self.excluir,
+            # Nunca re-entrar en las carpetas de categorías que crea el organizador
+            omitir=self.taxonomia.categorias()
+        )
+    
+    def sin_cambios(self, registro):
+        """True si el índice ya tiene esta entrada con el mismo tamaño y mtime"""
+        try:
+            return self.indice is not None and self.indice.sin_cambios(registro)
+        except OSError:
+            return False  # Desapareció o sin permisos: que lo reporte el movimiento
     
-    def procesar_archivo(self, archivo):
-        """Procesa un archivo individual"""
-        self.stats['archivos_procesados'] += 1
-        ext = Path(archivo).suffix.lower()
-        categoria = 'Otros'
+    def organizar_lote(self, registros):
+        """
+        Organiza un lote: reserva los destinos, los anota en el diario (en
+        disco antes de tocar un solo archivo) y recién entonces los mueve.
+        """
+        planes = [plan for plan in map(self.planificar, registros) if plan]
+        if self.diario and planes:
+            self.diario.anticipar((registro.ruta, destino) for registro, _, destino in planes)
+        self.motor.ejecutar(planes, self.mover_planificado)
+    
+    def planificar(self, registro):
+        """Clasifica un archivo (RegistroArchivo del escáner) y reserva su destino"""
+        if registro.ruta in self.enlazados:
+            return None
+        if self.sin_cambios(registro):
+            self.motor.sumar(self.stats, 'omitidos_indice')
+            return None
         
-        for cat, extensiones in self.tipos.items():
-            if ext in extensiones:
-                categoria = cat
-                break
+        self.motor.sumar(self.stats, 'archivos_procesados')
+        archivo = registro.nombre
+        ext = registro.sufijo
+        categoria, _ = self.taxonomia.clasificar(ext)
         
-        self.stats['por_categoria'][categoria] += 1
+        self.motor.sumar(self.stats['por_categoria'], categoria)
         
         if self.verbose or self.dry_run:
             accion = "MOVERÍA" if self.dry_run else "Moviendo"
             print(f"  {accion}: {archivo} → {categoria}/")
         
-        if not self.dry_run:
+        if self.dry_run:
+            return None
+        
+        try:
+            destino, nuevo_nombre = self.motor.reservar_destino(
+                os.path.join(self.carpeta_origen, categoria), archivo, self.timestamp
+            )
+        except Exception as e:
+            self.registrar_error(registro, e)
+            return None
+        if nuevo_nombre:
+            self.logger.escribir(f"Archivo duplicado renombrado: {archivo} → {nuevo_nombre}")
+        return registro, categoria, destino
+    
+    def mover_planificado(self, plan):
+        registro, categoria, destino = plan
+        try:
+            self.motor.mover(registro.ruta, destino)
+        except Exception as e:
+            if self.diario:
+                self.diario.cancelar(registro.ruta, destino)
+            self.registrar_error(registro, e)
+            return
+        
+        self.motor.sumar(self.stats, 'archivos_movidos')
+        self.logger.escribir(f"Movido: {registro.nombre} → {categoria}/", "SUCCESS")
+        if self.indice:
+            self.indice.registrar(registro, 'movido', destino)
+    
+    def registrar_error(self, registro, error):
+        print(f"  ❌ Error con {registro.nombre}: {str(error)}")
+        self.logger.escribir(f"Error al procesar {registro.nombre}: {str(error)}", "ERROR")
+        self.motor.sumar(self.stats, 'errores')
+        # Solo la falta de permisos se repetiría igual; el resto se reintenta la próxima vez
+        if self.indice and isinstance(error, PermissionError):
             try:
-                origen = os.path.join(self.carpeta_origen, archivo)
-                destino = os.path.join(self.carpeta_origen, categoria, archivo)
-                shutil.move(origen, destino)
-                self.stats['archivos_movidos'] += 1
-            except Exception as e:
-                print(f"  ❌ Error con {archivo}: {str(e)}")
-                self.stats['errores'] += 1
+                self.indice.registrar(registro, SIN_PERMISO)
+            except OSError:
+                pass
     
     def mostrar_reporte(self):
         """Reporte en consola"""
@@ -99,10 +223,16 @@ class OrganizadorArchivos:
         print("📊 REPORTE FINAL")
         print("="*50)
         print(f"Archivos procesados: {self.stats['archivos_procesados']}")
+        if self.indice:
+            print(f"Omitidos (sin cambios según índice): {self.stats['omitidos_indice']}")
         
         if not self.dry_run:
             print(f"Archivos movidos: {self.stats['archivos_movidos']}")
             print(f"Errores: {self.stats['errores']}")
+            movs = self.motor.estadisticas
+            mb = movs['bytes_copiados'] / (1024 * 1024)
+            print(f"  ↳ Renombrados (mismo disco): {movs['renombrados']}")
+            print(f"  ↳ Copiados (otro disco): {movs['copiados']} ({mb:.1f} MB)")
         
         print("\n📁 Por categoría:")
         for cat, cantidad in self.stats['por_categoria'].items():
@@ -172,7 +302,13 @@ Ejemplos de uso:
   python organizar_cli.py --carpeta ~/Descargas
   python organizar_cli.py --carpeta ~/Documentos --dry-run
   python organizar_cli.py --carpeta ~/Descargas --verbose
+  python organizar_cli.py --carpeta /mnt/red/Descargas --workers 8
+  python organizar_cli.py --carpeta ~/Descargas --config config.json
+  python organizar_cli.py --carpeta ~/Descargas --incremental
+  python organizar_cli.py --carpeta /mnt/compartido --recursive --max-depth 3 --excluir ".git"
   python organizar_cli.py --analizar-logs
+  python organizar_cli.py --undo 20260220_184742
+  python organizar_cli.py --watch ~/Descargas --workers 4
         """
     )
     
@@ -194,36 +330,148 @@ Ejemplos de uso:
         help='Modo detallado (muestra cada archivo procesado)'
     )
     
+    parser.add_argument(
+        '--config',
+        type=str,
+        help='JSON con categorias_personalizadas (reemplaza las categorías por defecto)'
+    )
+    
+    parser.add_argument(
+        '--recursive', '-r',
+        action='store_true',
+        help='Incluye los archivos de todas las subcarpetas'
+    )
+    
+    parser.add_argument(
+        '--max-depth',
+        type=int,
+        default=None,
+        help='Profundidad máxima con --recursive (0 = solo primer nivel)'
+    )
+    
+    parser.add_argument(
+        '--incluir',
+        action='append',
+        metavar='GLOB',
+        help='Solo archivos que coincidan (repetible), ej. "*.pdf" o "facturas/*"'
+    )
+    
+    parser.add_argument(
+        '--excluir',
+        action='append',
+        metavar='GLOB',
+        help='Archivos o carpetas a ignorar (repetible), ej. ".git" o "*.tmp"'
+    )
+    
+    parser.add_argument(
+        '--incremental', '-i',
+        action='store_true',
+        help='Salta lo que quedó sin mover por permisos y no cambió desde entonces (logs/indice_estado.db)'
+    )
+    
+    parser.add_argument(
+        '--dedup',
+        choices=DeduplicadorArchivos.ACCIONES,
+        help='Detecta archivos idénticos antes de mover y los reporta, enlaza o elimina'
+    )
+    
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=1,
+        help='Hilos para mover archivos en paralelo (1 = en serie)'
+    )
+    
+    parser.add_argument(
+        '--fsync',
+        choices=MotorMovimientos.POLITICAS_FSYNC,
+        default='nunca',
+        help='Copias entre discos: fsync por archivo, uno al final, o nunca'
+    )
+    
+    parser.add_argument(
+        '--log-hilo',
+        action='store_true',
+        help='Escribe el log desde un hilo en segundo plano'
+    )
+    
     parser.add_argument(
         '--analizar-logs', '-a',
         action='store_true',
         help='Analiza todos los reportes históricos'
     )
     
+    parser.add_argument(
+        '--watch',
+        metavar='CARPETA',
+        help='Organiza la carpeta y se queda vigilando archivos nuevos (inotify o sondeo)'
+    )
+    
+    parser.add_argument(
+        '--estabilidad',
+        type=float,
+        default=2.0,
+        help='Con --watch: segundos sin cambios de tamaño antes de mover un archivo'
+    )
+    
+    parser.add_argument(
+        '--undo', '-u',
+        metavar='TIMESTAMP',
+        help='Revierte la corrida indicada usando logs/diario_<TIMESTAMP>.jsonl'
+    )
+    
     args = parser.parse_args()
     
+    # Deshacer una corrida anterior (reanuda si se interrumpió)
+    if args.undo:
+        Deshacedor(args.undo, workers=args.workers).deshacer()
+        return
+    
     # Ejecutar análisis de logs
     if args.analizar_logs:
         analizar_logs()
         return
     
+    if args.watch:
+        args.carpeta = args.watch
+    
     # Validar carpeta
     if not args.carpeta:
         parser.print_help()
-        print("\n❌ Error: Debes especificar --carpeta o --analizar-logs\n")
+        print("\n❌ Error: Debes especificar --carpeta, --watch o --analizar-logs\n")
         return
     
     if not os.path.exists(args.carpeta):
         print(f"\n❌ Error: La carpeta '{args.carpeta}' no existe\n")
         return
     
+    taxonomia = Taxonomia.cargar(args.config) if args.config else None
+    
     # Ejecutar organización
     organizador = OrganizadorArchivos(
         args.carpeta, 
         dry_run=args.dry_run,
-        verbose=args.verbose
+        verbose=args.verbose,
+        log_en_hilo=args.log_hilo,
+        workers=args.workers,
+        taxonomia=taxonomia,
+        recursivo=args.recursive,
+        max_profundidad=args.max_depth,
+        incluir=args.incluir,
+        excluir=args.excluir,
+        dedup=args.dedup,
+        fsync=args.fsync,
+        incremental=args.incremental
     )
     organizador.organizar()
+    
+    # Modo daemon: lo que ya estaba se organizó arriba, ahora solo lo nuevo
+    if args.watch:
+        Vigilante(organizador, estabilidad=args.estabilidad).vigilar()
+        organizador.motor.finalizar()
+        organizador.mostrar_reporte()
+        if not organizador.dry_run:
+            organizador.guardar_reporte()
 
 
 if __name__ == "__main__":
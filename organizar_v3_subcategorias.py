@@ -1,18 +1,40 @@
 import os
-import shutil
 import json
 from pathlib import Path
 from datetime import datetime
+from deduplicador_archivos import DeduplicadorArchivos, deduplicar_entrantes
+from diario_deshacer import DiarioMovimientos, en_lotes
+from escaner_archivos import recorrer
+from logger_organizador import LoggerOrganizador
+from motor_movimientos import MotorMovimientos
+from taxonomia import Taxonomia
 
 class OrganizadorJerarquico:
     """Organizador con subcategorías inteligentes"""
     
-    def __init__(self, carpeta_origen, dry_run=False):
+    def __init__(self, carpeta_origen, dry_run=False, log_en_hilo=False, workers=1,
+                 taxonomia=None, recursivo=False, max_profundidad=None,
+                 incluir=None, excluir=None, dedup=None, fsync='nunca'):
         self.carpeta_origen = carpeta_origen
         self.dry_run = dry_run
+        self.recursivo = recursivo
+        self.max_profundidad = max_profundidad
+        self.incluir = incluir or []
+        self.excluir = excluir or []
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         Path("logs").mkdir(exist_ok=True)
+        self.logger = LoggerOrganizador(
+            f"logs/organizacion_jerarquica_{self.timestamp}.log", en_hilo=log_en_hilo
+        )
+        self.motor = MotorMovimientos(workers, fsync=fsync)
+        
+        # Diario (origen, destino) para poder deshacer la corrida
+        self.diario = None if dry_run else DiarioMovimientos(self.timestamp)
+        
+        # Deduplicación por contenido: reportar / enlazar / eliminar
+        self.deduplicador = DeduplicadorArchivos(dedup) if dedup else None
+        self.enlazados = set()
         
         # Estructura jerárquica: Categoría → Subcategoría → Extensiones
         self.estructura = {
@@ -39,12 +61,17 @@ class OrganizadorJerarquico:
             }
         }
         
+        # Tabla plana extensión → (categoría, subcategoría), incluye 'Otros'
+        self.taxonomia = taxonomia or Taxonomia(self.estructura)
+        self.estructura = self.taxonomia.tipos
+        
         self.stats = {
             'timestamp': self.timestamp,
             'modo': 'dry-run' if dry_run else 'ejecucion',
             'archivos_procesados': 0,
             'archivos_movidos': 0,
             'errores': 0,
+            'movimientos': self.motor.estadisticas,
             'por_categoria': {},
             'por_subcategoria': {}
         }
@@ -53,37 +80,24 @@ class OrganizadorJerarquico:
         """Crea toda la jerarquía de carpetas"""
         print("📁 Creando estructura de carpetas...\n")
         
-        for categoria, subcategorias in self.estructura.items():
-            for subcategoria in subcategorias.keys():
-                ruta = Path(f"{self.carpeta_origen}/{categoria}/{subcategoria}")
-                
-                if not self.dry_run:
-                    ruta.mkdir(parents=True, exist_ok=True)
-                
-                # Inicializar contadores
-                key = f"{categoria}/{subcategoria}"
-                self.stats['por_subcategoria'][key] = 0
-                
-                if self.dry_run:
-                    print(f"  CREARÍA: {key}/")
-        
-        # Categoría "Otros" sin subcategorías
-        if not self.dry_run:
-            Path(f"{self.carpeta_origen}/Otros").mkdir(exist_ok=True)
-        self.stats['por_subcategoria']['Otros'] = 0
+        # Incluye "Otros" (sin subcategorías)
+        for key in self.taxonomia.ubicaciones():
+            ruta = Path(f"{self.carpeta_origen}/{key}")
+            
+            if not self.dry_run:
+                ruta.mkdir(parents=True, exist_ok=True)
+            
+            # Inicializar contadores
+            self.stats['por_subcategoria'][key] = 0
+            
+            if self.dry_run:
+                print(f"  CREARÍA: {key}/")
         
         print()
     
     def encontrar_ubicacion(self, extension):
-        """Encuentra la categoría y subcategoría para una extensión"""
-        ext_lower = extension.lower()
-        
-        for categoria, subcategorias in self.estructura.items():
-            for subcategoria, extensiones in subcategorias.items():
-                if ext_lower in extensiones:
-                    return categoria, subcategoria
-        
-        return 'Otros', None
+        """Encuentra la categoría y subcategoría para una extensión (O(1))"""
+        return self.taxonomia.clasificar(extension)
     
     def organizar(self):
         """Proceso principal de organización"""
@@ -95,17 +109,18 @@ class OrganizadorJerarquico:
         self.crear_estructura()
         
         try:
-            # Obtener archivos (excluyendo carpetas ya creadas)
-            archivos = []
-            for item in os.listdir(self.carpeta_origen):
-                ruta_completa = os.path.join(self.carpeta_origen, item)
-                if os.path.isfile(ruta_completa):
-                    archivos.append(item)
+            # Archivos de primer nivel o árbol completo, sin las carpetas de categorías
+            modo = " (recursivo)" if self.recursivo else ""
+            print(f"📂 Escaneando{modo}: {self.carpeta_origen}\n")
+            self.logger.escribir(f"Iniciando organización de: {self.carpeta_origen}")
             
-            print(f"📂 Archivos a procesar: {len(archivos)}\n")
+            if self.deduplicador:
+                self.deduplicar()
             
-            for archivo in archivos:
-                self.procesar_archivo(archivo)
+            # Por lotes: cada uno queda en el diario antes de moverse
+            for lote in en_lotes(self.listar_archivos()):
+                self.organizar_lote(lote)
+            self.motor.finalizar()
             
             self.mostrar_reporte()
             
@@ -114,12 +129,55 @@ class OrganizadorJerarquico:
         
         except Exception as e:
             print(f"❌ Error crítico: {str(e)}")
+            self.logger.escribir(f"Error crítico en organización: {str(e)}", "ERROR")
+        finally:
+            if self.diario:
+                self.diario.flush()
+            self.logger.flush()
+    
+    def deduplicar(self):
+        """Etapa opcional antes de mover: busca archivos idénticos (también contra lo ya organizado)"""
+        print(f"🔎 Buscando duplicados por contenido ({self.deduplicador.accion})...")
+        
+        carpetas = [os.path.join(self.carpeta_origen, c) for c in self.taxonomia.categorias()]
+        resumen = deduplicar_entrantes(
+            self.deduplicador, self.listar_archivos(), carpetas,
+            dry_run=self.dry_run, log=self.logger.escribir, diario=self.diario
+        )
+        # Un enlace ya comparte el contenido del original: se queda donde está
+        self.enlazados = set(resumen.pop('enlazados'))
+        self.stats['duplicados'] = resumen
+        
+        mb = resumen['bytes_duplicados'] / (1024 * 1024)
+        print(f"   {resumen['duplicados']} duplicados en {resumen['grupos']} grupos ({mb:.1f} MB)\n")
+    
+    def listar_archivos(self):
+        """Genera los archivos a organizar (primer nivel o árbol completo con --recursive)"""
+        return recorrer(
+            self.carpeta_origen,
+            max_profundidad=self.max_profundidad if self.recursivo else 0,
+            incluir=self.incluir,
+            excluir=self.excluir,
+            # Nunca re-entrar en las carpetas de categorías que crea el organizador
+            omitir=self.taxonomia.categorias()
+        )
     
-    def procesar_archivo(self, archivo):
-        """Procesa un archivo individual"""
-        self.stats['archivos_procesados'] += 1
+    def organizar_lote(self, registros):
+        """Reserva destinos, los anota en el diario (ya en disco) y recién entonces mueve"""
+        planes = [plan for plan in map(self.planificar, registros) if plan]
+        if self.diario and planes:
+            self.diario.anticipar((registro.ruta, destino) for registro, _, destino in planes)
+        self.motor.ejecutar(planes, self.mover_planificado)
+    
+    def planificar(self, registro):
+        """Ubica un archivo (RegistroArchivo del escáner) y reserva su destino"""
+        if registro.ruta in self.enlazados:
+            return None
+        
+        self.motor.sumar(self.stats, 'archivos_procesados')
         
-        ext = Path(archivo).suffix
+        archivo = registro.nombre
+        ext = registro.sufijo
         categoria, subcategoria = self.encontrar_ubicacion(ext)
         
         # Construir ruta destino
@@ -129,30 +187,43 @@ class OrganizadorJerarquico:
             ruta_destino = categoria
         
         # Actualizar estadísticas
-        self.stats['por_subcategoria'][ruta_destino] = \
-            self.stats['por_subcategoria'].get(ruta_destino, 0) + 1
+        self.motor.sumar(self.stats['por_subcategoria'], ruta_destino)
         
         if self.dry_run:
             print(f"  MOVERÍA: {archivo:40} → {ruta_destino}/")
-        else:
-            try:
-                origen = os.path.join(self.carpeta_origen, archivo)
-                destino = os.path.join(self.carpeta_origen, ruta_destino, archivo)
-                
-                # Verificar duplicado
-                if os.path.exists(destino):
-                    nombre, extension = os.path.splitext(archivo)
-                    nuevo_nombre = f"{nombre}_{self.timestamp}{extension}"
-                    destino = os.path.join(self.carpeta_origen, ruta_destino, nuevo_nombre)
-                    print(f"  ⚠️  Renombrado: {archivo} → {nuevo_nombre}")
-                
-                shutil.move(origen, destino)
-                self.stats['archivos_movidos'] += 1
-                print(f"  ✅ {archivo:40} → {ruta_destino}/")
-                
-            except Exception as e:
-                print(f"  ❌ Error con {archivo}: {str(e)}")
-                self.stats['errores'] += 1
+            return None
+        
+        try:
+            # Verificar duplicado (reserva atómica entre hilos)
+            destino, nuevo_nombre = self.motor.reservar_destino(
+                os.path.join(self.carpeta_origen, ruta_destino), archivo, self.timestamp
+            )
+        except Exception as e:
+            self.registrar_error(archivo, e)
+            return None
+        if nuevo_nombre:
+            print(f"  ⚠️  Renombrado: {archivo} → {nuevo_nombre}")
+            self.logger.escribir(f"Archivo duplicado renombrado: {archivo} → {nuevo_nombre}")
+        return registro, ruta_destino, destino
+    
+    def mover_planificado(self, plan):
+        registro, ruta_destino, destino = plan
+        archivo = registro.nombre
+        try:
+            self.motor.mover(registro.ruta, destino)
+        except Exception as e:
+            self.diario.cancelar(registro.ruta, destino)
+            self.registrar_error(archivo, e)
+            return
+        
+        self.motor.sumar(self.stats, 'archivos_movidos')
+        print(f"  ✅ {archivo:40} → {ruta_destino}/")
+        self.logger.escribir(f"Movido: {archivo} → {ruta_destino}/", "SUCCESS")
+    
+    def registrar_error(self, archivo, error):
+        print(f"  ❌ Error con {archivo}: {str(error)}")
+        self.logger.escribir(f"Error al procesar {archivo}: {str(error)}", "ERROR")
+        self.motor.sumar(self.stats, 'errores')
     
     def mostrar_reporte(self):
         """Muestra reporte en consola"""
@@ -165,6 +236,10 @@ class OrganizadorJerarquico:
         if not self.dry_run:
             print(f"Archivos movidos: {self.stats['archivos_movidos']}")
             print(f"Errores: {self.stats['errores']}")
+            movs = self.motor.estadisticas
+            mb = movs['bytes_copiados'] / (1024 * 1024)
+            print(f"  ↳ Renombrados (mismo disco): {movs['renombrados']}")
+            print(f"  ↳ Copiados (otro disco): {movs['copiados']} ({mb:.1f} MB)")
         
         print("\n📁 Distribución por ubicación:\n")
         
@@ -223,13 +298,83 @@ def main():
         help='Simulación (no mueve archivos)'
     )
     
+    parser.add_argument(
+        '--taxonomia', '-t',
+        type=str,
+        help='JSON con la estructura categoría → subcategoría → extensiones'
+    )
+    
+    parser.add_argument(
+        '--recursive', '-r',
+        action='store_true',
+        help='Incluye los archivos de todas las subcarpetas'
+    )
+    
+    parser.add_argument(
+        '--max-depth',
+        type=int,
+        default=None,
+        help='Profundidad máxima con --recursive (0 = solo primer nivel)'
+    )
+    
+    parser.add_argument(
+        '--incluir',
+        action='append',
+        metavar='GLOB',
+        help='Solo archivos que coincidan (repetible), ej. "*.pdf" o "facturas/*"'
+    )
+    
+    parser.add_argument(
+        '--excluir',
+        action='append',
+        metavar='GLOB',
+        help='Archivos o carpetas a ignorar (repetible), ej. ".git" o "*.tmp"'
+    )
+    
+    parser.add_argument(
+        '--dedup',
+        choices=DeduplicadorArchivos.ACCIONES,
+        help='Detecta archivos idénticos antes de mover y los reporta, enlaza o elimina'
+    )
+    
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=1,
+        help='Hilos para mover archivos en paralelo (1 = en serie)'
+    )
+    
+    parser.add_argument(
+        '--fsync',
+        choices=MotorMovimientos.POLITICAS_FSYNC,
+        default='nunca',
+        help='Copias entre discos: fsync por archivo, uno al final, o nunca'
+    )
+    
+    parser.add_argument(
+        '--log-hilo',
+        action='store_true',
+        help='Escribe el log desde un hilo en segundo plano'
+    )
+    
     args = parser.parse_args()
     
     if not os.path.exists(args.carpeta):
         print(f"\n❌ Error: La carpeta '{args.carpeta}' no existe\n")
         return
     
-    organizador = OrganizadorJerarquico(args.carpeta, dry_run=args.dry_run)
+    taxonomia = Taxonomia.cargar(args.taxonomia) if args.taxonomia else None
+    
+    organizador = OrganizadorJerarquico(
+        args.carpeta, dry_run=args.dry_run, log_en_hilo=args.log_hilo,
+        workers=args.workers, taxonomia=taxonomia,
+        recursivo=args.recursive,
+        max_profundidad=args.max_depth,
+        incluir=args.incluir,
+        excluir=args.excluir,
+        dedup=args.dedup,
+        fsync=args.fsync
+    )
     organizador.organizar()
 
 
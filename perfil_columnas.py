@@ -0,0 +1,237 @@
+import numpy as np
+import pandas as pd
+
+TAMANO_MUESTRA = 8192      # Valores que guarda el muestreo para cuantiles
+PRECISION_HLL = 12         # 2^12 registros: error típico ~1.6% en distintos
+LIMITE_EXACTO = 4096       # Hasta aquí los distintos se cuentan exactos
+CAPACIDAD_TOP = 256        # Valores que guarda el resumen de frecuentes
+CUANTILES = (0.25, 0.5, 0.75)
+
+_REGISTROS = 1 << PRECISION_HLL
+_ALFA = 0.7213 / (1 + 1.079 / _REGISTROS)
+
+
+def es_numerica(serie):
+    return pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie)
+
+
+def _hashes(valores):
+    """uint64 por valor, igual para 5 y 5.0 sin importar el dtype del chunk"""
+    if es_numerica(valores):
+        valores = valores.astype('float64')
+    return pd.util.hash_pandas_object(valores, index=False).to_numpy()
+
+
+def _rangos_hll(hashes):
+    """Registro (primeros bits) y posición del primer 1 en el resto del hash"""
+    registros = (hashes >> np.uint64(64 - PRECISION_HLL)).astype(np.intp)
+    # Los 52 bits restantes caben exactos en un float64
+    resto = ((hashes << np.uint64(PRECISION_HLL)) >> np.uint64(PRECISION_HLL)).astype(np.float64)
+    bits = 64 - PRECISION_HLL
+    ceros = np.full(len(hashes), bits, dtype=np.int64)
+    positivos = resto > 0
+    ceros[positivos] = (bits - 1) - np.floor(np.log2(resto[positivos])).astype(np.int64)
+    return registros, (ceros + 1).astype(np.uint8)
+
+
+class PerfilColumna:
+    """
+    Resumen de una columna en una pasada, combinable entre chunks y
+    procesos: conteos, min/max, media y varianza (Welford/Chan), cuantiles
+    sobre una muestra uniforme acotada, distintos (HyperLogLog, exacto
+    mientras son pocos) y los valores más frecuentes (top-k con poda).
+    """
+
+    def __init__(self, semilla=None):
+        self.filas = 0
+        self.nulos = 0
+        self.vacios = 0             # Texto que solo tiene espacios
+        self.numericos = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = None
+        self.maximo = None
+        self.muestra = np.empty(0)
+        self.prioridades = np.empty(0)
+        self.registros = np.zeros(_REGISTROS, dtype=np.uint8)
+        self.exactos = np.empty(0, dtype=np.uint64)   # None cuando ya son demasiados
+        self.frecuentes = {}
+        self.descontado = 0         # Cota del conteo que pudo perder un valor por la poda
+        self._azar = np.random.default_rng(semilla)
+
+    @property
+    def no_nulos(self):
+        return self.filas - self.nulos
+
+    def agregar(self, serie):
+        self.filas += len(serie)
+        valores = serie.dropna()
+        self.nulos += len(serie) - len(valores)
+        if valores.empty:
+            return self
+
+        hashes = _hashes(valores)
+        self._agregar_distintos(hashes)
+
+        if es_numerica(valores):
+            self._agregar_numeros(valores.to_numpy(dtype='float64'))
+            return self
+
+        categorica = isinstance(valores.dtype, pd.CategoricalDtype)
+        texto = not categorica and (pd.api.types.is_object_dtype(valores)
+                                    or pd.api.types.is_string_dtype(valores))
+        if texto:
+            self.vacios += int(valores.astype(str).str.strip().eq('').sum())
+        if texto or categorica:
+            conteos = valores.value_counts()
+            self._agregar_frecuentes(conteos[conteos > 0].to_dict())
+        if not categorica:
+            self._agregar_extremos(valores)
+        return self
+
+    def _agregar_numeros(self, x):
+        n, media, m2 = len(x), x.mean(), ((x - x.mean()) ** 2).sum()
+        self._combinar_momentos(n, media, m2)
+        self._agregar_extremos(x)
+        self._combinar_muestra(x, self._azar.random(len(x)))
+
+    def _agregar_extremos(self, valores):
+        try:
+            minimo, maximo = valores.min(), valores.max()
+            self.minimo = minimo if self.minimo is None else min(self.minimo, minimo)
+            self.maximo = maximo if self.maximo is None else max(self.maximo, maximo)
+        except TypeError:
+            pass  # Tipos mezclados sin orden
+
+    def _combinar_momentos(self, n, media, m2):
+        """Fórmula de Chan: combina (n, media, M2) de dos partes sin perder precisión"""
+        total = self.numericos + n
+        delta = media - self.media
+        self.media += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.numericos * n / total
+        self.numericos = total
+
+    def _combinar_muestra(self, valores, prioridades):
+        """Muestreo bottom-k: las k prioridades aleatorias más bajas son una muestra uniforme de la unión"""
+        valores = np.concatenate([self.muestra, valores])
+        prioridades = np.concatenate([self.prioridades, prioridades])
+        if len(valores) > TAMANO_MUESTRA:
+            conservar = np.argpartition(prioridades, TAMANO_MUESTRA)[:TAMANO_MUESTRA]
+            valores, prioridades = valores[conservar], prioridades[conservar]
+        self.muestra, self.prioridades = valores, prioridades
+
+    def _agregar_distintos(self, hashes):
+        registros, rangos = _rangos_hll(hashes)
+        np.maximum.at(self.registros, registros, rangos)
+        if self.exactos is not None and self._estimar_hll() > 2 * LIMITE_EXACTO:
+            # Sin duda ya son muchos: no vale la pena ordenar hashes para saberlo
+            self.exactos = None
+        self._combinar_exactos(hashes)
+
+    def _combinar_exactos(self, hashes):
+        if self.exactos is None:
+            return
+        self.exactos = np.union1d(self.exactos, pd.unique(hashes))
+        if len(self.exactos) > LIMITE_EXACTO:
+            self.exactos = None
+
+    def _agregar_frecuentes(self, conteos):
+        for valor, cantidad in conteos.items():
+            self.frecuentes[valor] = self.frecuentes.get(valor, 0) + cantidad
+        if len(self.frecuentes) > CAPACIDAD_TOP:
+            # Poda: sobreviven los k más frecuentes; un valor podado nunca tuvo más que
+            # el mayor conteo descartado, que se acumula como cota del error
+            ordenados = sorted(self.frecuentes.items(), key=lambda par: par[1], reverse=True)
+            self.descontado += ordenados[CAPACIDAD_TOP][1]
+            self.frecuentes = dict(ordenados[:CAPACIDAD_TOP])
+
+    def combinar(self, otro):
+        """Suma otro perfil de la misma columna (otro chunk u otro proceso)"""
+        self.filas += otro.filas
+        self.nulos += otro.nulos
+        self.vacios += otro.vacios
+        if otro.numericos:
+            self._combinar_momentos(otro.numericos, otro.media, otro.m2)
+            self._combinar_muestra(otro.muestra, otro.prioridades)
+        for extremo in (otro.minimo, otro.maximo):
+            if extremo is not None:
+                self._agregar_extremos(pd.Series([extremo]))
+        np.maximum(self.registros, otro.registros, out=self.registros)
+        if otro.exactos is None:
+            self.exactos = None
+        else:
+            self._combinar_exactos(otro.exactos)
+        self._agregar_frecuentes(otro.frecuentes)
+        self.descontado += otro.descontado
+        return self
+
+    def distintos(self):
+        if self.exactos is not None:
+            return len(self.exactos)
+        return int(round(self._estimar_hll()))
+
+    def _estimar_hll(self):
+        estimado = _ALFA * _REGISTROS ** 2 / np.sum(np.ldexp(1.0, -self.registros.astype(np.int64)))
+        ceros = int((self.registros == 0).sum())
+        if estimado <= 2.5 * _REGISTROS and ceros:
+            estimado = _REGISTROS * np.log(_REGISTROS / ceros)
+        return estimado
+
+    def varianza(self):
+        return self.m2 / (self.numericos - 1) if self.numericos > 1 else np.nan
+
+    def cuantil(self, q):
+        return float(np.quantile(self.muestra, q)) if len(self.muestra) else np.nan
+
+    def top(self, n=5):
+        return sorted(self.frecuentes.items(), key=lambda par: par[1], reverse=True)[:n]
+
+    def describir(self):
+        """Mismas filas que Series.describe() de una columna numérica"""
+        filas = {'count': self.numericos, 'mean': self.media if self.numericos else np.nan,
+                 'std': np.sqrt(self.varianza()), 'min': self.minimo,
+                 **{f"{q:.0%}": self.cuantil(q) for q in CUANTILES}, 'max': self.maximo}
+        return pd.Series(filas, dtype='float64')
+
+
+class PerfilDatos:
+    """Perfil de todas las columnas de un DataFrame, chunk a chunk"""
+
+    def __init__(self, semilla=None):
+        # Una semilla hija por columna; sin semilla, cada proceso saca la suya
+        # de la entropía del sistema y las muestras que se combinan son independientes
+        self.semillas = np.random.SeedSequence(semilla)
+        self.columnas = {}
+        self.filas = 0
+
+    def perfil(self, col):
+        if col not in self.columnas:
+            self.columnas[col] = PerfilColumna(self.semillas.spawn(1)[0])
+        return self.columnas[col]
+
+    def agregar(self, df):
+        self.filas += len(df)
+        for col in df.columns:
+            self.perfil(col).agregar(df[col])
+        return self
+
+    def agregar_columna(self, col, serie):
+        self.perfil(col).agregar(serie)
+        self.filas = max(self.filas, self.columnas[col].filas)
+        return self
+
+    def combinar(self, otro):
+        self.filas += otro.filas
+        for col, perfil in otro.columnas.items():
+            if col in self.columnas:
+                self.columnas[col].combinar(perfil)
+            else:
+                self.columnas[col] = perfil
+        return self
+
+    def numericas(self):
+        """DataFrame estilo describe() de las columnas con números"""
+        return pd.DataFrame({col: p.describir() for col, p in self.columnas.items() if p.numericos})
+
+    def categoricas(self):
+        return {col: p.top() for col, p in self.columnas.items() if p.frecuentes}
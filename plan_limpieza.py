@@ -0,0 +1,87 @@
+import numpy as np
+
+from duplicados_filas import DuplicadosFilas
+from inferencia_tipos import convertir_columna
+from relleno_nulos import rellenar
+
+
+class PlanLimpieza:
+    """
+    Cambios sobre el DataFrame original, que nunca se copia: una máscara de
+    filas vivas, el relleno de nulos pendiente y las conversiones de tipo
+    (estas sí en el momento, columna a columna, para que lo no convertible
+    ya cuente como nulo). Solo materializar() construye el frame final.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.mascara = np.ones(len(df), dtype=bool)
+        self.conversiones = {}
+        self.relleno = None     # (estrategia, grupo, orden) de relleno_nulos.rellenar
+        self.fallidas = []
+        self.coercionados = {}  # col → valores que no encajaron en el formato y quedaron nulos
+
+    @property
+    def filas(self):
+        return int(self.mascara.sum())
+
+    def descartar(self, filas):
+        """Quita del plan las filas marcadas (array booleano); devuelve cuántas estaban vivas"""
+        quitadas = int((filas & self.mascara).sum())
+        self.mascara &= ~filas
+        return quitadas
+
+    def duplicadas(self, claves=None):
+        """
+        Filas repetidas entre las vivas (se conserva la primera aparición),
+        con un solo hash por fila. claves: columnas que definen el duplicado.
+        """
+        vivas = None if self.mascara.all() else self.mascara
+        return DuplicadosFilas(self.df, claves).repetidas(vivas)
+
+    def con_nulos(self):
+        return self.df.isna().any(axis=1).to_numpy()
+
+    def nulos(self):
+        """Valores nulos entre las filas vivas, columna a columna"""
+        return sum(int((self.df[col].isna().to_numpy() & self.mascara).sum())
+                   for col in self.df.columns)
+
+    def convertir(self, col, tipo, formato=None):
+        """
+        Convierte la columna ya (reemplaza la original, el frame no se copia).
+        Devuelve cuántos valores de filas vivas no encajaron y quedaron nulos.
+        """
+        self.conversiones[col] = (tipo, formato)
+        serie = self.df[col]
+        try:
+            convertida = convertir_columna(serie, tipo, formato)
+        except (ValueError, TypeError):
+            self.fallidas.append(col)
+            return 0
+
+        nuevos = (convertida.isna() & serie.notna()).to_numpy() & self.mascara
+        self.coercionados[col] = int(nuevos.sum())
+        self.df[col] = convertida
+        return self.coercionados[col]
+
+    def rellenar(self, estrategia='mediana', grupo=None, orden=None):
+        """Anota el relleno de nulos; grupo/orden: columnas para mediana por grupo o ffill"""
+        self.relleno = (estrategia, grupo, orden)
+
+    def materializar(self):
+        """
+        Aplica el plan y devuelve el frame final. La única copia es la de las
+        filas conservadas; el original se suelta antes de rellenar.
+        """
+        df = self.df if self.mascara.all() else self.df[self.mascara]
+        self.df = None
+
+        if self.relleno is not None:
+            df = rellenar(df, *self.relleno)
+
+        self.df = df
+        self.mascara = np.ones(len(df), dtype=bool)
+        self.conversiones = {}
+        self.relleno = None
+        return df
@@ -0,0 +1,232 @@
+import json
+import fnmatch
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from duplicados_filas import HashesVistos, hashes_filas
+from inferencia_tipos import convertir_columna
+from relleno_nulos import admitir_relleno, ajustar_enteros
+
+TIPOS = ('fecha', 'precio', 'porcentaje', 'entero', 'decimal', 'categoria', 'texto')
+ESTRATEGIAS_NULOS = ('conservar', 'eliminar', 'mediana', 'desconocido')   # o {"valor": X}
+FUERA_DE_RANGO = ('nulo', 'eliminar')
+
+
+class ReglaColumna:
+    """
+    Lo que la especificación pide para una columna (tipo, rango, nulos),
+    aplicado en una sola pasada sobre esa columna.
+    """
+
+    def __init__(self, nombre, tipo=None, formato=None, rango=None, fuera_de_rango='nulo',
+                 nulos='conservar'):
+        if tipo is not None and tipo not in TIPOS:
+            raise ValueError(f"{nombre}: tipo inválido '{tipo}' (opciones: {', '.join(TIPOS)})")
+        if fuera_de_rango not in FUERA_DE_RANGO:
+            raise ValueError(f"{nombre}: fuera_de_rango debe ser {' o '.join(FUERA_DE_RANGO)}")
+        if not (nulos in ESTRATEGIAS_NULOS or (isinstance(nulos, dict) and 'valor' in nulos)):
+            raise ValueError(f"{nombre}: nulos inválido {nulos!r} "
+                             f"(opciones: {', '.join(ESTRATEGIAS_NULOS)} o {{\"valor\": ...}})")
+        if rango is not None and len(rango) != 2:
+            raise ValueError(f"{nombre}: rango debe ser [mínimo, máximo] (null = sin límite)")
+
+        self.nombre = nombre
+        self.tipo = tipo
+        self.formato = formato
+        self.rango = rango
+        self.fuera_de_rango = fuera_de_rango
+        self.nulos = nulos
+        self.relleno = nulos['valor'] if isinstance(nulos, dict) else None
+        self.conteos = {'coercionados': 0, 'fuera_de_rango': 0, 'nulos_eliminados': 0, 'rellenados': 0}
+
+    def limites(self):
+        minimo, maximo = self.rango
+        if self.tipo == 'fecha':
+            return (pd.Timestamp(minimo) if minimo is not None else None,
+                    pd.Timestamp(maximo) if maximo is not None else None)
+        return minimo, maximo
+
+    def aplicar(self, serie):
+        """(serie limpia, filas a descartar o None)"""
+        descartar = None
+
+        if self.tipo and self.tipo != 'texto':
+            nulos_antes = int(serie.isna().sum())
+            try:
+                serie = convertir_columna(serie, self.tipo, self.formato)
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"{self.nombre}: no se pudo convertir a {self.tipo}: {e}") from e
+            self.conteos['coercionados'] += int(serie.isna().sum()) - nulos_antes
+
+        if self.rango is not None:
+            minimo, maximo = self.limites()
+            fuera = pd.Series(False, index=serie.index)
+            if minimo is not None:
+                fuera |= (serie < minimo).fillna(False)
+            if maximo is not None:
+                fuera |= (serie > maximo).fillna(False)
+            fuera = fuera.to_numpy(dtype=bool)
+            self.conteos['fuera_de_rango'] += int(fuera.sum())
+            if self.fuera_de_rango == 'nulo':
+                serie = serie.mask(fuera)
+            else:
+                descartar = fuera
+
+        if self.nulos == 'conservar':
+            return serie, descartar
+
+        vacios = serie.isna().to_numpy()
+        if self.nulos == 'eliminar':
+            self.conteos['nulos_eliminados'] += int((vacios & ~descartar).sum()) \
+                if descartar is not None else int(vacios.sum())
+            return serie, vacios if descartar is None else descartar | vacios
+
+        if self.relleno is None:
+            if self.nulos == 'mediana' and not pd.api.types.is_numeric_dtype(serie):
+                raise ValueError(f"{self.nombre}: 'mediana' necesita una columna numérica ({serie.dtype})")
+            # Primer lote de datos (el frame completo o el primer chunk): no hay segunda pasada
+            if self.nulos == 'mediana':
+                # La mediana de enteros puede caer en .5, que Int64 no admite
+                marco = serie.to_frame()
+                self.relleno = ajustar_enteros(marco, marco.median()).iloc[0]
+            else:
+                self.relleno = "Desconocido"
+        if vacios.any():
+            if self.nulos == 'desconocido' or isinstance(self.relleno, str):
+                serie = admitir_relleno(serie)
+            serie = serie.fillna(self.relleno)
+            self.conteos['rellenados'] += int(vacios.sum())
+        return serie, descartar
+
+
+class ReglasLimpieza:
+    """
+    Especificación declarativa de limpieza (JSON) compilada a una pasada por
+    columna. Formato:
+
+        {
+          "renombrar": {"Fecha Venta": "fecha"},
+          "descartar": ["columna_sobrante"],
+          "nulos": "conservar",                     ← estrategia para columnas sin regla
+          "duplicados": ["fecha", "cliente"],       ← true = fila completa
+          "columnas": {
+            "fecha":    {"tipo": "fecha", "formato": "%Y-%m-%d", "nulos": "eliminar"},
+            "precio":   {"tipo": "precio", "rango": [0, null], "fuera_de_rango": "eliminar"},
+            "ENTRADAS_*": {"tipo": "entero", "nulos": "mediana"}
+          }
+        }
+
+    Las claves de "columnas" (ya renombradas) admiten comodines; el nombre
+    exacto gana sobre un patrón. El mismo objeto sirve para el frame completo
+    o chunk a chunk: rellenos y duplicados vistos se conservan entre llamadas.
+    """
+
+    def __init__(self, especificacion, origen='dict'):
+        self.origen = origen
+        self.renombrar = dict(especificacion.get('renombrar', {}))
+        self.descartar = list(especificacion.get('descartar', []))
+        self.duplicados = especificacion.get('duplicados', False)
+        self.nulos = especificacion.get('nulos', 'conservar')
+        self.columnas = dict(especificacion.get('columnas', {}))
+        if not isinstance(self.duplicados, (bool, list)):
+            raise ValueError("duplicados debe ser true/false o una lista de columnas clave")
+
+        # Validar todo al cargar, no a mitad de un lote de cientos de archivos
+        for nombre, opciones in {**self.columnas, '(por defecto)': {'nulos': self.nulos}}.items():
+            ReglaColumna(nombre, **opciones)
+
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Olvida lo visto (rellenos, duplicados, conteos) para empezar otro archivo"""
+        self.reglas = None
+        self.faltantes = []
+        self.vistos = HashesVistos()
+        self.filas_entrada = self.filas_salida = self.duplicadas = 0
+
+    @classmethod
+    def cargar(cls, ruta):
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), origen=str(Path(ruta)))
+
+    def opciones_de(self, columna):
+        if columna in self.columnas:
+            return self.columnas[columna]
+        for patron, opciones in self.columnas.items():
+            if fnmatch.fnmatchcase(columna, patron):
+                return opciones
+        return {'nulos': self.nulos} if self.nulos != 'conservar' else None
+
+    def compilar(self, columnas):
+        """Una ReglaColumna por columna presente que tenga algo que hacer"""
+        self.reglas = []
+        for col in columnas:
+            opciones = self.opciones_de(col)
+            if opciones:
+                self.reglas.append(ReglaColumna(col, **opciones))
+
+        patrones = [p for p in self.columnas if not any(fnmatch.fnmatchcase(c, p) for c in columnas)]
+        claves = self.duplicados if isinstance(self.duplicados, list) else []
+        self.faltantes = patrones + [c for c in claves if c not in columnas]
+        if self.faltantes:
+            print(f"⚠️  Reglas sin columna en el archivo: {', '.join(self.faltantes)}")
+        return self.reglas
+
+    def aplicar(self, df):
+        """Aplica las reglas a un frame o a un chunk; un solo filtrado de filas al final"""
+        self.filas_entrada += len(df)
+        df = df.rename(columns=self.renombrar)
+        if self.descartar:
+            df = df.drop(columns=self.descartar, errors='ignore')
+        if self.reglas is None:
+            self.compilar(df.columns)
+
+        descartar = np.zeros(len(df), dtype=bool)
+        for regla in self.reglas:
+            serie, filas = regla.aplicar(df[regla.nombre])
+            df[regla.nombre] = serie
+            if filas is not None:
+                descartar |= filas
+
+        if self.duplicados:
+            claves = [c for c in self.duplicados if c in df.columns] \
+                if isinstance(self.duplicados, list) else None
+            vivas = np.flatnonzero(~descartar)
+            nuevas = self.vistos.nuevas(hashes_filas(df, claves)[vivas])
+            self.duplicadas += int((~nuevas).sum())
+            descartar[vivas[~nuevas]] = True
+
+        if descartar.any():
+            df = df[~descartar]
+        self.filas_salida += len(df)
+        return df
+
+    def resumen(self):
+        """Líneas para el reporte, acumuladas de todos los chunks"""
+        lineas = [f"Reglas aplicadas desde {self.origen}: {len(self.reglas or [])} columnas"]
+        if self.renombrar:
+            lineas.append(f"Renombradas {len(self.renombrar)} columnas")
+        if self.descartar:
+            lineas.append(f"Descartadas columnas: {', '.join(self.descartar)}")
+        for regla in self.reglas or []:
+            c = regla.conteos
+            partes = [f"{c['coercionados']} no convertibles" if c['coercionados'] else '',
+                      f"{c['fuera_de_rango']} fuera de rango" if c['fuera_de_rango'] else '',
+                      f"{c['nulos_eliminados']} filas con nulo eliminadas" if c['nulos_eliminados'] else '',
+                      f"{c['rellenados']} nulos rellenados con {regla.relleno}" if c['rellenados'] else '']
+            partes = [p for p in partes if p]
+            if partes:
+                lineas.append(f"{regla.nombre}: {', '.join(partes)}")
+        if self.duplicadas:
+            lineas.append(f"Eliminadas {self.duplicadas} filas duplicadas")
+        lineas.append(f"Filas: {self.filas_entrada} → {self.filas_salida}")
+        return lineas
+
+
+if __name__ == "__main__":
+    # Verificar: mediana de un entero que cae en .5 (antes: TypeError Invalid value '1.5' for Int64)
+    serie, _ = ReglaColumna('X', tipo='entero', nulos='mediana').aplicar(pd.Series(['1', '2', None]))
+    assert str(serie.dtype) == 'Int64' and serie.notna().all(), f"Error: {serie.tolist()}"
+    print("✅ Test pasado!")
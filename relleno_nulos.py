@@ -0,0 +1,91 @@
+import pandas as pd
+
+from perfil_columnas import es_numerica
+
+DESCONOCIDO = "Desconocido"
+ESTRATEGIAS = ('mediana', 'mediana_grupo', 'ffill')
+
+
+def columnas_numericas(df, excluir=()):
+    """Todas las numéricas (int8..int64, float32, Int64, Float64...), sin bool"""
+    return [col for col in df.columns if col not in excluir and es_numerica(df[col])]
+
+
+def admitir_relleno(serie):
+    """Las categóricas solo aceptan en fillna valores que ya sean categorías"""
+    if isinstance(serie.dtype, pd.CategoricalDtype) and DESCONOCIDO not in serie.cat.categories:
+        return serie.cat.add_categories([DESCONOCIDO])
+    return serie
+
+
+def ajustar_enteros(df, valores):
+    """Una mediana de enteros puede caer en .5: se redondea para no romper Int64/int32"""
+    for col in valores.columns if isinstance(valores, pd.DataFrame) else valores.index:
+        # Una columna entera toda vacía tiene mediana <NA>: no hay nada que redondear
+        if pd.api.types.is_integer_dtype(df[col]) and (isinstance(valores[col], pd.Series)
+                                                       or pd.notna(valores[col])):
+            valores[col] = valores[col].round()
+    return valores
+
+
+def valores_relleno(df):
+    """
+    {col: valor} para un solo fillna: las medianas de todas las numéricas
+    salen de un único median(); el texto y las categóricas van con
+    "Desconocido". Fechas y bool no se rellenan con un valor fijo.
+    """
+    numericas = columnas_numericas(df)
+    medianas = ajustar_enteros(df, df[numericas].median()) if numericas else pd.Series(dtype=float)
+
+    valores = {col: medianas[col] for col in numericas if pd.notna(medianas[col])}
+    for col in df.columns:
+        serie = df[col]
+        if col in valores or es_numerica(serie) or pd.api.types.is_bool_dtype(serie):
+            continue
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            continue
+        valores[col] = DESCONOCIDO
+    return valores
+
+
+def rellenar(df, estrategia='mediana', grupo=None, orden=None):
+    """
+    Rellena nulos sin recorrer filas en Python:
+      mediana        medianas globales (un median()) y "Desconocido"
+      mediana_grupo  mediana de cada grupo (p.ej. por lote) con un groupby().transform
+      ffill          último valor conocido, ordenado por `orden` (fecha) y dentro de cada grupo
+    Lo que la estrategia deja vacío (grupos sin datos, primeras filas del
+    ffill) cae en los valores globales del original. Termina con un solo fillna(dict).
+    """
+    if estrategia not in ESTRATEGIAS:
+        raise ValueError(f"Estrategia inválida: {estrategia} (opciones: {', '.join(ESTRATEGIAS)})")
+    claves = [col for col in (grupo, orden) if col is not None]
+    faltantes = [col for col in claves if col not in df.columns]
+    if faltantes:
+        raise KeyError(f"Columnas para rellenar inexistentes: {', '.join(faltantes)}")
+
+    # Los valores globales salen de los datos originales, no de los ya rellenados
+    valores = valores_relleno(df)
+    df = df.copy() if estrategia != 'mediana' else df
+
+    if estrategia == 'mediana_grupo' and grupo is not None:
+        numericas = columnas_numericas(df, excluir=claves)
+        if numericas:
+            por_grupo = df.groupby(grupo, sort=False, dropna=False, observed=True)[numericas] \
+                .transform('median')
+            por_grupo = ajustar_enteros(df, por_grupo).astype(df[numericas].dtypes.to_dict())
+            df[numericas] = df[numericas].fillna(por_grupo)
+
+    elif estrategia == 'ffill':
+        columnas = [col for col in df.columns if col not in claves]
+        ordenado = df.sort_values(orden, kind='stable') if orden is not None else df
+        if grupo is not None:
+            llenado = ordenado.groupby(grupo, sort=False, dropna=False, observed=True)[columnas].ffill()
+        else:
+            llenado = ordenado[columnas].ffill()
+        df[columnas] = llenado.reindex(df.index)
+
+    for col in df.select_dtypes(include='category').columns:
+        if valores.get(col) == DESCONOCIDO:
+            df[col] = admitir_relleno(df[col])
+    return df.fillna(valores)
@@ -0,0 +1,84 @@
+import json
+from pathlib import Path
+
+
+class Taxonomia:
+    """
+    Taxonomía de extensiones compilada a un diccionario plano.
+    Acepta el formato de 1 nivel (categoría → [extensiones]) o el jerárquico
+    (categoría → subcategoría → [extensiones]). Clasificar es O(1) por archivo.
+    """
+
+    OTROS = 'Otros'
+
+    def __init__(self, tipos, origen='dict'):
+        self.tipos = dict(tipos)
+        self.tipos.setdefault(self.OTROS, [])
+        self.origen = origen
+        self.destinos = {}     # '.pdf' → ('Documentos', 'PDFs') o ('Documentos', None)
+        self.conflictos = []   # (extensión, destino conservado, destino ignorado)
+        self._compilar()
+
+    @classmethod
+    def cargar(cls, ruta):
+        """Carga un JSON: usa 'categorias_personalizadas' si existe (config.json) o el JSON completo"""
+        with open(ruta, 'r', encoding='utf-8') as f:
+            datos = json.load(f)
+        tipos = datos.get('categorias_personalizadas', datos)
+        return cls(tipos, origen=str(Path(ruta)))
+
+    @staticmethod
+    def normalizar(extension):
+        """'PPTX' → '.pptx' (algunas listas viejas no traen el punto)"""
+        ext = extension.strip().lower()
+        return ext if ext.startswith('.') or not ext else f".{ext}"
+
+    def _compilar(self):
+        for categoria, contenido in self.tipos.items():
+            if isinstance(contenido, dict):
+                grupos = [(subcategoria, exts) for subcategoria, exts in contenido.items()]
+            else:
+                grupos = [(None, contenido)]
+
+            for subcategoria, extensiones in grupos:
+                for extension in extensiones:
+                    ext = self.normalizar(extension)
+                    destino = (categoria, subcategoria)
+                    previo = self.destinos.get(ext)
+
+                    if previo is None:
+                        self.destinos[ext] = destino
+                    elif previo != destino:
+                        # Gana la primera, igual que el recorrido lineal anterior
+                        self.conflictos.append((ext, previo, destino))
+
+        if self.conflictos:
+            self.reportar_conflictos()
+
+    def reportar_conflictos(self):
+        print(f"⚠️  Extensiones duplicadas en la taxonomía ({self.origen}):")
+        for ext, conservado, ignorado in self.conflictos:
+            print(f"   • {ext}: {self.ruta(conservado)} (se usa) / {self.ruta(ignorado)} (ignorada)")
+
+    @staticmethod
+    def ruta(destino):
+        """('Documentos', 'PDFs') → 'Documentos/PDFs'"""
+        categoria, subcategoria = destino
+        return f"{categoria}/{subcategoria}" if subcategoria else categoria
+
+    def clasificar(self, extension):
+        """Devuelve (categoría, subcategoría) con fallback a ('Otros', None)"""
+        return self.destinos.get(extension.lower(), (self.OTROS, None))
+
+    def categorias(self):
+        return list(self.tipos.keys())
+
+    def ubicaciones(self):
+        """Todas las carpetas destino relativas ('Documentos/PDFs', ..., 'Otros')"""
+        rutas = []
+        for categoria, contenido in self.tipos.items():
+            if isinstance(contenido, dict) and contenido:
+                rutas.extend(f"{categoria}/{sub}" for sub in contenido.keys())
+            else:
+                rutas.append(categoria)
+        return rutas
@@ -0,0 +1,201 @@
+import re
+import time
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from almacen_columnar import cargar
+from consolidador_lotes import TABLA
+
+COMPONENTES = ('INCUB', 'SUCIO', 'ROTO', 'DEF', 'EXTRA', 'YEMA')
+SINONIMOS = {'INCUBABLE': 'INCUB'}      # ENTRADAS dice INCUB; SALIDAS y SALDO, INCUBABLE
+BLOQUES = ('ENTRADAS', 'SALIDAS', 'SALDO')
+PATRON_COLUMNA = re.compile(r'^(ENTRADAS|SALIDAS|SALDO)_(.+)_([A-Z]+)$', re.IGNORECASE)
+IDENTIFICADORES = ('lote', 'fecha', 'fuente', 'SEM', 'FECHA', 'DIA')
+TOLERANCIA = 1e-6                       # Conteos enteros que pudieron pasar por float
+
+
+def bloques_granja(columnas):
+    """{(bloque, módulo): {componente: columna}} a partir de nombres como SALDO_MODULO1_YEMA"""
+    bloques = {}
+    for col in columnas:
+        coincidencia = PATRON_COLUMNA.match(str(col))
+        if not coincidencia:
+            continue
+        bloque, modulo, componente = (parte.upper() for parte in coincidencia.groups())
+        componente = SINONIMOS.get(componente, componente)
+        if componente in COMPONENTES or componente == 'TOTAL':
+            bloques.setdefault((bloque, modulo), {})[componente] = col
+    return bloques
+
+
+def _numeros(df, columnas):
+    """Matriz float (filas × columnas) con NaN donde falta el dato o no es número"""
+    return np.column_stack([pd.to_numeric(df[col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+                            for col in columnas])
+
+
+class ValidadorGranja:
+    """
+    Invariantes de los movimientos de huevo, verificadas con aritmética de
+    columnas sobre todo el frame (o chunk a chunk, los conteos se acumulan):
+      TOTAL = INCUB + SUCIO + ROTO + DEF + EXTRA + YEMA   en cada bloque
+      SALDO = ENTRADAS − SALIDAS                          en cada componente
+    Una fila a la que le falta algún valor de la regla no se evalúa.
+    """
+
+    def __init__(self, columnas):
+        self.totales = []   # (regla, [columnas sumadas], columna total)
+        self.saldos = []    # (regla, [entradas], [salidas], [saldos])
+
+        bloques = bloques_granja(columnas)
+        for (bloque, modulo), cols in bloques.items():
+            if 'TOTAL' in cols and all(c in cols for c in COMPONENTES):
+                self.totales.append((f"{bloque}_{modulo}: TOTAL = suma de componentes",
+                                     [cols[c] for c in COMPONENTES], cols['TOTAL']))
+
+        for modulo in sorted({m for _, m in bloques}):
+            tres = [bloques.get((bloque, modulo), {}) for bloque in BLOQUES]
+            comunes = [c for c in COMPONENTES + ('TOTAL',) if all(c in cols for cols in tres)]
+            if comunes:
+                self.saldos.append((f"SALDO_{modulo} = ENTRADAS − SALIDAS",
+                                    *[[cols[c] for c in comunes] for cols in tres]))
+
+        self.conteos = {regla: 0 for regla in self.reglas()}
+        self.evaluadas = dict.fromkeys(self.conteos, 0)
+        self.filas = 0
+        self.filas_con_error = 0
+        self.violaciones = []
+
+    def reglas(self):
+        return [t[0] for t in self.totales] + [s[0] for s in self.saldos]
+
+    def validar(self, df):
+        """Valida un frame o un chunk; devuelve las violaciones encontradas en él"""
+        # 'fila' es la posición en los datos validados (1 = primera fila de datos)
+        posiciones = np.arange(len(df)) + self.filas + 1
+        identificadores = [c for c in IDENTIFICADORES if c in df.columns]
+        con_error = np.zeros(len(df), dtype=bool)
+        encontradas = []
+
+        for regla, sumandos, total in self.totales:
+            esperado = _numeros(df, sumandos).sum(axis=1)
+            encontrado = _numeros(df, [total])[:, 0]
+            evaluables = ~np.isnan(esperado) & ~np.isnan(encontrado)
+            malas = evaluables & (np.abs(esperado - encontrado) > TOLERANCIA)
+            filas = np.flatnonzero(malas)
+            self.evaluadas[regla] += int(evaluables.sum())
+            encontradas.append(self._registrar(df, regla, total, filas, esperado[filas],
+                                               encontrado[filas], posiciones, identificadores))
+            con_error |= malas
+
+        for regla, entradas, salidas, saldos in self.saldos:
+            esperado = _numeros(df, entradas) - _numeros(df, salidas)
+            encontrado = _numeros(df, saldos)
+            evaluables = ~np.isnan(esperado) & ~np.isnan(encontrado)
+            malas = evaluables & (np.abs(esperado - encontrado) > TOLERANCIA)
+            # Una línea por (fila, componente) que no cuadra
+            filas, componentes = np.nonzero(malas)
+            self.evaluadas[regla] += int(evaluables.any(axis=1).sum())
+            encontradas.append(self._registrar(df, regla, np.asarray(saldos, dtype=object)[componentes],
+                                               filas, esperado[filas, componentes],
+                                               encontrado[filas, componentes], posiciones, identificadores))
+            con_error |= malas.any(axis=1)
+
+        self.filas += len(df)
+        self.filas_con_error += int(con_error.sum())
+        encontradas = [v for v in encontradas if len(v)]
+        if not encontradas:
+            return pd.DataFrame(columns=['fila', *identificadores, 'regla', 'columna', 'esperado', 'encontrado'])
+        violaciones = pd.concat(encontradas, ignore_index=True)
+        self.violaciones.append(violaciones)
+        return violaciones
+
+    def _registrar(self, df, regla, columna, filas, esperado, encontrado, posiciones, identificadores):
+        """Violaciones de una regla como frame compacto: se arma con índices, sin recorrer filas"""
+        self.conteos[regla] += len(filas)
+        violaciones = pd.DataFrame({'fila': posiciones[filas]})
+        for col in identificadores:
+            violaciones[col] = df[col].to_numpy()[filas]
+        violaciones['regla'] = regla
+        violaciones['columna'] = columna
+        violaciones['esperado'] = esperado
+        violaciones['encontrado'] = encontrado
+        return violaciones
+
+    def total_violaciones(self):
+        return sum(self.conteos.values())
+
+    def guardar(self, ruta):
+        """Archivo aparte con solo las filas que no cuadran (fila, identificadores, regla, valores)"""
+        if not self.violaciones:
+            Path(ruta).unlink(missing_ok=True)   # El de una corrida anterior ya no aplica
+            return None
+        violaciones = pd.concat(self.violaciones, ignore_index=True)
+        violaciones.to_csv(ruta, sep=';', index=False, float_format='%g')
+        return ruta
+
+    def resumen(self):
+        """Líneas para el reporte, acumuladas de todos los chunks"""
+        if not self.conteos:
+            return ["Sin bloques ENTRADAS/SALIDAS/SALDO reconocibles: nada que validar"]
+        lineas = [f"{self.filas} filas validadas, {self.filas_con_error} con al menos una violación"]
+        for regla, cantidad in self.conteos.items():
+            estado = f"{cantidad} violaciones" if cantidad else "OK"
+            lineas.append(f"{regla}: {estado} ({self.evaluadas[regla]} filas evaluables)")
+        return lineas
+
+
+def validar_base(ruta_db, chunksize=100_000):
+    """Valida la base consolidada por chunks, sin cargarla entera"""
+    with sqlite3.connect(ruta_db) as conexion:
+        columnas = [fila[1] for fila in conexion.execute(f"PRAGMA table_info({TABLA})")]
+        if not columnas:
+            raise ValueError(f"{ruta_db} no tiene la tabla {TABLA}")
+        validador = ValidadorGranja(columnas)
+        for chunk in pd.read_sql_query(f"SELECT * FROM {TABLA} ORDER BY lote, fecha", conexion,
+                                       chunksize=chunksize):
+            validador.validar(chunk)
+    return validador
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='🔎 Validar totales y saldos de movimientos de huevo')
+    parser.add_argument('archivo', nargs='?', default=None,
+                        help='Archivo limpio (_LIMPIO.csv/.parquet/.feather) a validar')
+    parser.add_argument('--db', default=None, help='Validar la base consolidada (lotes_consolidados.db)')
+    parser.add_argument('--chunksize', type=int, default=100_000, help='Filas por chunk al leer la base')
+    parser.add_argument('--salida', default=None,
+                        help='Archivo de violaciones (por defecto, <nombre>_VIOLACIONES.csv)')
+    args = parser.parse_args()
+
+    origen = args.db or args.archivo
+    if origen is None or not Path(origen).exists():
+        print("\n❌ Error: indicar un archivo o --db existente\n")
+        return
+
+    inicio = time.perf_counter()
+    if args.db:
+        validador = validar_base(args.db, args.chunksize)
+    else:
+        df = cargar(args.archivo, sep=';' if Path(args.archivo).suffix.lower() == '.csv' else None)
+        validador = ValidadorGranja(df.columns)
+        validador.validar(df)
+
+    print(f"\n🔎 VALIDACIÓN: {origen} ({time.perf_counter() - inicio:.2f}s)\n")
+    for linea in validador.resumen():
+        print(f"   • {linea}")
+
+    ruta = validador.guardar(args.salida or f"{Path(origen).stem}_VIOLACIONES.csv")
+    if ruta:
+        print(f"\n⚠️  {validador.total_violaciones()} violaciones guardadas en {ruta}\n")
+    else:
+        print("\n✅ Todo cuadra\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import os
+import stat
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+
+from escaner_archivos import RegistroArchivo, admitido, escanear
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0)
+
+EVENTO = struct.Struct('iIII')  # wd, mask, cookie, len
+
+# Descargas a medio escribir: el navegador las renombra al terminar (IN_MOVED_TO)
+SUFIJOS_TEMPORALES = ('.part', '.crdownload', '.download', '.tmp', '.partial')
+
+
+class ObservadorInotify:
+    """Eventos de una carpeta vía inotify (Linux) usando ctypes, sin dependencias"""
+
+    MASCARA = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+
+    def __init__(self, carpeta):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+
+        wd = libc.inotify_add_watch(self.fd, os.fsencode(carpeta), self.MASCARA)
+        if wd < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch falló en {carpeta}")
+
+        self.carpeta = carpeta
+
+    def esperar(self, timeout):
+        """
+        Bloquea hasta que haya eventos (timeout None = sin límite, CPU en cero).
+        Devuelve los nombres tocados; None si el kernel perdió eventos (hay que re-escanear).
+        """
+        listos, _, _ = select.select([self.fd], [], [], timeout)
+        if not listos:
+            return set()
+
+        nombres = set()
+        try:
+            datos = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return nombres
+
+        desplazamiento = 0
+        while desplazamiento < len(datos):
+            _, mascara, _, largo = EVENTO.unpack_from(datos, desplazamiento)
+            desplazamiento += EVENTO.size
+            nombre = datos[desplazamiento:desplazamiento + largo].rstrip(b'\0')
+            desplazamiento += largo
+
+            if mascara & IN_Q_OVERFLOW:
+                return None
+            if nombre and not mascara & IN_ISDIR:
+                nombres.add(os.fsdecode(nombre))
+
+        return nombres
+
+    def cerrar(self):
+        os.close(self.fd)
+
+
+class ObservadorSondeo:
+    """Alternativa en Python puro: re-escanea la carpeta cada `intervalo` segundos"""
+
+    def __init__(self, carpeta, intervalo=2.0):
+        self.carpeta = carpeta
+        self.intervalo = intervalo
+        self._vistos = {}
+
+    def esperar(self, timeout):
+        time.sleep(self.intervalo if timeout is None else min(timeout, self.intervalo))
+
+        actuales = {}
+        for registro in escanear(self.carpeta):
+            try:
+                actuales[registro.nombre] = (registro.tamano, registro.mtime)
+            except OSError:
+                continue
+
+        cambiados = {nombre for nombre, firma in actuales.items()
+                     if self._vistos.get(nombre) != firma}
+        self._vistos = actuales
+        return cambiados
+
+    def cerrar(self):
+        pass
+
+
+def crear_observador(carpeta, intervalo_sondeo=2.0):
+    """inotify si está disponible; si no, sondeo periódico"""
+    try:
+        return ObservadorInotify(carpeta)
+    except (OSError, AttributeError):
+        return ObservadorSondeo(carpeta, intervalo_sondeo)
+
+
+class Vigilante:
+    """
+    Modo daemon: espera eventos, deja "asentar" cada archivo hasta que su
+    tamaño no cambie durante `estabilidad` segundos y lo organiza en
+    micro-lotes con el organizar_lote del organizador.
+    """
+
+    def __init__(self, organizador, estabilidad=2.0, lote=100, intervalo_sondeo=2.0):
+        self.organizador = organizador
+        self.carpeta = organizador.carpeta_origen
+        self.estabilidad = estabilidad
+        self.lote = lote
+        self.observador = crear_observador(self.carpeta, intervalo_sondeo)
+        self._pendientes = {}  # nombre → (tamaño, mtime, desde cuándo no cambia)
+
+    def vigilar(self):
+        tipo = "inotify" if isinstance(self.observador, ObservadorInotify) else "sondeo"
+        print(f"👀 Vigilando {self.carpeta} ({tipo}, estabilidad {self.estabilidad}s). Ctrl+C para salir\n")
+
+        try:
+            while True:
+                # Sin pendientes se bloquea indefinidamente: CPU ~0 en reposo
+                timeout = self.estabilidad / 2 if self._pendientes else None
+                nombres = self.observador.esperar(timeout)
+
+                if nombres is None:
+                    nombres = {r.nombre for r in escanear(self.carpeta)}
+
+                for nombre in nombres:
+                    if self._admitir(nombre):
+                        self._pendientes.setdefault(nombre, None)
+
+                listos = self._revisar_pendientes()
+                for inicio in range(0, len(listos), self.lote):
+                    self._procesar_lote(listos[inicio:inicio + self.lote])
+
+        except KeyboardInterrupt:
+            print("\n⏹️  Vigilancia detenida")
+        finally:
+            self.observador.cerrar()
+
+    def _admitir(self, nombre):
+        """Mismos filtros que el escaneo normal (--incluir/--excluir), sin descargas a medio escribir"""
+        if nombre.lower().endswith(SUFIJOS_TEMPORALES):
+            return False
+        org = self.organizador
+        # Solo se vigila el primer nivel: la ruta relativa es el nombre
+        return admitido(nombre, nombre, getattr(org, 'incluir', None), getattr(org, 'excluir', None))
+
+    def _revisar_pendientes(self):
+        """Devuelve los registros cuyo tamaño y mtime ya no cambian"""
+        ahora = time.monotonic()
+        listos = []
+
+        for nombre, previo in list(self._pendientes.items()):
+            ruta = os.path.join(self.carpeta, nombre)
+            try:
+                st = os.stat(ruta)
+            except OSError:
+                # Desapareció o sin permisos: se descarta sin cortar la vigilancia
+                del self._pendientes[nombre]
+                continue
+
+            if not stat.S_ISREG(st.st_mode):
+                del self._pendientes[nombre]
+                continue
+
+            firma = (st.st_size, st.st_mtime)
+            if previo is None or previo[:2] != firma:
+                self._pendientes[nombre] = (*firma, ahora)
+            elif ahora - previo[2] >= self.estabilidad:
+                del self._pendientes[nombre]
+                listos.append(RegistroArchivo.desde_ruta(ruta))
+
+        return listos
+
+    def _procesar_lote(self, registros):
+        org = self.organizador
+        org.organizar_lote(registros)
+
+        # Cada micro-lote queda persistido: log, diario de deshacer e índice
+        org.logger.flush()
+        if getattr(org, 'diario', None):
+            org.diario.flush()
+        if getattr(org, 'indice', None):
+            org.indice.guardar()
+
+        print(f"📦 Lote organizado: {len(registros)} archivo(s) "
+              f"(total movidos: {org.stats['archivos_movidos']})")